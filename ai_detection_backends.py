@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+CPU inference backends for the AI vs Human image detection model.
+Every backend wraps the same best_model.pth weights and is called like the
+eager model: backend(input_batch) -> logits tensor.
+
+Backends:
+    eager               PyTorch eager fp32 (default)
+    torchscript         Traced and frozen TorchScript module
+    compile             torch.compile of the eager model (no artifact)
+    onnx                ONNX Runtime fp32
+    onnx-int8-dynamic   ONNX Runtime, dynamically quantized int8 weights
+    onnx-int8-static    ONNX Runtime, statically quantized int8 (calibrated)
+
+Usage:
+    python ai_detection_backends.py export --backend onnx-int8-static --samples uploads/deepfake_scans
+    python ai_detection_backends.py parity --backend onnx-int8-static --samples uploads/deepfake_scans
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import ai_detection_inference as inference
+
+# PyTorch dynamic quantization is not offered: it only covers nn.Linear, which
+# in EfficientNetV2 is the 1280x2 classifier head, so it changes neither speed
+# nor size. The ONNX int8 backends quantize the convolutions as well.
+BACKENDS = ('eager', 'torchscript', 'compile', 'onnx', 'onnx-int8-dynamic', 'onnx-int8-static')
+
+# Artifact file suffix per exported backend (stored next to the weights file)
+ARTIFACT_SUFFIXES = {
+    'torchscript': '.torchscript.pt',
+    'onnx': '.onnx',
+    'onnx-int8-dynamic': '.int8-dynamic.onnx',
+    'onnx-int8-static': '.int8-static.onnx'
+}
+
+
+def artifact_path(backend, model_path=inference.MODEL_PATH):
+    """Where the exported artifact for a backend lives."""
+    return os.path.splitext(model_path)[0] + ARTIFACT_SUFFIXES[backend]
+
+
+def _write_manifest(path, backend, model_path):
+    """Record which weights an artifact was built from, so stale artifacts are refused."""
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'backend': backend,
+            'source': os.path.abspath(model_path),
+            'source_sha256': inference.model_fingerprint(model_path),
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }, f, indent=2)
+
+
+def _check_manifest(path, model_path):
+    try:
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        raise RuntimeError(f'No manifest for {path}. Re-run the export command.')
+    if manifest.get('source_sha256') != inference.model_fingerprint(model_path):
+        raise RuntimeError(f'{path} was exported from different weights. Re-run the export command.')
+
+
+class OnnxModel:
+    """ONNX Runtime session exposed with the same call signature as the PyTorch model."""
+
+    def __init__(self, path, num_threads=inference.NUM_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, input_batch):
+        torch = inference.torch
+        logits = self.session.run(None, {self.input_name: input_batch.cpu().numpy()})[0]
+        return torch.from_numpy(logits)
+
+    def eval(self):
+        return self
+
+
+def load_backend(backend, model_path=inference.MODEL_PATH):
+    """
+    Load the model for a backend.
+
+    Returns:
+        Callable model, or None if the weights could not be loaded
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend: {backend}. Choose from: {", ".join(BACKENDS)}')
+    inference.ensure_dependencies()
+    torch = inference.torch
+
+    if backend in ARTIFACT_SUFFIXES:
+        path = artifact_path(backend, model_path)
+        if not os.path.exists(path):
+            raise RuntimeError(f'{path} not found. Run: python ai_detection_backends.py export --backend {backend}')
+        _check_manifest(path, model_path)
+        if backend == 'torchscript':
+            model = torch.jit.load(path, map_location=inference.device)
+            model.eval()
+            return model
+        return OnnxModel(path)
+
+    model = inference.load_model(model_path, backend='eager')
+    if model is None:
+        return None
+    if backend == 'compile':
+        return torch.compile(model)
+    return model
+
+
+class _CalibrationReader:
+    """Feeds preprocessed sample images to ONNX Runtime static quantization."""
+
+    def __init__(self, image_paths, input_name):
+        self.image_paths = list(image_paths)
+        self.input_name = input_name
+        self._iter = iter(self.image_paths)
+
+    def get_next(self):
+        for image_path in self._iter:
+            try:
+                tensor = inference.preprocess_image(image_path)
+            except Exception:
+                continue
+            return {self.input_name: tensor.unsqueeze(0).numpy()}
+        return None
+
+    def rewind(self):
+        self._iter = iter(self.image_paths)
+
+
+def export(backend, model_path=inference.MODEL_PATH, samples=None, limit=100):
+    """
+    Build the artifact for a backend from the fp32 weights.
+
+    Returns:
+        str: Path to the artifact written
+    """
+    inference.ensure_dependencies()
+    torch = inference.torch
+    if backend not in ARTIFACT_SUFFIXES:
+        raise ValueError(f'{backend} has no artifact to export')
+
+    if backend in ('onnx-int8-dynamic', 'onnx-int8-static'):
+        # Quantization starts from the fp32 ONNX graph
+        fp32_path = artifact_path('onnx', model_path)
+        try:
+            _check_manifest(fp32_path, model_path)
+        except RuntimeError:
+            export('onnx', model_path)
+        from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+
+        path = artifact_path(backend, model_path)
+        prepared_path = path + '.prep.onnx'
+        quant_pre_process(fp32_path, prepared_path)
+        try:
+            if backend == 'onnx-int8-dynamic':
+                quantize_dynamic(prepared_path, path, weight_type=QuantType.QInt8)
+            else:
+                image_paths = list(inference.iter_image_paths(samples or []))[:limit]
+                if not image_paths:
+                    raise ValueError('Static quantization needs --samples images for calibration')
+                reader = _CalibrationReader(image_paths, OnnxModel(fp32_path).input_name)
+                quantize_static(prepared_path, path, reader, per_channel=True,
+                                activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+        finally:
+            if os.path.exists(prepared_path):
+                os.remove(prepared_path)
+        _write_manifest(path, backend, model_path)
+        return path
+
+    model = inference.load_model(model_path, backend='eager')
+    if model is None:
+        raise RuntimeError(f'Failed to load model: {model_path}')
+    # Export in plain NCHW so the artifact does not depend on AI_CHANNELS_LAST
+    model = model.to(memory_format=torch.contiguous_format)
+    example = torch.randn(1, 3, inference.IMG_SIZE, inference.IMG_SIZE).to(inference.device)
+    path = artifact_path(backend, model_path)
+
+    with torch.no_grad():
+        if backend == 'torchscript':
+            traced = torch.jit.freeze(torch.jit.trace(model, example))
+            torch.jit.save(traced, path)
+        else:
+            kwargs = {
+                'input_names': ['input'],
+                'output_names': ['logits'],
+                'dynamic_axes': {'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+                'opset_version': 17
+            }
+            # Newer PyTorch defaults to the dynamo exporter, which needs onnxscript
+            if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+                kwargs['dynamo'] = False
+            torch.onnx.export(model, (example,), path, **kwargs)
+
+    _write_manifest(path, backend, model_path)
+    return path
+
+
+def parity(backends, samples, model_path=inference.MODEL_PATH, limit=50, batch_size=8):
+    """
+    Compare backends against eager fp32 best_model.pth on sample images.
+
+    Returns:
+        dict: Per-backend probability drift, label agreement and latency
+    """
+    inference.ensure_dependencies()
+    torch = inference.torch
+    image_paths = list(inference.iter_image_paths(samples))[:limit]
+    tensors = []
+    for image_path in image_paths:
+        try:
+            tensors.append(inference.preprocess_image(image_path))
+        except Exception:
+            continue
+    if not tensors:
+        raise ValueError('No readable sample images')
+
+    def run(model):
+        probs = []
+        with torch.no_grad():
+            # Warm up so one-off costs (allocation, compilation) are not timed
+            model(tensors[0].unsqueeze(0).to(inference.device))
+        started = time.perf_counter()
+        with torch.no_grad():
+            for i in range(0, len(tensors), batch_size):
+                batch = torch.stack(tensors[i:i + batch_size]).to(inference.device)
+                probs.append(torch.softmax(model(batch).float(), dim=1).cpu())
+        elapsed = time.perf_counter() - started
+        return torch.cat(probs), elapsed
+
+    reference_model = load_backend('eager', model_path)
+    if reference_model is None:
+        raise RuntimeError(f'Failed to load model: {model_path}')
+    reference, reference_time = run(reference_model)
+
+    report = {
+        'samples': len(tensors),
+        'reference': {
+            'backend': 'eager',
+            'ms_per_image': round(reference_time * 1000 / len(tensors), 2)
+        },
+        'backends': {}
+    }
+    for backend in backends:
+        try:
+            probs, elapsed = run(load_backend(backend, model_path))
+        except Exception as e:
+            report['backends'][backend] = {'success': False, 'error': str(e)}
+            continue
+        drift = (probs[:, 1] - reference[:, 1]).abs()
+        report['backends'][backend] = {
+            'success': True,
+            'max_ai_probability_drift': float(drift.max()),
+            'mean_ai_probability_drift': float(drift.mean()),
+            'label_agreement': float((probs.argmax(1) == reference.argmax(1)).float().mean()),
+            'ms_per_image': round(elapsed * 1000 / len(tensors), 2),
+            'speedup': round(reference_time / elapsed, 2) if elapsed > 0 else None
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export and validate CPU inference backends')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help='Build backend artifacts from best_model.pth')
+    export_parser.add_argument('--backend', nargs='+', required=True, choices=sorted(ARTIFACT_SUFFIXES))
+    export_parser.add_argument('--samples', nargs='*', default=['uploads/deepfake_scans'],
+                               help='Calibration images for onnx-int8-static')
+    export_parser.add_argument('--limit', type=int, default=100)
+    export_parser.add_argument('--model', default=inference.MODEL_PATH)
+
+    parity_parser = sub.add_parser('parity', help='Report probability drift against eager fp32')
+    parity_parser.add_argument('--backend', nargs='+', required=True, choices=BACKENDS)
+    parity_parser.add_argument('--samples', nargs='+', default=['uploads/deepfake_scans'])
+    parity_parser.add_argument('--limit', type=int, default=50)
+    parity_parser.add_argument('--batch-size', type=int, default=8)
+    parity_parser.add_argument('--model', default=inference.MODEL_PATH)
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'export':
+            result = {
+                'success': True,
+                'artifacts': {backend: export(backend, args.model, args.samples, args.limit)
+                              for backend in args.backend}
+            }
+        else:
+            result = {'success': True}
+            result.update(parity(args.backend, args.samples, args.model, args.limit, args.batch_size))
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
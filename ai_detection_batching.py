@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Dynamic micro-batching for AI vs Human image detection.
+Queues preprocessed images from many callers and runs one forward pass per
+batch, bounded by a maximum batch size and a maximum wait time.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Defaults, overridable per deployment to trade p99 latency against throughput
+MAX_BATCH_SIZE = int(os.environ.get('AI_BATCH_MAX_SIZE', 8))
+MAX_WAIT_MS = float(os.environ.get('AI_BATCH_MAX_WAIT_MS', 10))
+
+
+class MicroBatcher:
+    """
+    Groups queued inputs into batches for a single worker thread.
+
+    Args:
+        predict_fn: Callable taking a list of inputs and returning one result per input
+        max_batch_size: Largest batch passed to predict_fn
+        max_wait_ms: Longest time the first queued input waits for others to join it
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.batches_run = 0
+        self.items_run = 0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queue one input and return a Future resolving to its result."""
+        if self._stopped.is_set():
+            raise RuntimeError('MicroBatcher is stopped')
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, item, timeout=None):
+        """Queue one input and block until its result is ready."""
+        return self.submit(item).result(timeout=timeout)
+
+    def stop(self):
+        """Stop the worker after the batch in progress."""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches_run': self.batches_run,
+            'items_run': self.items_run,
+            'mean_batch_size': (self.items_run / self.batches_run) if self.batches_run else 0.0,
+            'queued': self._queue.qsize()
+        }
+
+    def _collect(self, first):
+        """Gather up to max_batch_size entries, waiting at most max_wait after the first."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Stop sentinel: finish this batch, then exit
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            try:
+                results = self.predict_fn(items)
+            except Exception as e:
+                results = [{'success': False, 'error': str(e)} for _ in items]
+
+            self.batches_run += 1
+            self.items_run += len(items)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+        # Fail anything still queued so callers don't wait forever
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not None:
+                entry[1].set_result({'success': False, 'error': 'Inference scheduler stopped'})
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+AI vs Human Image Detection Inference Server
+Keeps the trained model loaded and warm between requests instead of spawning
+ai_detection_inference.py (and re-importing torch/timm) for every image.
+
+Usage:
+    python ai_detection_server.py --port 8765
+    python ai_detection_server.py --socket /tmp/ai_detection.sock
+
+Endpoints:
+    POST /predict   JSON {"image_path": "..."} or raw image bytes in the body
+    GET  /health    Model and server status
+    GET  /metrics   Per-stage latency histograms (Prometheus text format)
+    POST /reload    Reload the weights file now
+"""
+
+import argparse
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ai_detection_inference as inference
+import metrics
+from ai_detection_batching import MAX_BATCH_SIZE, MAX_WAIT_MS, MicroBatcher
+
+# Largest request body accepted (matches MAX_CONTENT_LENGTH in app.py)
+MAX_BODY_SIZE = 50 * 1024 * 1024
+
+
+class ModelHolder:
+    """Owns the loaded model and swaps it in place when the weights file changes."""
+
+    def __init__(self, model_path=inference.MODEL_PATH, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.model_path = model_path
+        self.model = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.last_error = None
+        self.model_digest = None
+        self._mtime = None
+        self._reload_lock = threading.Lock()
+        # Concurrent requests share forward passes instead of taking turns
+        self.batcher = MicroBatcher(self._predict_batch, max_batch_size, max_wait_ms)
+
+    def _weights_mtime(self):
+        try:
+            return os.stat(self.model_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self):
+        """Load and verify the weights, then swap them in. The old model keeps serving on failure."""
+        with self._reload_lock:
+            mtime = self._weights_mtime()
+            if mtime is None:
+                self.last_error = f'Model file not found: {self.model_path}'
+                return False
+
+            try:
+                model_digest = inference.model_fingerprint(self.model_path) if inference.CACHE_ENABLED else None
+            except OSError as e:
+                self.last_error = str(e)
+                return False
+            model = inference.load_model(self.model_path)
+            if model is None:
+                self.last_error = f'Failed to load model: {self.model_path}'
+                return False
+            try:
+                inference.verify_model(model)
+            except Exception as e:
+                self.last_error = str(e)
+                return False
+
+            # Swapping the reference is atomic; in-flight requests finish on the old model
+            if self.model is not None:
+                self.reloads += 1
+            # Cache keys include the digest, so old verdicts stop matching here
+            self.model = model
+            self.model_digest = model_digest
+            self._mtime = mtime
+            self.loaded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.last_error = None
+            return True
+
+    def reload_if_changed(self):
+        """
+        Reload when the weights file has a new mtime.
+        
+        Returns:
+            None if nothing changed, otherwise whether the reload succeeded
+        """
+        mtime = self._weights_mtime()
+        if mtime is None or mtime == self._mtime:
+            return None
+        # Let a copy in progress finish before reading the file
+        time.sleep(0.5)
+        if self._weights_mtime() != mtime:
+            return None
+        return self.load()
+
+    def watch(self, interval):
+        """Poll the weights file forever (run in a daemon thread)."""
+        while True:
+            time.sleep(interval)
+            reloaded = self.reload_if_changed()
+            if reloaded:
+                print(f'Reloaded model from {self.model_path}', file=sys.stderr)
+            elif reloaded is False:
+                print(f'Model reload failed: {self.last_error}', file=sys.stderr)
+
+    def _predict_batch(self, input_tensors):
+        model = self.model
+        if model is None:
+            raise RuntimeError(self.last_error or 'Model not loaded')
+        return inference.predict_batch(model, input_tensors)
+
+    def predict(self, image):
+        """
+        Predict a path or binary file-like object.
+        
+        Cached verdicts are returned without touching the model. Otherwise
+        decoding runs on the calling thread and the forward pass is batched
+        with other in-flight requests.
+        """
+        if self.model is None:
+            return {
+                'success': False,
+                'error': self.last_error or 'Model not loaded'
+            }
+        try:
+            if isinstance(image, str):
+                with open(image, 'rb') as f:
+                    image_bytes = f.read()
+            else:
+                image_bytes = image.read()
+            
+            key = None
+            model_digest = self.model_digest
+            if model_digest is not None:
+                key = inference.verdict_cache_key(image_bytes, model_digest)
+                cached = inference.get_cached_verdict(key)
+                if cached is not None:
+                    return cached
+            
+            timings = {} if inference.TIMINGS else None
+            input_tensor = inference.preprocess_image(io.BytesIO(image_bytes), timings=timings)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        result = self.batcher.predict(input_tensor)
+        if key is not None:
+            inference.store_verdict(key, result)
+        if timings is not None and 'timings' in result:
+            # Forward/postprocess come from the batch this request joined
+            result['timings'] = dict(timings, **result['timings'])
+        return result
+
+    def status(self):
+        return {
+            'success': self.model is not None,
+            'model_path': self.model_path,
+            'model_loaded': self.model is not None,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'last_error': self.last_error,
+            'device': str(inference.device),
+            'batching': self.batcher.stats(),
+            'cache': inference.get_verdict_cache().stats() if inference.CACHE_ENABLED else None
+        }
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler returning the same JSON schema as the inference script."""
+
+    server_version = 'AIDetectionServer/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_SIZE:
+            return None
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        if self.path == '/health':
+            holder = self.server.holder
+            self._send_json(holder.status(), 200 if holder.model is not None else 503)
+        elif self.path == '/metrics':
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json({'success': False, 'error': 'Not found'}, 404)
+
+    def do_POST(self):
+        holder = self.server.holder
+        body = self._read_body()
+        if body is None:
+            self.close_connection = True
+            self._send_json({'success': False, 'error': 'File too large. Maximum size is 50MB'}, 413)
+            return
+
+        if self.path == '/reload':
+            if holder.load():
+                self._send_json(holder.status())
+            else:
+                self._send_json({'success': False, 'error': holder.last_error}, 500)
+            return
+
+        if self.path != '/predict':
+            self._send_json({'success': False, 'error': 'Not found'}, 404)
+            return
+
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/json'):
+            try:
+                image_path = json.loads(body or b'{}').get('image_path', '')
+            except (ValueError, AttributeError):
+                self._send_json({'success': False, 'error': 'Invalid JSON body'}, 400)
+                return
+            if not image_path:
+                self._send_json({'success': False, 'error': 'No image path provided'}, 400)
+                return
+            if not os.path.exists(image_path):
+                self._send_json({'success': False, 'error': f'Image file not found: {image_path}'}, 404)
+                return
+            image = image_path
+        elif body:
+            image = io.BytesIO(body)
+        else:
+            self._send_json({'success': False, 'error': 'No image provided'}, 400)
+            return
+
+        result = holder.predict(image)
+        self._send_json(result, 200 if result.get('success') else 500)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return self.client_address[0]
+        return 'unix'
+
+    def log_message(self, format, *args):
+        if inference.DEBUG:
+            super().log_message(format, *args)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a local Unix socket."""
+
+    daemon_threads = True
+
+
+def create_server(holder, host='127.0.0.1', port=8765, socket_path=None):
+    """Create an HTTP server bound to a TCP port or a Unix socket."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, InferenceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), InferenceRequestHandler)
+        server.daemon_threads = True
+    server.holder = holder
+    return server
+
+
+def main():
+    """Load the model once and serve predictions until interrupted."""
+    parser = argparse.ArgumentParser(description='Persistent AI vs Human image detection server')
+    parser.add_argument('--host', default=os.environ.get('AI_SERVER_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('AI_SERVER_PORT', 8765)))
+    parser.add_argument('--socket', default=os.environ.get('AI_SERVER_SOCKET'),
+                        help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--model', default=inference.MODEL_PATH)
+    parser.add_argument('--reload-interval', type=float, default=5.0,
+                        help='Seconds between checks of the weights file (0 disables)')
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help='Largest number of images per forward pass')
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help='Longest time a request waits for others to share its batch')
+    args = parser.parse_args()
+
+    holder = ModelHolder(args.model, args.max_batch_size, args.max_wait_ms)
+    if not holder.load():
+        print(json.dumps({'success': False, 'error': holder.last_error}))
+        sys.exit(1)
+
+    if args.reload_interval > 0:
+        threading.Thread(target=holder.watch, args=(args.reload_interval,), daemon=True).start()
+
+    # SIGHUP forces a reload without restarting the server
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(target=holder.load, daemon=True).start())
+
+    server = create_server(holder, args.host, args.port, args.socket)
+    where = args.socket or f'http://{args.host}:{args.port}'
+    print(f'AI detection server listening on {where}', file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+AI vs Human Video Detection
+Samples frames from a video as it is decoded, scores them in batches with the
+image model from ai_detection_inference.py and aggregates the per-frame
+probabilities into a clip verdict. Scanning stops early once the verdict is
+confident enough, so long clips do not cost linear time.
+
+Usage:
+    python ai_detection_video.py clip.mp4
+    python ai_detection_video.py clip.mp4 --sample-fps 2 --scene-threshold 0.3 --early-exit 0.9
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import ai_detection_inference as inference
+
+# Sampling and early-exit defaults
+SAMPLE_FPS = float(os.environ.get('AI_VIDEO_SAMPLE_FPS', 1.0))
+BATCH_SIZE = int(os.environ.get('AI_VIDEO_BATCH_SIZE', 8))
+EARLY_EXIT_CONFIDENCE = float(os.environ.get('AI_VIDEO_EARLY_EXIT', 0.9))
+MIN_FRAMES = int(os.environ.get('AI_VIDEO_MIN_FRAMES', 8))
+MAX_FRAMES = int(os.environ.get('AI_VIDEO_MAX_FRAMES', 300))
+
+
+def iter_frames(video_path, sample_fps=SAMPLE_FPS, scene_threshold=None, stop_event=None):
+    """
+    Decode a video sequentially and yield sampled frames.
+
+    Args:
+        video_path: Path to the video file
+        sample_fps: Frames per second of video to consider
+        scene_threshold: If set, only keep a sampled frame when its colour
+                         histogram differs from the last kept frame by more
+                         than this Bhattacharyya distance (0-1)
+        stop_event: threading.Event that ends decoding early
+
+    Yields:
+        tuple: (frame_index, timestamp_seconds, RGB uint8 array)
+    """
+    inference.ensure_dependencies()
+    cv2 = inference.ensure_opencv()
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f'Could not open video: {video_path}')
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+        last_hist = None
+        index = -1
+        while stop_event is None or not stop_event.is_set():
+            # grab() advances without the colour conversion retrieve() does
+            if not capture.grab():
+                break
+            index += 1
+            if index % step:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+
+            if scene_threshold is not None:
+                small = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+                hist = cv2.calcHist([small], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+                cv2.normalize(hist, hist)
+                if last_hist is not None and cv2.compareHist(last_hist, hist, cv2.HISTCMP_BHATTACHARYYA) < scene_threshold:
+                    continue
+                last_hist = hist
+
+            yield index, index / fps, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    finally:
+        capture.release()
+
+
+def video_info(video_path):
+    """Frame rate, frame count and duration reported by the container."""
+    inference.ensure_dependencies()
+    cv2 = inference.ensure_opencv()
+    capture = cv2.VideoCapture(video_path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    finally:
+        capture.release()
+    return {
+        'fps': fps,
+        'frame_count': frame_count,
+        'duration_seconds': (frame_count / fps) if fps else None
+    }
+
+
+def _put(frames, item, stop_event):
+    """Queue an item unless the consumer has stopped (so the worker never blocks forever)."""
+    while not stop_event.is_set():
+        try:
+            frames.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_worker(video_path, frames, stop_event, sample_fps, scene_threshold, max_frames):
+    """Decode and preprocess frames ahead of the model on a background thread."""
+    try:
+        produced = 0
+        for index, timestamp, frame in iter_frames(video_path, sample_fps, scene_threshold, stop_event):
+            if produced >= max_frames:
+                break
+            if not _put(frames, (index, timestamp, inference.normalize_into(frame)), stop_event):
+                return
+            produced += 1
+        _put(frames, None, stop_event)
+    except Exception as e:
+        _put(frames, e, stop_event)
+
+
+def predict_video(model, video_path, sample_fps=SAMPLE_FPS, scene_threshold=None,
+                  batch_size=BATCH_SIZE, early_exit=EARLY_EXIT_CONFIDENCE,
+                  min_frames=MIN_FRAMES, max_frames=MAX_FRAMES):
+    """
+    Predict if a video is AI-generated from sampled frames.
+
+    Args:
+        model: Loaded model (see ai_detection_inference.load_model)
+        video_path: Path to the video file
+        sample_fps: Frames per second of video to score
+        scene_threshold: Only score frames after a scene change (see iter_frames)
+        batch_size: Frames per forward pass
+        early_exit: Stop once the running mean probability of either class
+                    reaches this value (1.0 or above disables early exit)
+        min_frames: Frames scored before early exit is considered
+        max_frames: Upper bound on frames scored
+
+    Returns:
+        dict: Clip verdict in the image result schema, plus per-frame scores
+    """
+    started = time.perf_counter()
+    try:
+        info = video_info(video_path)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+    frames = queue.Queue(maxsize=batch_size * 2)
+    stop_event = threading.Event()
+    worker = threading.Thread(target=_decode_worker, daemon=True,
+                              args=(video_path, frames, stop_event, sample_fps, scene_threshold, max_frames))
+    worker.start()
+
+    scored = []
+    ai_total = 0.0
+    early_exited = False
+    finished = False
+    error = None
+    try:
+        while not finished and not early_exited:
+            batch = []
+            while len(batch) < batch_size:
+                item = frames.get()
+                if item is None:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    error = str(item)
+                    finished = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
+
+            try:
+                results = inference.predict_batch(model, [tensor for _, _, tensor in batch])
+            except Exception as e:
+                return {'success': False, 'error': f'Inference failed: {str(e)}'}
+            for (index, timestamp, _), result in zip(batch, results):
+                ai_probability = result['probabilities']['ai']
+                ai_total += ai_probability
+                scored.append({
+                    'frame': index,
+                    'timestamp': round(timestamp, 3),
+                    'ai': ai_probability
+                })
+
+            mean_ai = ai_total / len(scored)
+            if len(scored) >= min_frames and max(mean_ai, 1.0 - mean_ai) >= early_exit:
+                early_exited = True
+    finally:
+        # Stop the decoder and let it release the capture before returning
+        stop_event.set()
+        worker.join(timeout=5)
+
+    if not scored:
+        return {
+            'success': False,
+            'error': error or f'No frames could be decoded from: {video_path}'
+        }
+
+    mean_ai = ai_total / len(scored)
+    label = 1 if mean_ai >= 0.5 else 0
+    result = {
+        'success': True,
+        'label': label,
+        'label_name': 'AI-generated' if label == 1 else 'Human-generated',
+        'confidence': mean_ai if label == 1 else 1.0 - mean_ai,
+        'probabilities': {
+            'human': 1.0 - mean_ai,
+            'ai': mean_ai
+        },
+        'frame_statistics': {
+            'frames_scored': len(scored),
+            'max_ai': max(frame['ai'] for frame in scored),
+            'min_ai': min(frame['ai'] for frame in scored),
+            'ai_frame_ratio': sum(1 for frame in scored if frame['ai'] >= 0.5) / len(scored),
+            'scanned_until_seconds': scored[-1]['timestamp'],
+            'early_exit': early_exited
+        },
+        'video': info,
+        'frames': scored,
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }
+    if error:
+        # Decoding failed part-way; the verdict covers the frames before it
+        result['warning'] = error
+    return result
+
+
+def main():
+    """Main function to handle command-line arguments."""
+    parser = argparse.ArgumentParser(description='AI vs Human video detection by frame sampling')
+    parser.add_argument('video_path', help='Video to classify')
+    parser.add_argument('--sample-fps', type=float, default=SAMPLE_FPS,
+                        help='Frames per second of video to score')
+    parser.add_argument('--scene-threshold', type=float, default=None,
+                        help='Only score frames after a scene change of this histogram distance (0-1)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--early-exit', type=float, default=EARLY_EXIT_CONFIDENCE,
+                        help='Stop once mean confidence reaches this value (>= 1 disables)')
+    parser.add_argument('--min-frames', type=int, default=MIN_FRAMES)
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    parser.add_argument('--no-frames', action='store_true', help='Omit per-frame scores from the output')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.video_path):
+        print(json.dumps({
+            'success': False,
+            'error': f'Video file not found: {args.video_path}'
+        }))
+        sys.exit(1)
+
+    model = inference.load_model_or_exit()
+    result = predict_video(model, args.video_path, args.sample_fps, args.scene_threshold,
+                           max(1, args.batch_size), args.early_exit, args.min_frames, args.max_frames)
+    if args.no_frames:
+        result.pop('frames', None)
+
+    print(json.dumps(result), file=sys.stdout, flush=True)
+    sys.exit(0 if result.get('success', False) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -117,8 +117,9 @@ class OSINTToolsAPI {
         if (isset($result['platforms']) && is_array($result['platforms'])) {
             $totalChecked = count($result['platforms']);
             foreach ($result['platforms'] as $platform) {
-                // Preserve all platforms with their status (used, not_used, rate_limit)
-                // The Python script returns: status='used'/'not_used'/'rate_limit'
+                // Preserve all platforms with their status (used, not_used, rate_limit, error)
+                // The Python script returns: status='used'/'not_used'/'rate_limit'/'error'
+                // ('error' is a site that timed out or failed)
                 $status = $platform['status'] ?? 'unknown';
                 $isRegistered = ($status === 'used');
                 
@@ -175,7 +176,8 @@ class OSINTToolsAPI {
             'total_checked' => $totalChecked,
             'used_count' => $registeredCount,
             'not_used_count' => count(array_filter($platforms, function($p) { return ($p['status'] ?? '') === 'not_used'; })),
-            'rate_limit_count' => count(array_filter($platforms, function($p) { return ($p['status'] ?? '') === 'rate_limit'; }))
+            'rate_limit_count' => count(array_filter($platforms, function($p) { return ($p['status'] ?? '') === 'rate_limit'; })),
+            'error_count' => count(array_filter($platforms, function($p) { return ($p['status'] ?? '') === 'error'; }))
         ];
         
         // Determine if it's a real person or burner email
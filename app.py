@@ -5,14 +5,32 @@ Main application server for Render deployment
 """
 
 import os
+import io
+import csv
 import json
-import requests
-from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for
+import time
+import threading
+import zlib
+from flask import (Flask, Response, render_template, request, jsonify, session, redirect,
+                   stream_with_context, url_for)
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
-import tempfile
 from datetime import datetime
 
+from sightengine_client import (CACHE_UPLOAD_TTL, CACHE_URL_TTL, SIGHTENGINE_API_SECRET, SIGHTENGINE_API_USER,
+                                SightengineError, cached_response, get_client as get_sightengine_client,
+                                get_response_cache, store_response, upload_cache_key, url_cache_key)
+from upload_spool import SpooledRequest, spool_stats
+from jobs import FINISHED_STATES, QueueFullError, get_manager as get_job_manager
+from scammer_index import NORMALIZERS, build_index, build_lookup, load_database_records
+from pagination import decode_cursor, page_args, paged_response, project, request_param, text_param
+from osint_index import build_osint_index
+from osint_feed import ThreatFeed
+from static_assets import StaticIndex
+from page_cache import PageCache, TranslationCatalog
+from stats_store import StatsStore
+import metrics
+
 # Try to import CORS, make it optional
 try:
     from flask_cors import CORS
@@ -21,15 +39,92 @@ except ImportError:
     cors_available = False
     print("Warning: flask-cors not available. CORS support disabled.")
 
+# Static files are served by serve_static() from STATIC_INDEX, not Flask's static route
 app = Flask(__name__, 
-            static_folder='.',
-            static_url_path='',
+            static_folder=None,
             template_folder='templates')
 
+# Buffer uploads in memory up to UPLOAD_SPOOL_MAX_MEMORY, spilling to a unique temp file beyond it
+app.request_class = SpooledRequest
+
+# Index of servable files, built once at startup (see static_assets.py)
+STATIC_INDEX = StaticIndex()
+app.jinja_env.globals['asset_url'] = STATIC_INDEX.asset_url
+
 # Enable CORS if available
 if cors_available:
     CORS(app)
 
+# Request metrics (exported at /metrics); HTTP_METRICS=0 turns the middleware off
+HTTP_METRICS = os.environ.get('HTTP_METRICS', '1').lower() not in ('0', 'false', 'no')
+REQUEST_SECONDS = metrics.Histogram('http_request_duration_seconds',
+                                    'Time until the response is handed to the server (streamed bodies excluded)',
+                                    ('route', 'method'))
+REQUESTS = metrics.Counter('http_requests_total', 'Requests by route, method and status', ('route', 'method', 'status'))
+IN_FLIGHT = metrics.Gauge('http_requests_in_flight', 'Requests currently being handled')
+UPLOAD_BYTES = metrics.Counter('http_request_body_bytes_total', 'Request body bytes received', ('route',))
+
+
+class MetricsRequest(SpooledRequest):
+    """SpooledRequest that also keeps its matched URL rule in the WSGI environ."""
+    
+    # Flask drops the request object before the WSGI call returns, so the
+    # middleware reads the rule from environ['app.url_rule'] instead
+    @property
+    def url_rule(self):
+        return self.environ.get('app.url_rule')
+    
+    @url_rule.setter
+    def url_rule(self, rule):
+        self.environ['app.url_rule'] = rule
+
+
+class RequestMetricsMiddleware:
+    """
+    WSGI wrapper recording request count, latency, in-flight requests and body bytes
+    
+    A single wrapper costs less per request than Flask before/after/teardown
+    hooks (see scripts/benchmark_metrics.py). Latency ends when the response
+    is handed to the server, so streamed bodies are not included.
+    """
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        status = []
+        
+        def capture_status(status_line, headers, exc_info=None):
+            status.append(status_line)
+            return start_response(status_line, headers, exc_info)
+        
+        # Parsed up front so a malformed header cannot raise from the finally below
+        try:
+            body_bytes = max(0, int(environ.get('CONTENT_LENGTH') or 0))
+        except ValueError:
+            body_bytes = 0
+        
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            return self.wsgi_app(environ, capture_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            # Label by URL rule, not path, so series stay bounded
+            rule = environ.get('app.url_rule')
+            route = rule.rule if rule is not None else '<unmatched>'
+            method = environ.get('REQUEST_METHOD', '')
+            REQUEST_SECONDS.observe(elapsed, route=route, method=method)
+            REQUESTS.inc(route=route, method=method, status=status[-1][:3] if status else '500')
+            if body_bytes:
+                UPLOAD_BYTES.inc(body_bytes, route=route)
+
+
+if HTTP_METRICS:
+    app.request_class = MetricsRequest
+    app.wsgi_app = RequestMetricsMiddleware(app.wsgi_app)
+
 # Configuration
 app.secret_key = os.environ.get('ENCRYPTION_KEY', 'petronas_secure_key_2024')
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
@@ -40,10 +135,9 @@ os.makedirs('uploads/deepfake_scans', exist_ok=True)
 os.makedirs('uploads/evidence', exist_ok=True)
 os.makedirs('uploads/test_ai_detection', exist_ok=True)
 
-# Sightengine API Configuration
-SIGHTENGINE_API_USER = os.environ.get('SIGHTENGINE_API_USER', '1931720966')
-SIGHTENGINE_API_SECRET = os.environ.get('SIGHTENGINE_API_SECRET', 'Ey7EbcJMjAtQZDiD38xLtyXvJrqpCVmw')
-SIGHTENGINE_API_URL = 'https://api.sightengine.com/1.0/check.json'
+# Sightengine API Configuration (credentials and SIGHTENGINE_API_URL come from
+# the environment; see sightengine_client.py for pooling, retry and rate limits)
+SIGHTENGINE_MODELS = 'deepfake,face-attributes'
 
 # Fake data (matching PHP version)
 FAKE_SCAMMERS = [
@@ -95,6 +189,80 @@ FAKE_OSINT_DATA = [
     }
 ]
 
+# Substring index over FAKE_SCAMMERS and data/scammer-database.json, built once at startup
+SCAMMER_DATABASE_PATH = os.environ.get('SCAMMER_DATABASE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'scammer-database.json'))
+SCAMMER_DATABASE_RECORDS = load_database_records(SCAMMER_DATABASE_PATH)
+SCAMMER_INDEX = build_index(FAKE_SCAMMERS, SCAMMER_DATABASE_RECORDS)
+# Exact-match hash tables for bulk phone/email/account screening
+SCAMMER_LOOKUP = build_lookup(FAKE_SCAMMERS, SCAMMER_DATABASE_RECORDS)
+
+
+# Dashboard counters, updated as records are added. Scammer and threat counts
+# are recounted from the lists on start; report and scan counts are restored from disk
+STATS = StatsStore()
+for scammer in FAKE_SCAMMERS:
+    STATS.record_scammer(scammer)
+if not STATS.restored:
+    # Counts that predate the store
+    STATS.add('total_reports', 1247)
+    STATS.add('deepfakes_detected', 89)
+
+# Translations from translations/*.json (reloaded on change) and rendered template pages
+TRANSLATIONS = TranslationCatalog()
+PAGE_CACHE = PageCache(TRANSLATIONS)
+
+
+SCAM_TYPES = ('phishing', 'romance', 'investment', 'lottery', 'job', 'shopping', 'cryptocurrency', 'other')
+# Serializes id assignment and the duplicate check of add-scammer reports
+_scammer_add_lock = threading.RLock()
+
+
+def add_scammer(scammer):
+    """Add a scammer record (id assigned here) and index it without rebuilding"""
+    with _scammer_add_lock:
+        scammer['id'] = FAKE_SCAMMERS[-1]['id'] + 1 if FAKE_SCAMMERS else 1
+        FAKE_SCAMMERS.append(scammer)
+        SCAMMER_INDEX.add_scammer(scammer)
+        SCAMMER_LOOKUP.add_scammer(scammer)
+    STATS.record_scammer(scammer)
+    return scammer
+
+
+def find_reported_scammer(email=None, phone=None):
+    """An already reported scammer with this exact email or phone, or None"""
+    for kind, value in (('email', email), ('phone', phone)):
+        if value:
+            _, _, records = SCAMMER_LOOKUP.lookup(value, kind)
+            for record in records:
+                if record['type'] == 'scammer':
+                    return record
+    return None
+
+
+# Sequence-numbered feed over FAKE_OSINT_DATA for delta sync (/api/osint-feed)
+OSINT_FEED = ThreatFeed(FAKE_OSINT_DATA)
+# Ranked keyword index over FAKE_OSINT_DATA for search_threats
+OSINT_INDEX = build_osint_index(FAKE_OSINT_DATA)
+for threat in FAKE_OSINT_DATA:
+    STATS.record_threat(threat)
+
+
+OSINT_THREAT_LEVELS = ('low', 'medium', 'high', 'critical')
+# Lifetime of one /api/osint-feed/events connection before the client reconnects
+OSINT_STREAM_SECONDS = float(os.environ.get('OSINT_STREAM_SECONDS', 60))
+# Serializes id assignment so threat ids stay in collection order
+_osint_add_lock = threading.Lock()
+
+
+def add_osint_threat(threat):
+    """Add a collected threat, index it without rebuilding and notify feed listeners"""
+    with _osint_add_lock:
+        threat['id'] = FAKE_OSINT_DATA[-1]['id'] + 1 if FAKE_OSINT_DATA else 1
+        OSINT_INDEX.add(threat)
+        OSINT_FEED.add(threat)
+    STATS.record_threat(threat)
+    return threat
+
 
 def get_base_url():
     """Get base URL for the application"""
@@ -102,24 +270,34 @@ def get_base_url():
     return f"{protocol}://{request.host}"
 
 
+def render_page(route, template, data_version=None, **context):
+    """Render a template page once per (route, language, base URL, data version) and serve it from PAGE_CACHE"""
+    lang = session.get('language', 'en')
+    base_url = get_base_url()
+    html, etag = PAGE_CACHE.get_or_render(route, lang, base_url, lambda: render_template(
+        template,
+        lang=lang,
+        base_url=base_url,
+        translations=get_translations(lang),
+        **context), data_version)
+    response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    # The language comes from the session cookie
+    response.vary.add('Cookie')
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/')
 def index():
     """Main index page"""
-    lang = session.get('language', 'en')
-    base_url = get_base_url()
-    
-    stats = {
-        'total_scammers': len(FAKE_SCAMMERS),
-        'verified_scammers': len([s for s in FAKE_SCAMMERS if s['verification_status'] == 'verified']),
-        'total_reports': 1247,
-        'deepfakes_detected': 89
-    }
-    
-    return render_template('index.html', 
-                         lang=lang, 
-                         base_url=base_url,
-                         stats=stats,
-                         translations=get_translations(lang))
+    return render_page('index', 'index.html', data_version=STATS.version, stats=STATS.snapshot())
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Request, Sightengine upstream and other registered metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/api/status.php')
@@ -139,7 +317,17 @@ def status():
             'gemini': True,
             'python': python_available
         },
-        'overall': 'healthy' if SIGHTENGINE_API_USER and SIGHTENGINE_API_SECRET else 'degraded'
+        'overall': 'healthy' if SIGHTENGINE_API_USER and SIGHTENGINE_API_SECRET else 'degraded',
+        'sightengine_client': get_sightengine_client().stats(),
+        'sightengine_cache': sightengine_cache_stats(),
+        'uploads': spool_stats(),
+        'static': STATIC_INDEX.stats(),
+        'pages': PAGE_CACHE.stats(),
+        'requests': {
+            'in_flight': sum(IN_FLIGHT.snapshot().values()),
+            'total': sum(REQUESTS.snapshot().values())
+        },
+        'jobs': get_job_manager().stats()
     }
     
     return jsonify(status_data)
@@ -149,7 +337,7 @@ def status():
 @app.route('/api/sightengine', methods=['POST'])
 def sightengine_api():
     """Sightengine API wrapper"""
-    action = request.form.get('action') or request.json.get('action', '') if request.is_json else ''
+    action = request.form.get('action') or (request.json.get('action', '') if request.is_json else '')
     
     if action == 'analyze_upload':
         if 'media' not in request.files:
@@ -159,19 +347,13 @@ def sightengine_api():
         if file.filename == '':
             return jsonify({'success': False, 'error': 'No file selected'}), 400
         
-        # Save temporarily
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(tempfile.gettempdir(), filename)
-        file.save(temp_path)
-        
+        # Stream the already-spooled upload to Sightengine (no second temp copy)
         try:
-            result = analyze_with_sightengine(temp_path, is_url=False)
+            result = analyze_with_sightengine(file.stream, is_url=False,
+                                              filename=secure_filename(file.filename) or 'media')
             return jsonify({'success': True, 'result': result})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
     
     elif action == 'analyze_url':
         url = request.form.get('url') or (request.json.get('url', '') if request.is_json else '')
@@ -188,132 +370,585 @@ def sightengine_api():
         return jsonify({'success': False, 'error': 'Invalid action. Use "analyze_upload" or "analyze_url"'}), 400
 
 
-def analyze_with_sightengine(media_path_or_url, is_url=False):
-    """Analyze media using Sightengine API"""
+def analyze_with_sightengine(media, is_url=False, filename=None):
+    """
+    Analyze media using Sightengine API
+    
+    Args:
+        media: URL (is_url=True), file path, or seekable binary stream
+        is_url: Whether media is a public URL
+        filename: Filename sent with a stream upload
+    """
+    client = get_sightengine_client()
     try:
         if is_url:
-            params = {
-                'api_user': SIGHTENGINE_API_USER,
-                'api_secret': SIGHTENGINE_API_SECRET,
-                'url': media_path_or_url,
-                'models': 'deepfake,face-attributes'
-            }
-            response = requests.get(SIGHTENGINE_API_URL, params=params, timeout=60)
-        else:
-            with open(media_path_or_url, 'rb') as f:
-                files = {'media': f}
-                data = {
-                    'api_user': SIGHTENGINE_API_USER,
-                    'api_secret': SIGHTENGINE_API_SECRET,
-                    'models': 'deepfake,face-attributes'
-                }
-                response = requests.post(SIGHTENGINE_API_URL, files=files, data=data, timeout=60)
+            key = url_cache_key(media, SIGHTENGINE_MODELS)
+            result = cached_response(key)
+            cached = result is not None
+            if not cached:
+                result = client.check_url(media, SIGHTENGINE_MODELS)
+                store_response(key, result, CACHE_URL_TTL)
+            STATS.record_scan(result, cached=cached)
+            return result
+        if isinstance(media, str):
+            with open(media, 'rb') as f:
+                return analyze_with_sightengine(f, filename=os.path.basename(media))
         
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        # Identical bytes with the same models always get the same answer
+        key = upload_cache_key(media, SIGHTENGINE_MODELS)
+        result = cached_response(key)
+        cached = result is not None
+        if not cached:
+            result = client.check_file(media, SIGHTENGINE_MODELS, filename or 'media')
+            store_response(key, result, CACHE_UPLOAD_TTL)
+        STATS.record_scan(result, cached=cached)
+        return result
+    except SightengineError as e:
         raise Exception(f'Sightengine API error: {str(e)}')
 
 
+def sightengine_cache_stats():
+    """Response cache counters; every hit is one Sightengine call not paid for"""
+    cache = get_response_cache()
+    if cache is None:
+        return {'enabled': False}
+    stats = cache.stats()
+    stats.update({
+        'enabled': True,
+        'api_calls_saved': stats['hits'],
+        'url_ttl_seconds': CACHE_URL_TTL,
+        'upload_ttl_seconds': CACHE_UPLOAD_TTL
+    })
+    return stats
+
+
+@app.route('/api/jobs/sightengine.php', methods=['POST'])
+@app.route('/api/jobs/sightengine', methods=['POST'])
+def submit_sightengine_job():
+    """Queue a Sightengine analysis and return 202 with the job id (same form fields as /api/sightengine)"""
+    action = request.form.get('action') or (request.json.get('action', '') if request.is_json else '')
+    
+    if action == 'analyze_upload':
+        if 'media' not in request.files:
+            return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+        file = request.files['media']
+        if file.filename == '':
+            return jsonify({'success': False, 'error': 'No file selected'}), 400
+        
+        # Take ownership of the spooled upload so it outlives this request
+        # (Werkzeug closes request.files when the request ends)
+        media = file.stream
+        file.stream = None
+        job_args = (media, False, secure_filename(file.filename) or 'media')
+        # The job manager closes it once the job is done with it, even if it never runs
+        cleanup = media.close
+    elif action == 'analyze_url':
+        url = request.form.get('url') or (request.json.get('url', '') if request.is_json else '')
+        if not url:
+            return jsonify({'success': False, 'error': 'No URL provided'}), 400
+        job_args = (url, True)
+        cleanup = None
+    else:
+        return jsonify({'success': False, 'error': 'Invalid action. Use "analyze_upload" or "analyze_url"'}), 400
+    
+    try:
+        job = get_job_manager().submit('sightengine', analyze_with_sightengine, *job_args, cleanup=cleanup)
+    except QueueFullError as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    status_url = url_for('get_job', job_id=job.id)
+    response = jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': status_url,
+        'events_url': url_for('job_events', job_id=job.id)
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Poll a job. Pass ?wait=<seconds> (max 30) to long-poll until it changes state"""
+    manager = get_job_manager()
+    wait = min(request.args.get('wait', 0, type=float), 30.0)
+    job = manager.wait(job_id, wait) if wait > 0 else manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events: a 'status' event per state change, ending with the final state"""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    
+    def stream(job):
+        last_status = None
+        # Comment lines keep proxies from closing an idle stream
+        while True:
+            if job['status'] != last_status:
+                last_status = job['status']
+                event = 'result' if last_status in FINISHED_STATES else 'status'
+                yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+                if event == 'result':
+                    return
+            else:
+                yield ': keep-alive\n\n'
+            job = manager.wait(job_id, 15.0)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Job not found or expired'})}\n\n"
+                return
+    
+    return Response(stream(job), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/stats.php')
+@app.route('/api/stats')
+def dashboard_stats():
+    """Dashboard aggregates (maintained incrementally; the ETag is a digest of the aggregates)"""
+    stats, etag = STATS.snapshot_with_etag()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({'success': True, 'stats': stats})
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
 @app.route('/api/scammer-search.php', methods=['GET', 'POST'])
 @app.route('/api/scammer-search', methods=['GET', 'POST'])
 def scammer_search():
-    """Search scammers"""
-    query = request.args.get('q') or request.form.get('q') or request.json.get('q', '') if request.is_json else ''
+    """
+    Search scammers
+    
+    Paginated with limit/cursor (or offset), fields= projection, and
+    format=ndjson to stream every match.
+    """
+    if request_param('action') == 'stats':
+        return jsonify({'success': True, 'stats': STATS.snapshot()})
+    
+    try:
+        query = text_param('q')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
     if not query:
         return jsonify({
             'success': True,
             'results': [],
+            'count': 0,
             'total': 0
         })
     
-    query_lower = query.lower()
-    results = []
+    scope = {'endpoint': 'scammer-search', 'q': query}
+    try:
+        args = page_args()
+        after = decode_cursor(args['cursor'], scope) if args['cursor'] else -1
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    for scammer in FAKE_SCAMMERS:
-        if (query_lower in scammer['scammer_email'].lower() or
-            query_lower in scammer['scammer_phone'].lower() or
-            query_lower in scammer.get('scammer_website', '').lower() or
-            query_lower in scammer['description'].lower()):
-            results.append(scammer)
+    records = SCAMMER_INDEX.records
+    items = ((doc_id, records[doc_id]) for doc_id in SCAMMER_INDEX.iter_ids(query, after))
+    # 'total' counts every match, as before pagination; 'count' is this page
+    total = None if args['stream'] else SCAMMER_INDEX.count(query)
+    return paged_response(items, args, scope, total=total)
+
+
+
+@app.route('/api/add-scammer.php', methods=['POST'])
+@app.route('/api/add-scammer', methods=['POST'])
+def add_scammer_report():
+    """
+    Report a scammer (JSON body, same fields as api/add-scammer.php)
     
+    Required: scam_type, description. A report whose email or phone matches a
+    reported scammer raises that record's report_count instead of adding one.
+    The record is searchable at once.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({'success': False, 'error': 'Invalid JSON input'}), 400
+    for field in ('scam_type', 'description'):
+        if not str(data.get(field) or '').strip():
+            return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+    if data['scam_type'] not in SCAM_TYPES:
+        return jsonify({'success': False, 'error': 'Invalid scam type'}), 400
+    
+    email = str(data.get('scammer_email') or '').strip() or None
+    phone = str(data.get('scammer_phone') or '').strip() or None
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with _scammer_add_lock:
+        existing = find_reported_scammer(email, phone)
+        if existing is not None:
+            existing['report_count'] = (existing.get('report_count') or 0) + 1
+            existing['last_updated'] = now
+            STATS.record_report()
+            return jsonify({
+                'success': True,
+                'message': 'Existing scammer updated',
+                'scammer_id': existing['id'],
+                'action': 'updated',
+                'new_report_count': existing['report_count']
+            })
+        
+        scammer = add_scammer({
+            'scammer_email': email,
+            'scammer_phone': phone,
+            'scammer_website': str(data.get('scammer_website') or '').strip() or None,
+            'scammer_social_media': data.get('scammer_social_media') if isinstance(data.get('scammer_social_media'), dict) else {},
+            'scam_type': data['scam_type'],
+            'description': str(data['description']).strip(),
+            'verification_status': 'pending',
+            'threat_level': data.get('threat_level') if data.get('threat_level') in ('low', 'medium', 'high') else 'medium',
+            'location': str(data.get('location') or '').strip() or 'Unknown',
+            'first_reported': now,
+            'last_updated': now,
+            'report_count': 1,
+            'is_active': True
+        })
+        STATS.record_report()
     return jsonify({
         'success': True,
-        'results': results,
-        'total': len(results)
-    })
+        'message': 'New scammer added to database',
+        'scammer_id': scammer['id'],
+        'action': 'created'
+    }), 201
 
 
+def _lookup_item(item, default_kind):
+    """(value, kind) for a string or {"value", "kind"} object; None for anything else."""
+    if isinstance(item, dict):
+        value, kind = item.get('value', ''), item.get('kind') or default_kind
+    else:
+        value, kind = item, default_kind
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    if not isinstance(kind, str) or kind not in NORMALIZERS:
+        kind = None
+    return value, kind
+
+
+def _json_lookup_values(default_kind):
+    """
+    (value, kind) pairs from a JSON list or {"values": [...]} body.
+    
+    Raises:
+        ValueError: If the body is not valid JSON, `values` is not a list, or
+                    an entry is not a string, number or {"value", "kind"} object
+    """
+    payload = request.get_json(silent=True)
+    if payload is None:
+        raise ValueError('Invalid JSON input')
+    values = payload.get('values', []) if isinstance(payload, dict) else payload
+    if not isinstance(values, list):
+        raise ValueError('values must be a list')
+    pairs = []
+    for position, item in enumerate(values, 1):
+        pair = _lookup_item(item, default_kind)
+        if pair is None:
+            raise ValueError(f'Invalid value at position {position}: use a string or a {{"value", "kind"}} object')
+        pairs.append(pair)
+    return pairs
+
+
+def _iter_lookup_values(default_kind):
+    """
+    Yield (value, kind) pairs from an NDJSON or CSV request body without reading it all first.
+    
+    Accepts NDJSON (one string or {"value", "kind"} object per line; other
+    lines are skipped), or CSV/plain text (first column, or the
+    value/phone/email/account column when there is a header row). JSON bodies
+    are validated up front by _json_lookup_values().
+    """
+    content_type = request.mimetype
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', errors='replace', newline='')
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = line
+            pair = _lookup_item(item, default_kind)
+            if pair is not None:
+                yield pair
+        return
+    
+    column = 0
+    for row_number, row in enumerate(csv.reader(lines)):
+        if not row:
+            continue
+        if row_number == 0:
+            header = [cell.strip().lower() for cell in row]
+            named = [name for name in ('value', 'phone', 'email', 'account') if name in header]
+            if named:
+                column = header.index(named[0])
+                if named[0] != 'value' and not default_kind:
+                    default_kind = named[0]
+                continue
+        if column < len(row):
+            yield row[column], default_kind
+
+
+@app.route('/api/scammer-lookup.php', methods=['POST'])
+@app.route('/api/scammer-lookup', methods=['POST'])
+def scammer_lookup():
+    """
+    Screen many phone numbers, emails or bank accounts in one request
+    
+    Streams NDJSON: one line per matched value (every value with ?all=1),
+    then a summary line with lookups per second.
+    """
+    default_kind = request.args.get('kind') or None
+    if default_kind and default_kind not in NORMALIZERS:
+        return jsonify({'success': False, 'error': 'Invalid kind. Use "phone", "email" or "account"'}), 400
+    emit_all = request.args.get('all', '').lower() in ('1', 'true', 'yes')
+    # JSON is parsed whole anyway, so it is checked before the 200 stream starts
+    if request.mimetype == 'application/json':
+        try:
+            values = _json_lookup_values(default_kind)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    else:
+        values = _iter_lookup_values(default_kind)
+    
+    def generate():
+        started = time.perf_counter()
+        lookups = matched = 0
+        for position, (value, kind) in enumerate(values, 1):
+            value = str(value).strip()
+            if not value:
+                continue
+            lookups += 1
+            kind, normalized, records = SCAMMER_LOOKUP.lookup(value, kind)
+            if records:
+                matched += 1
+            elif not emit_all:
+                continue
+            yield json.dumps({
+                'input': value,
+                'position': position,
+                'kind': kind,
+                'normalized': normalized,
+                'matched': bool(records),
+                'police_reports': sum(record.get('police_reports', 0) for record in records),
+                'matches': records
+            }) + '\n'
+        elapsed = time.perf_counter() - started
+        yield json.dumps({
+            'success': True,
+            'summary': {
+                'lookups': lookups,
+                'matched': matched,
+                'elapsed_seconds': round(elapsed, 3),
+                'lookups_per_second': round(lookups / elapsed) if elapsed > 0 else None
+            }
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/osint-collector.php', methods=['POST'])
 @app.route('/api/osint-collector', methods=['POST'])
 def osint_collector():
     """OSINT data collector"""
-    action = request.form.get('action') or (request.json.get('action', '') if request.is_json else '')
+    action = request_param('action', '')
     
-    if action == 'collect_threats':
-        return jsonify({
-            'success': True,
-            'threats': FAKE_OSINT_DATA,
-            'count': len(FAKE_OSINT_DATA)
-        })
-    elif action == 'search_threats':
-        keywords = request.form.get('keywords', '').split(',') or (request.json.get('keywords', []) if request.is_json else [])
-        results = FAKE_OSINT_DATA  # Simple implementation
-        return jsonify({
-            'success': True,
-            'threats': results,
-            'count': len(results)
-        })
+    if action == 'report_threat':
+        return report_threat()
+    
+    try:
+        args = page_args()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if action == 'search_threats':
+        return search_threats(args)
+    
+    # Threats are listed in ascending id order (ids are assigned as they are collected)
+    scope = {'endpoint': 'osint-collector', 'action': action}
+    try:
+        after = decode_cursor(args['cursor'], scope) if args['cursor'] else None
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    items = ((threat['id'], threat) for threat in FAKE_OSINT_DATA if after is None or threat['id'] > after)
+    # 'seq' lets the client continue with /api/osint-feed?since=<seq>
+    return paged_response(items, args, scope, key='threats', extra={'seq': OSINT_FEED.latest},
+                          total=len(FAKE_OSINT_DATA))
+
+
+@app.route('/api/osint-feed.php')
+@app.route('/api/osint-feed')
+def osint_feed():
+    """
+    Threats collected after ?since=<seq>, oldest first
+    
+    Pass the returned 'seq' as the next since. The ETag tracks the latest seq,
+    so an unchanged feed answers If-None-Match with 304. ?wait=<seconds>
+    (max 30) long-polls until something newer than since is collected.
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        args = page_args()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since and limit must be integers'}), 400
+    wait = request.args.get('wait', 0, type=float)
+    if wait > 0 and OSINT_FEED.latest <= since:
+        OSINT_FEED.wait(since, wait)
+    
+    fields = ','.join(args['fields'] or ())
+    etag = f"osint-{OSINT_FEED.latest}-{since}-{args['limit']}-{zlib.crc32(fields.encode('utf-8')):08x}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
     else:
-        return jsonify({
+        threats, has_more = OSINT_FEED.since(since, args['limit'])
+        response = jsonify({
             'success': True,
-            'threats': FAKE_OSINT_DATA,
-            'count': len(FAKE_OSINT_DATA)
+            'threats': [project(threat, args['fields']) for threat in threats],
+            'count': len(threats),
+            'since': since,
+            'seq': threats[-1]['seq'] if threats else max(since, 0),
+            'has_more': has_more
         })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/osint-feed/events')
+def osint_feed_events():
+    """
+    Server-Sent Events: a 'threat' event (id = seq) per collected threat after ?since= or Last-Event-ID
+    
+    Each connection ends after OSINT_STREAM_SECONDS; EventSource reconnects
+    (retry) and resumes from Last-Event-ID, so a client never pins a worker
+    thread indefinitely.
+    """
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since must be an integer'}), 400
+    
+    def stream(seq):
+        yield 'retry: 5000\n\n'
+        ends_at = time.monotonic() + OSINT_STREAM_SECONDS
+        # Comment lines keep proxies from closing an idle stream
+        while True:
+            threats, _ = OSINT_FEED.since(seq)
+            for threat in threats:
+                seq = threat['seq']
+                yield f"id: {seq}\nevent: threat\ndata: {json.dumps(threat)}\n\n"
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            if not threats:
+                yield ': keep-alive\n\n'
+            OSINT_FEED.wait(seq, min(15.0, remaining))
+    
+    return Response(stream(since), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def report_threat():
+    """
+    Ingest a collected threat (action=report_threat)
+    
+    Fields: content (required), threat_level (low/medium/high/critical, default
+    medium), keywords (comma string or list), source, location, url. The threat
+    is searchable at once and pushed to /api/osint-feed listeners.
+    """
+    content = str(request_param('content', '')).strip()
+    if not content:
+        return jsonify({'success': False, 'error': 'content is required'}), 400
+    threat_level = str(request_param('threat_level', 'medium')).lower()
+    if threat_level not in OSINT_THREAT_LEVELS:
+        return jsonify({'success': False, 'error': f"threat_level must be one of {', '.join(OSINT_THREAT_LEVELS)}"}), 400
+    keywords = request_param('keywords', '')
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    
+    threat = add_osint_threat({
+        'source': str(request_param('source', '')).strip() or 'Manual report',
+        'content': content,
+        'keywords': [str(keyword).strip().lower() for keyword in keywords if str(keyword).strip()],
+        'threat_level': threat_level,
+        'location': str(request_param('location', '')).strip() or 'Unknown',
+        'url': request_param('url') or None,
+        'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'verified': False
+    })
+    return jsonify({'success': True, 'threat': threat}), 201
+
+
+def search_threats(args):
+    """
+    BM25-ranked threat search over keywords and content
+    
+    Filters: threat_level, location, collected_from / collected_to. Pages are
+    cursors over rank positions, bound to the query and filters.
+    """
+    try:
+        keywords = request_param('keywords', '')
+        if isinstance(keywords, str):
+            keywords = keywords.split(',')
+        elif not isinstance(keywords, list):
+            raise ValueError('Invalid keywords: must be a comma-separated string or a list')
+        query = ' '.join(str(keyword) for keyword in keywords if keyword) + ' ' + text_param('q')
+        filters = {name: text_param(name, None) or None
+                   for name in ('threat_level', 'location', 'collected_from', 'collected_to')}
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    scope = dict(filters, endpoint='osint-collector', action='search_threats', q=query.strip())
+    try:
+        start = decode_cursor(args['cursor'], scope) + 1 if args['cursor'] else 0
+        # One extra result tells paged_response whether another page exists
+        needed = None if args['limit'] is None else start + args['offset'] + args['limit'] + 1
+        ranked = OSINT_INDEX.search(query, limit=needed, **filters)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    records = OSINT_INDEX.records
+    items = ((position, dict(records[doc_id], score=round(score, 4)))
+             for position, (score, doc_id) in enumerate(ranked) if position >= start)
+    return paged_response(items, args, scope, key='threats')
 
 
 @app.route('/deepfake-scanner')
 @app.route('/deepfake-scanner.php')
 def deepfake_scanner():
     """Deepfake scanner page"""
-    lang = session.get('language', 'en')
-    base_url = get_base_url()
-    return render_template('deepfake-scanner.html', 
-                         lang=lang, 
-                         base_url=base_url,
-                         translations=get_translations(lang))
+    return render_page('deepfake_scanner', 'deepfake-scanner.html')
 
 
 @app.route('/osint-monitor')
 @app.route('/osint-monitor.php')
 def osint_monitor():
     """OSINT monitor page"""
-    lang = session.get('language', 'en')
-    base_url = get_base_url()
-    return render_template('osint-monitor.html', 
-                         lang=lang, 
-                         base_url=base_url,
-                         translations=get_translations(lang))
+    return render_page('osint_monitor', 'osint-monitor.html')
 
 
 @app.route('/report-incident')
 @app.route('/report-incident.php')
 def report_incident():
     """Report incident page"""
-    lang = session.get('language', 'en')
-    base_url = get_base_url()
-    return render_template('report-incident.html', 
-                         lang=lang, 
-                         base_url=base_url,
-                         translations=get_translations(lang))
+    return render_page('report_incident', 'report-incident.html')
 
 
 @app.route('/api/language', methods=['POST'])
 def set_language():
     """Set language preference"""
     lang = request.json.get('lang', 'en') if request.is_json else request.form.get('lang', 'en')
-    if lang in ['en', 'bm']:
+    if lang in TRANSLATIONS.languages():
         session['language'] = lang
         return jsonify({'success': True, 'lang': lang})
     return jsonify({'success': False, 'error': 'Invalid language'}), 400
@@ -326,42 +961,17 @@ def serve_static(path):
     if path.endswith('.php'):
         return "PHP files not supported. Please use Python endpoints.", 404
     
-    # Try to serve from root directory
-    if os.path.exists(path) and os.path.isfile(path):
-        return send_from_directory('.', path)
+    # Indexed at startup; uploads are looked up on disk
+    response = STATIC_INDEX.serve(path)
+    if response is not None:
+        return response
     
     return "Not found", 404
 
 
 def get_translations(lang='en'):
-    """Get translations for a language"""
-    translations = {
-        'en': {
-            'platform_title': 'Cybercrime Platform',
-            'deepfake_scanner': 'Deepfake Scanner',
-            'osint_monitor': 'OSINT Monitor',
-            'report_incident': 'Report Incident',
-            'welcome_title': 'Welcome to PETRONAS Cybercrime Platform',
-            'welcome_subtitle': 'Protecting Malaysia\'s digital ecosystem',
-            'report_now': 'Report Now',
-            'scan_media': 'Scan Media',
-            'total_reports': 'Total Reports',
-            'deepfakes_detected': 'Deepfakes Detected'
-        },
-        'bm': {
-            'platform_title': 'Platform Jenayah Siber',
-            'deepfake_scanner': 'Pengimbas Deepfake',
-            'osint_monitor': 'Monitor OSINT',
-            'report_incident': 'Laporkan Insiden',
-            'welcome_title': 'Selamat Datang ke Platform Jenayah Siber PETRONAS',
-            'welcome_subtitle': 'Melindungi ekosistem digital Malaysia',
-            'report_now': 'Lapor Sekarang',
-            'scan_media': 'Imbas Media',
-            'total_reports': 'Jumlah Laporan',
-            'deepfakes_detected': 'Deepfake Dikesan'
-        }
-    }
-    return translations.get(lang, translations['en'])
+    """Get translations for a language (from translations/<lang>.json)"""
+    return TRANSLATIONS.get(lang)
 
 
 @app.errorhandler(413)
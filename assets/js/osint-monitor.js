@@ -956,6 +956,9 @@ function displayEmailResults(result, container) {
         html += `<div class="stat-item success"><span class="stat-label">Used [+]:</span> <span class="stat-value">${stats.used_count || 0}</span></div>`;
         html += `<div class="stat-item info"><span class="stat-label">Not Used [-]:</span> <span class="stat-value">${stats.not_used_count || 0}</span></div>`;
         html += `<div class="stat-item warning"><span class="stat-label">Rate Limit [x]:</span> <span class="stat-value">${stats.rate_limit_count || 0}</span></div>`;
+        if (stats.error_count) {
+            html += `<div class="stat-item warning"><span class="stat-label">Failed [!]:</span> <span class="stat-value">${stats.error_count}</span></div>`;
+        }
         if (stats.time_taken) {
             html += `<div class="stat-item"><span class="stat-label">Time Taken:</span> <span class="stat-value">${stats.time_taken.toFixed(2)}s</span></div>`;
         }
@@ -969,6 +972,7 @@ function displayEmailResults(result, container) {
         const usedPlatforms = data.platforms.filter(p => p.status === 'used');
         const notUsedPlatforms = data.platforms.filter(p => p.status === 'not_used');
         const rateLimitPlatforms = data.platforms.filter(p => p.status === 'rate_limit');
+        const errorPlatforms = data.platforms.filter(p => p.status === 'error');
         
         html += '<div class="holehe-platforms">';
         
@@ -1017,6 +1021,21 @@ function displayEmailResults(result, container) {
             html += '</div>';
         }
         
+        // Failed / timed-out platforms section
+        if (errorPlatforms.length > 0) {
+            html += '<div class="platform-section error-section">';
+            html += `<h4 class="section-title warning"><span class="status-icon">[!]</span> Check Failed (${errorPlatforms.length})</h4>`;
+            html += '<div class="platforms-list">';
+            errorPlatforms.forEach(platform => {
+                html += `<div class="platform-item error">
+                    <span class="platform-status-icon">[!]</span>
+                    <span class="platform-name">${escapeHtml(platform.platform)}</span>
+                </div>`;
+            });
+            html += '</div>';
+            html += '</div>';
+        }
+        
         html += '</div>';
     } else {
         html += '<div class="no-results">';
@@ -1033,6 +1052,7 @@ function displayEmailResults(result, container) {
     html += '<span class="legend-item"><span class="legend-icon success">[+]</span> Email used</span>';
     html += '<span class="legend-item"><span class="legend-icon info">[-]</span> Email not used</span>';
     html += '<span class="legend-item"><span class="legend-icon warning">[x]</span> Rate limit</span>';
+    html += '<span class="legend-item"><span class="legend-icon warning">[!]</span> Check failed</span>';
     html += '</div>';
     html += '<div class="holehe-credit">';
     html += '<small>Powered by <a href="https://github.com/megadose/holehe" target="_blank" rel="noopener">Holehe</a></small>';
@@ -13,11 +13,15 @@ class PublicDashboard {
         this.searchTimeout = null;
         this.isLoading = false;
         this.scammerDatabase = null; // Store JSON data for searching
+        this.statsUrl = 'api/stats.php';
         
         this.initializeElements();
         this.bindEvents();
         this.loadStatistics();
         this.loadScammerDatabase();
+        
+        // Counters are maintained server-side; unchanged stats come back as 304
+        setInterval(() => this.loadStatistics(), 60 * 1000);
     }
     
     initializeElements() {
@@ -179,7 +183,12 @@ class PublicDashboard {
     
     async loadStatistics() {
         try {
-            const response = await fetch('api/scammer-search.php?action=stats');
+            let response = await fetch(this.statsUrl, { cache: 'no-cache' });
+            if (response.status === 404 && this.statsUrl === 'api/stats.php') {
+                // Backends without the stats endpoint compute them in the search API
+                this.statsUrl = 'api/scammer-search.php?action=stats';
+                response = await fetch(this.statsUrl);
+            }
             const data = await response.json();
             
             if (data.success) {
@@ -42,6 +42,13 @@ class AIDetectionTester {
             ];
         }
         
+        // Prefer the persistent inference server when one is configured
+        // (see ai_detection_server.py); fall back to spawning the script
+        $serverResult = $this->detectViaServer(realpath($imagePath));
+        if ($serverResult !== null) {
+            return $serverResult;
+        }
+        
         // Validate model exists
         if (!file_exists($this->modelPath)) {
             return [
@@ -185,6 +192,53 @@ class AIDetectionTester {
         return $result;
     }
     
+    /**
+     * Send the image to the persistent inference server
+     * 
+     * Uses AI_DETECTION_SERVER, e.g. "http://127.0.0.1:8765" or
+     * "unix:///tmp/ai_detection.sock".
+     * 
+     * @param string $absoluteImagePath Absolute path to the image file
+     * @return array|null Result array, or null if no server is available
+     */
+    private function detectViaServer($absoluteImagePath) {
+        $server = getenv('AI_DETECTION_SERVER');
+        if (!$server || !function_exists('curl_init')) {
+            return null;
+        }
+        
+        $url = rtrim($server, '/') . '/predict';
+        $ch = curl_init();
+        if (strpos($server, 'unix://') === 0) {
+            curl_setopt($ch, CURLOPT_UNIX_SOCKET_PATH, substr($server, strlen('unix://')));
+            $url = 'http://localhost/predict';
+        }
+        curl_setopt($ch, CURLOPT_URL, $url);
+        curl_setopt($ch, CURLOPT_POST, true);
+        curl_setopt($ch, CURLOPT_POSTFIELDS, json_encode(['image_path' => $absoluteImagePath]));
+        curl_setopt($ch, CURLOPT_HTTPHEADER, ['Content-Type: application/json']);
+        curl_setopt($ch, CURLOPT_RETURNTRANSFER, true);
+        curl_setopt($ch, CURLOPT_CONNECTTIMEOUT, 2);
+        curl_setopt($ch, CURLOPT_TIMEOUT, 60);
+        
+        $output = curl_exec($ch);
+        $curlError = curl_error($ch);
+        curl_close($ch);
+        
+        if ($output === false) {
+            error_log("AI detection server unavailable, falling back to script: " . $curlError);
+            return null;
+        }
+        
+        $result = json_decode($output, true);
+        if (json_last_error() !== JSON_ERROR_NONE || !is_array($result)) {
+            error_log("Invalid JSON from AI detection server: " . substr($output, 0, 200));
+            return null;
+        }
+        
+        return $result;
+    }
+    
     /**
      * Handle file upload and detect
      * 
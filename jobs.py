@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Background job runner for slow API work (e.g. Sightengine analysis).
+Requests enqueue a job and return its id at once; a bounded pool of worker
+threads runs the jobs. The queue depth is capped so overload is rejected up
+front instead of piling up, and every job has a deadline covering both its
+queue wait and its run time.
+
+Job state is mirrored to a small on-disk store, so with several gunicorn
+workers a job can be polled from any of them.
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from result_cache import TieredCache
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+JOB_QUEUE_DEPTH = int(os.environ.get('JOB_QUEUE_DEPTH', 32))
+JOB_DEADLINE = float(os.environ.get('JOB_DEADLINE', 120))
+# How long finished jobs can still be fetched
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 15 * 60))
+JOB_STORE_DIR = os.environ.get('JOB_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'jobs'))
+
+FINISHED_STATES = ('succeeded', 'failed', 'expired')
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when JOB_QUEUE_DEPTH jobs are already waiting."""
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value).strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+class Job:
+    """One unit of background work and its outcome."""
+
+    def __init__(self, kind, fn, args, kwargs, deadline, cleanup=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # Releases resources held by args (e.g. a spooled upload); runs exactly once
+        self.cleanup = cleanup
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.deadline_at = self.created_at + deadline
+        # Notified on every state change (used by event streams)
+        self.changed = threading.Condition()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': _timestamp(self.created_at),
+            'started_at': _timestamp(self.started_at),
+            'finished_at': _timestamp(self.finished_at),
+            'deadline_at': _timestamp(self.deadline_at),
+            'queue_seconds': round((self.started_at or time.time()) - self.created_at, 3),
+            'run_seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None
+        }
+
+
+class JobManager:
+    """
+    Bounded worker pool with a capped queue and per-job deadlines.
+
+    Args:
+        workers: Number of worker threads
+        queue_depth: Jobs allowed to wait for a worker before submit() fails
+        deadline: Default seconds from submission until a job fails as expired
+        store_dir: Directory for the shared job store (None keeps jobs in-process only)
+    """
+
+    def __init__(self, workers=JOB_WORKERS, queue_depth=JOB_QUEUE_DEPTH, deadline=JOB_DEADLINE,
+                 store_dir=JOB_STORE_DIR, result_ttl=JOB_RESULT_TTL):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.deadline = deadline
+        self.result_ttl = result_ttl
+        self.store = TieredCache(0, store_dir, ttl=result_ttl) if store_dir else None
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = {state: 0 for state in FINISHED_STATES}
+        self.running = 0
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._threads = []
+        self._started = False
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, fn, *args, deadline=None, cleanup=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs).
+
+        cleanup, if given, is called once the job is done with its arguments:
+        after fn returns or raises, or when the job is rejected or expires
+        before it ever ran.
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFullError: If the queue is at JOB_QUEUE_DEPTH
+        """
+        self._start()
+        job = Job(kind, fn, args, kwargs, self.deadline if deadline is None else deadline, cleanup)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._save(job)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self.rejected += 1
+            if self.store:
+                self.store.delete(job.id)
+            self._release(job)
+            raise QueueFullError(f'Job queue is full ({self.queue_depth} waiting), try again later')
+        with self._lock:
+            self.submitted += 1
+        return job
+
+    def get(self, job_id):
+        """Return the job's current state as a dict, or None if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            self._check_deadline(job)
+            return job.to_dict()
+        # Submitted to another worker process
+        return self.store.get(job_id) if self.store else None
+
+    def wait(self, job_id, timeout):
+        """
+        Block until the job changes state or `timeout` passes.
+
+        Returns:
+            dict: The job's state afterwards (None if unknown)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            # Owned by another process: poll the shared store
+            time.sleep(min(timeout, 0.5))
+            return self.get(job_id)
+        with job.changed:
+            if job.status not in FINISHED_STATES:
+                job.changed.wait(min(timeout, max(0.0, job.deadline_at - time.time()) + 0.01))
+        return self.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            by_status = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {
+                'workers': self.workers,
+                'queue_depth': self.queue_depth,
+                'queued': self._queue.qsize(),
+                'running': self.running,
+                'deadline_seconds': self.deadline,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': dict(self.completed),
+                'tracked_jobs': by_status
+            }
+
+    def _save(self, job):
+        if self.store:
+            self.store.set(job.id, job.to_dict())
+
+    def _finish(self, job, status, result=None, error=None):
+        """Move a job to a final state once; later outcomes are ignored."""
+        with job.changed:
+            if job.status in FINISHED_STATES:
+                return False
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+            never_ran = job.started_at is None
+            job.fn = job.args = job.kwargs = None
+            job.changed.notify_all()
+        if never_ran:
+            # A running job's resources are released by _run once fn returns
+            self._release(job)
+        with self._lock:
+            self.completed[status] += 1
+        self._save(job)
+        return True
+
+    def _release(self, job):
+        with job.changed:
+            cleanup, job.cleanup = job.cleanup, None
+        if cleanup is not None:
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"Warning: cleanup for job {job.id} failed: {e}")
+
+    def _check_deadline(self, job):
+        with job.changed:
+            expired = job.status not in FINISHED_STATES and time.time() > job.deadline_at
+        if expired:
+            # The worker may still be running it; its result will be discarded
+            self._finish(job, 'expired', error='Job deadline exceeded')
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL (caller holds the lock)."""
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            # Check the deadline and claim the job under one lock, so a
+            # concurrent get()/wait() cannot expire it in between
+            with job.changed:
+                claimed = job.status == 'queued' and time.time() <= job.deadline_at
+                if claimed:
+                    fn, args, kwargs = job.fn, job.args, job.kwargs
+                    job.status = 'running'
+                    job.started_at = time.time()
+                    job.changed.notify_all()
+            if not claimed:
+                self._check_deadline(job)
+                continue
+            self._save(job)
+            with self._lock:
+                self.running += 1
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish(job, 'failed', error=str(e))
+            else:
+                if time.time() > job.deadline_at:
+                    self._finish(job, 'expired', error='Job deadline exceeded')
+                else:
+                    self._finish(job, 'succeeded', result=result)
+            finally:
+                self._release(job)
+                with self._lock:
+                    self.running -= 1
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Return the process-wide JobManager (workers start with the first job)."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+    return _manager
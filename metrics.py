@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Minimal in-process metrics exported in the Prometheus text format.
+Metrics register themselves on creation and render() returns every
+registered metric, so modules can declare counters, gauges and histograms at
+import time and a single /metrics endpoint can expose them.
+
+Updates take one lock and a dict lookup keyed by the label values, cheap
+enough to leave on for every request (see scripts/benchmark_metrics.py).
+"""
+
+import bisect
+import threading
+
+# Latency buckets in seconds, from 1 ms to 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class _Metric:
+    """Registration and label handling shared by every metric type."""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if not labels:
+            return ()
+        return tuple([str(labels.get(name, '')) for name in self.labelnames])
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, optionally split by labels.
+
+    Args:
+        name: Metric name (e.g. 'http_requests_total')
+        documentation: HELP text
+        labelnames: Label names passed to inc() as keyword arguments
+    """
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def snapshot(self):
+        """Return {labels tuple: value}."""
+        with self._lock:
+            return dict(self._series)
+
+    def render(self):
+        lines = self._header()
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f'{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Gauge(Counter):
+    """Value that goes up and down (e.g. requests in flight)."""
+
+    type_name = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram, optionally split by labels.
+
+    Args:
+        name: Metric name (e.g. 'ai_detection_stage_seconds')
+        documentation: HELP text
+        labelnames: Label names passed to observe() as keyword arguments
+        buckets: Sorted upper bounds; +Inf is added automatically
+    """
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then the +Inf overflow, sum and count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """Return {labels tuple: {'count', 'sum', 'buckets': [(bound, cumulative)]}}."""
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        result = {}
+        for key, counts, total, count in items:
+            cumulative = 0
+            buckets = []
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                buckets.append((bound, cumulative))
+            result[key] = {'count': count, 'sum': total, 'buckets': buckets}
+        return result
+
+    def render(self):
+        lines = self._header()
+        for key, series in sorted(self.snapshot().items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, cumulative in series['buckets']:
+                bucket_labels = dict(labels, le=_format_value(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(series["sum"])}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {series["count"]}')
+        return '\n'.join(lines)
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    return '\n'.join(metric.render() for metric in metrics) + '\n'
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Delta sync for the OSINT threat feed.
+Every collected threat gets a monotonically increasing `seq`, so a client
+that remembers the last seq it saw asks only for what came after it. The
+latest seq doubles as the feed's version for ETags, and a Condition wakes
+long-poll and SSE listeners when a new threat is added.
+
+The feed lives in process memory like FAKE_OSINT_DATA itself; with several
+gunicorn workers each worker has its own feed.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+
+# Upper bound on one long-poll wait, in seconds
+FEED_MAX_WAIT = 30.0
+
+
+class ThreatFeed:
+    """
+    Append-only list of threats with sequence numbers.
+
+    Args:
+        threats: Existing list to take over (e.g. FAKE_OSINT_DATA); its items
+                 are numbered in order and later additions are appended to it
+    """
+
+    def __init__(self, threats):
+        self.threats = threats
+        self._seqs = []
+        self.latest = 0
+        self._changed = threading.Condition()
+        for threat in threats:
+            self._number(threat)
+
+    def _number(self, threat):
+        self.latest += 1
+        threat['seq'] = self.latest
+        self._seqs.append(self.latest)
+
+    def add(self, threat):
+        """Append a threat, assign its seq and wake waiting listeners."""
+        with self._changed:
+            self.threats.append(threat)
+            self._number(threat)
+            self._changed.notify_all()
+        return threat['seq']
+
+    def since(self, seq, limit=None):
+        """
+        Threats added after `seq`, oldest first.
+
+        Returns:
+            tuple: (list of threats, True if more than `limit` were available)
+        """
+        with self._changed:
+            start = bisect_right(self._seqs, seq)
+            end = len(self._seqs) if limit is None else min(len(self._seqs), start + limit)
+            return self.threats[start:end], end < len(self._seqs)
+
+    def wait(self, seq, timeout):
+        """
+        Block until a threat newer than `seq` exists or `timeout` passes.
+
+        Returns:
+            bool: True if newer threats are available
+        """
+        deadline = time.monotonic() + min(timeout, FEED_MAX_WAIT)
+        with self._changed:
+            while self.latest <= seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+            return True
+
+    def stats(self):
+        return {'threats': len(self._seqs), 'latest_seq': self.latest}
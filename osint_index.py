@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Ranked keyword search over collected OSINT threats.
+An inverted index maps each term of a threat's `keywords` and tokenized
+`content` to a posting list of (doc id, term frequency); results are ranked
+with BM25. Keyword terms count KEYWORD_BOOST times, so a post tagged
+"phishing" outranks one that only mentions it in passing.
+
+Document ids are assigned in insertion order, so new threats are appended
+to the posting lists without a rebuild; collection size and average length
+are read at query time. Filters on threat_level, location and a collected_at
+range are checked per candidate from compact per-document arrays.
+
+Scoring is vectorized with numpy when it is installed and falls back to
+pure Python otherwise.
+"""
+
+import heapq
+import re
+import threading
+from array import array
+from datetime import datetime
+from math import log
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+KEYWORD_BOOST = 2
+
+TIMESTAMP_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens."""
+    return _TOKEN.findall(str(text or '').lower())
+
+
+def parse_timestamp(value, end_of_day=False):
+    """
+    Seconds since the epoch for a collected_at-style timestamp.
+
+    Args:
+        value: Timestamp in one of TIMESTAMP_FORMATS
+        end_of_day: For a bare date, return its last second instead of midnight
+
+    Raises:
+        ValueError: If the value matches none of TIMESTAMP_FORMATS
+    """
+    value = str(value).strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+        if end_of_day and fmt == '%Y-%m-%d':
+            parsed += 24 * 60 * 60 - 1
+        return parsed
+    raise ValueError(f'Invalid timestamp: {value}')
+
+
+class _Codes:
+    """Small integer codes for a categorical field (0 means missing)."""
+
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value, create=True):
+        if value is None or value == '':
+            return 0
+        value = str(value).strip().lower()
+        code = self.codes.get(value)
+        if code is None and create:
+            code = self.codes[value] = len(self.codes) + 1
+        return code
+
+
+class OsintIndex:
+    """
+    Incremental BM25 index over OSINT threat records.
+
+    search() returns (score, doc id) pairs; records[doc_id] is the threat as added.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B, keyword_boost=KEYWORD_BOOST):
+        self.k1 = k1
+        self.b = b
+        self.keyword_boost = keyword_boost
+        self.records = []
+        # term -> (doc ids, term frequencies), both in increasing doc id order
+        self.postings = {}
+        self.entries = 0
+        self.total_length = 0
+        self._lengths = array('I')
+        self._levels = array('B')
+        self._locations = array('I')
+        self._collected = array('d')
+        self._level_codes = _Codes()
+        self._location_codes = _Codes()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, threat):
+        """
+        Index one threat.
+
+        Args:
+            threat: FAKE_OSINT_DATA-style dict (keywords, content, threat_level,
+                    location, collected_at)
+
+        Returns:
+            int: The threat's document id in this index
+        """
+        frequencies = {}
+        for keyword in threat.get('keywords') or ():
+            for term in tokenize(keyword):
+                frequencies[term] = frequencies.get(term, 0) + self.keyword_boost
+        for term in tokenize(threat.get('content')):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        try:
+            collected = parse_timestamp(threat['collected_at']) if threat.get('collected_at') else float('nan')
+        except ValueError:
+            collected = float('nan')
+
+        with self._lock:
+            doc_id = len(self.records)
+            self.records.append(threat)
+            length = sum(frequencies.values())
+            self._lengths.append(length)
+            self.total_length += length
+            self._levels.append(self._level_codes.code(threat.get('threat_level')))
+            self._locations.append(self._location_codes.code(threat.get('location')))
+            self._collected.append(collected)
+            postings = self.postings
+            for term, frequency in frequencies.items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = (array('I'), array('I'))
+                posting[0].append(doc_id)
+                posting[1].append(frequency)
+            self.entries += len(frequencies)
+        return doc_id
+
+    def search(self, query='', threat_level=None, location=None, collected_from=None, collected_to=None, limit=None):
+        """
+        Rank threats against a query.
+
+        Args:
+            query: Free text or a list of keywords; empty lists every threat
+                   that passes the filters, oldest first
+            threat_level: Only threats at this level (case-insensitive)
+            location: Only threats from this location (case-insensitive, exact)
+            collected_from: Only threats collected at or after this timestamp
+            collected_to: Only threats collected at or before this timestamp
+            limit: Return at most this many (None for all)
+
+        Returns:
+            list: (score, doc id) pairs, best first
+
+        Raises:
+            ValueError: If a collected_* bound is not a valid timestamp
+        """
+        if isinstance(query, (list, tuple)):
+            query = ' '.join(str(value) for value in query)
+        terms = set(tokenize(query))
+        filters = {
+            'level': self._level_codes.code(threat_level, create=False) if threat_level else None,
+            'location': self._location_codes.code(location, create=False) if location else None,
+            'from': parse_timestamp(collected_from) if collected_from else None,
+            'to': parse_timestamp(collected_to, end_of_day=True) if collected_to else None
+        }
+        # Unknown level or location: nothing can match
+        if (threat_level and filters['level'] is None) or (location and filters['location'] is None):
+            return []
+
+        with self._lock:
+            if not terms:
+                matches = []
+                for doc_id in range(len(self.records)):
+                    if limit is not None and len(matches) >= limit:
+                        break
+                    if self._accepts(doc_id, filters):
+                        matches.append((0.0, doc_id))
+                return matches
+            lists = [self.postings[term] for term in terms if term in self.postings]
+            if not lists:
+                return []
+            if np is not None:
+                return self._search_numpy(lists, filters, limit)
+            return self._search_python(lists, filters, limit)
+
+    def _accepts(self, doc_id, filters):
+        if filters['level'] is not None and self._levels[doc_id] != filters['level']:
+            return False
+        if filters['location'] is not None and self._locations[doc_id] != filters['location']:
+            return False
+        collected = self._collected[doc_id]
+        if filters['from'] is not None and not collected >= filters['from']:
+            return False
+        if filters['to'] is not None and not collected <= filters['to']:
+            return False
+        return True
+
+    def _idf(self, document_frequency):
+        count = len(self.records)
+        return log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _search_python(self, lists, filters, limit):
+        k1, b = self.k1, self.b
+        average = self.total_length / len(self.records)
+        lengths = self._lengths
+        filtered = any(value is not None for value in filters.values())
+        scores = {}
+        for doc_ids, frequencies in lists:
+            idf = self._idf(len(doc_ids))
+            for doc_id, frequency in zip(doc_ids, frequencies):
+                norm = k1 * (1 - b + b * lengths[doc_id] / average)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+        if filtered:
+            scores = {doc_id: score for doc_id, score in scores.items() if self._accepts(doc_id, filters)}
+        ranked = ((score, -doc_id) for doc_id, score in scores.items())
+        ranked = sorted(ranked, reverse=True) if limit is None else heapq.nlargest(limit, ranked)
+        return [(score, -neg_id) for score, neg_id in ranked]
+
+    def _search_numpy(self, lists, filters, limit):
+        # Posting arrays are copied before use: a live numpy view would stop
+        # add() from growing them
+        k1, b = self.k1, self.b
+        average = self.total_length / len(self.records)
+        doc_ids = np.concatenate([np.array(ids, dtype=np.uint32) for ids, _ in lists])
+        frequencies = np.concatenate([np.array(freqs, dtype=np.float64) for _, freqs in lists])
+        idfs = np.concatenate([np.full(len(ids), self._idf(len(ids))) for ids, _ in lists])
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)[doc_ids]
+        norms = k1 * (1 - b + b * lengths / average)
+        weights = idfs * frequencies * (k1 + 1) / (frequencies + norms)
+        candidates, inverse = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(inverse.ravel(), weights=weights, minlength=len(candidates))
+
+        keep = np.ones(len(candidates), dtype=bool)
+        if filters['level'] is not None:
+            keep &= np.frombuffer(self._levels, dtype=np.uint8)[candidates] == filters['level']
+        if filters['location'] is not None:
+            keep &= np.frombuffer(self._locations, dtype=np.uint32)[candidates] == filters['location']
+        if filters['from'] is not None or filters['to'] is not None:
+            collected = np.frombuffer(self._collected, dtype=np.float64)[candidates]
+            if filters['from'] is not None:
+                keep &= collected >= filters['from']
+            if filters['to'] is not None:
+                keep &= collected <= filters['to']
+        candidates, scores = candidates[keep], scores[keep]
+
+        if limit is not None and limit < len(scores):
+            # Keep everything tied with the limit-th score so ties break by id below
+            cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            top = scores >= cutoff
+            candidates, scores = candidates[top], scores[top]
+        # Best score first, ties in insertion order
+        order = np.lexsort((candidates, -scores))[:limit]
+        return [(float(scores[i]), int(candidates[i])) for i in order]
+
+    def stats(self):
+        return {
+            'records': len(self.records),
+            'terms': len(self.postings),
+            'postings': self.entries,
+            'average_length': round(self.total_length / len(self.records), 2) if self.records else 0,
+            'numpy': np is not None
+        }
+
+
+def build_osint_index(threats):
+    """Index FAKE_OSINT_DATA-style records."""
+    index = OsintIndex()
+    for threat in threats:
+        index.add(threat)
+    return index
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Rendered-page cache for the template routes.
+Pages are rendered once per (route, language, base URL) and served from
+memory afterwards. Cache keys also carry the version of the data a page
+shows (e.g. StatsStore.version for the home page) and the translation
+catalogue's version, bumped when a catalogue file is edited; stale entries
+simply stop being looked up and age out of the LRU.
+
+Translations live in translations/<lang>.json and are reloaded when a file's
+mtime changes (checked at most every TRANSLATIONS_CHECK_INTERVAL seconds).
+"""
+
+import json
+import os
+import threading
+import time
+
+from result_cache import TieredCache, sha256_hex
+
+TRANSLATIONS_DIR = os.environ.get('TRANSLATIONS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations'))
+TRANSLATIONS_CHECK_INTERVAL = float(os.environ.get('TRANSLATIONS_CHECK_INTERVAL', 2))
+DEFAULT_LANGUAGE = 'en'
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 256))
+
+
+class TranslationCatalog:
+    """
+    Translation dictionaries loaded from <directory>/<lang>.json.
+
+    Args:
+        directory: Directory holding one JSON object per language
+        check_interval: Minimum seconds between mtime checks (0 checks on every call)
+    """
+
+    def __init__(self, directory=TRANSLATIONS_DIR, check_interval=TRANSLATIONS_CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.version = 0
+        self.reloads = 0
+        self._catalogs = {}
+        self._mtimes = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _scan(self):
+        mtimes = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return mtimes
+        for name in names:
+            if name.endswith('.json'):
+                try:
+                    mtimes[name[:-5]] = os.path.getmtime(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        return mtimes
+
+    def refresh(self):
+        """Reload every catalogue if any file was added, removed or modified."""
+        now = time.monotonic()
+        if self._mtimes is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtimes = self._scan()
+            if mtimes == self._mtimes:
+                return
+            catalogs = {}
+            for lang in mtimes:
+                try:
+                    with open(os.path.join(self.directory, lang + '.json'), 'r', encoding='utf-8') as f:
+                        catalogs[lang] = json.load(f)
+                except (OSError, ValueError) as e:
+                    # Keep serving the previous version of a file mid-edit
+                    print(f"Warning: could not load translations for '{lang}': {e}")
+                    if lang in self._catalogs:
+                        catalogs[lang] = self._catalogs[lang]
+            self._catalogs = catalogs
+            self._mtimes = mtimes
+            self.version += 1
+            self.reloads += 1
+
+    def languages(self):
+        self.refresh()
+        return sorted(self._catalogs)
+
+    def get(self, lang=DEFAULT_LANGUAGE):
+        """Translations for lang, falling back to DEFAULT_LANGUAGE."""
+        self.refresh()
+        return self._catalogs.get(lang) or self._catalogs.get(DEFAULT_LANGUAGE, {})
+
+
+class PageCache:
+    """
+    LRU of rendered pages keyed by route, language, base URL and data versions.
+
+    Args:
+        translations: TranslationCatalog whose version is part of every key
+        max_entries: Pages kept in memory
+    """
+
+    def __init__(self, translations, max_entries=PAGE_CACHE_MAX_ENTRIES):
+        self.translations = translations
+        self.renders = 0
+        self._cache = TieredCache(max_entries, None)
+        self._lock = threading.Lock()
+
+    def get_or_render(self, route, lang, base_url, render, data_version=None):
+        """
+        Cached HTML for a page, rendering it on a miss.
+
+        Args:
+            route: Endpoint name
+            lang: Language code
+            base_url: Base URL the page links against
+            render: Callable returning the HTML
+            data_version: Version of the data the page shows (a new value re-renders)
+
+        Returns:
+            tuple: (html, etag)
+        """
+        self.translations.refresh()
+        key = sha256_hex(route, lang, base_url, str(self.translations.version), str(data_version))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[0], cached[1]
+        html = render()
+        etag = key[:32]
+        self._cache.set(key, (html, etag))
+        with self._lock:
+            self.renders += 1
+        return html, etag
+
+    def stats(self):
+        cache = self._cache.stats()
+        return {
+            'translations_version': self.translations.version,
+            'translation_reloads': self.translations.reloads,
+            'renders': self.renders,
+            'hits': cache['hits'],
+            'misses': cache['misses'],
+            'hit_rate': cache['hit_rate'],
+            'entries': cache['memory_entries']
+        }
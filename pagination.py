@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cursor pagination, field projection and NDJSON streaming for list endpoints.
+Results are produced lazily in a stable order (ascending id), so a page only
+ever holds `limit` records and a cursor is just the last id returned, bound to
+the query that produced it.
+"""
+
+import base64
+import hashlib
+import json
+import os
+
+from flask import Response, jsonify, request, stream_with_context
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+
+
+def _scope_digest(scope):
+    return hashlib.sha256(json.dumps(scope, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(after, scope):
+    """Opaque cursor for resuming after id `after` within the same query `scope`."""
+    payload = json.dumps({'after': after, 'scope': _scope_digest(scope)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, scope):
+    """
+    Return the id a cursor resumes after.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to a different query
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        after = payload['after']
+        digest = payload['scope']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+    if digest != _scope_digest(scope):
+        raise ValueError('Cursor does not match this query')
+    return after
+
+
+def request_param(name, default=None):
+    """Read a parameter from the query string, form or JSON body."""
+    value = request.values.get(name)
+    if value is None and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            value = body.get(name)
+    return default if value is None else value
+
+
+def text_param(name, default=''):
+    """
+    A text parameter (default when absent); JSON numbers are converted to their string form.
+
+    Raises:
+        ValueError: If a JSON body gives a list, object or boolean
+    """
+    value = request_param(name)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'Invalid {name}: must be a string')
+    return str(value)
+
+
+def _int_param(name, value):
+    """int(value) for a query string or JSON number; ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'Invalid {name}: must be an integer')
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'Invalid {name}: must be an integer')
+
+
+def page_args():
+    """
+    Parse limit, cursor, offset, fields and format from the request.
+
+    Returns:
+        dict: limit (None means unlimited, only when streaming), cursor, offset,
+              fields (list or None) and stream (bool)
+
+    Raises:
+        ValueError: On a non-integer limit or offset, or fields that are not
+                    a comma-separated string or a list of strings
+    """
+    stream = (request_param('format', '') == 'ndjson' or
+              request.accept_mimetypes.best == 'application/x-ndjson')
+    limit = request_param('limit')
+    if limit in (None, ''):
+        limit = None if stream else DEFAULT_PAGE_SIZE
+    else:
+        limit = max(1, _int_param('limit', limit))
+        if not stream:
+            limit = min(limit, MAX_PAGE_SIZE)
+    fields = request_param('fields')
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    elif fields is not None and not (isinstance(fields, list) and all(isinstance(field, str) for field in fields)):
+        raise ValueError('Invalid fields: must be a comma-separated string or a list of strings')
+    offset = request_param('offset')
+    return {
+        'limit': limit,
+        'cursor': request_param('cursor') or None,
+        'offset': max(0, _int_param('offset', offset)) if offset not in (None, '') else 0,
+        'fields': fields or None,
+        'stream': stream
+    }
+
+
+def project(record, fields):
+    """Keep only the requested top-level fields."""
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def paged_response(items, args, scope, key='results', extra=None, total=None):
+    """
+    Build a JSON page or an NDJSON stream from an iterator of (id, record).
+
+    Args:
+        items: Iterator of (id, record) in ascending id order, already
+               resumed after the request's cursor
+        args: page_args() result
+        scope: Query parameters the cursor is bound to
+        key: Name of the results list in the JSON response
+        extra: Additional top-level fields for the JSON response / summary line
+        total: Matches for the whole query, reported as 'total' in the JSON
+               response when given ('count' is the size of this page)
+    """
+    limit, fields = args['limit'], args['fields']
+    for _ in range(args['offset']):
+        if next(items, None) is None:
+            break
+
+    if args['stream']:
+        def generate():
+            count = 0
+            last_id = None
+            for item_id, record in items:
+                if limit is not None and count >= limit:
+                    # One more item exists: point the cursor at what was sent
+                    yield json.dumps({'next_cursor': encode_cursor(last_id, scope), 'count': count, 'has_more': True}) + '\n'
+                    return
+                yield json.dumps(project(record, fields)) + '\n'
+                count += 1
+                last_id = item_id
+            yield json.dumps({'next_cursor': None, 'count': count, 'has_more': False}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    page = []
+    last_id = None
+    has_more = False
+    for item_id, record in items:
+        if len(page) >= limit:
+            has_more = True
+            break
+        page.append(project(record, fields))
+        last_id = item_id
+
+    response = {'success': True}
+    response.update(extra or {})
+    response.update({
+        key: page,
+        'count': len(page),
+        'has_more': has_more,
+        'next_cursor': encode_cursor(last_id, scope) if has_more else None
+    })
+    if total is not None:
+        response['total'] = total
+    return jsonify(response)
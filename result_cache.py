@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Two-tier result cache: an in-memory LRU in front of an optional on-disk store.
+Values must be JSON-serializable. The disk tier is shared between processes
+and evicts least recently used files once it grows past its byte limit.
+Entries can expire after a time-to-live, set per cache or per entry.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def sha256_hex(*parts):
+    """Hash bytes/str parts into one hex digest (parts are length-prefixed)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash a file's contents without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TieredCache:
+    """
+    In-memory LRU backed by an optional directory of JSON files.
+
+    Args:
+        max_entries: Entries kept in memory (0 disables the memory tier)
+        disk_dir: Directory for the persistent tier (None disables it)
+        disk_max_bytes: Size the disk tier is trimmed back under when exceeded
+        ttl: Default seconds before an entry expires (None keeps entries until evicted)
+    """
+
+    def __init__(self, max_entries=1024, disk_dir=None, disk_max_bytes=64 * 1024 * 1024, ttl=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Guards disk writes, removals and the _disk_bytes running total
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = None
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError:
+                self.disk_dir = None
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.json')
+
+    def _remember(self, key, value, expires_at=None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return a copy of the cached value, or None (also for expired entries)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+                self.expirations += 1
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            expires_at = None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+                if isinstance(value, dict) and '__expires_at' in value:
+                    expires_at = value['__expires_at']
+                    value = value['value'] if expires_at > now else None
+                if value is not None:
+                    # Touch so eviction sees the entry as recently used
+                    os.utime(path)
+            except (OSError, ValueError, KeyError, TypeError):
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value, expires_at)
+                return copy.deepcopy(value)
+            if expires_at is not None:
+                # Expired on disk (counted once if the memory copy expired too)
+                if entry is None:
+                    self.expirations += 1
+                self.delete(key)
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        """Store a value in both tiers, expiring after `ttl` seconds (default: the cache ttl)."""
+        value = copy.deepcopy(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = (time.time() + ttl) if ttl is not None else None
+        self._remember(key, value, expires_at)
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        stored = value if expires_at is None else {'__expires_at': expires_at, 'value': value}
+        data = json.dumps(stored).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        except OSError:
+            return
+
+        with self._disk_lock:
+            # An overwrite replaces the old file, so only the difference is new
+            replaced = self._file_size(path)
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data) - replaced
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            with self._disk_lock:
+                size = self._file_size(path)
+                try:
+                    os.remove(path)
+                except OSError:
+                    return
+                if self._disk_bytes is not None:
+                    self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir:
+            with self._disk_lock:
+                for path, _, _ in self._disk_entries():
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._disk_bytes = 0
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _scan_disk_bytes(self):
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _evict_disk(self):
+        """
+        Delete least recently used files until the tier is back under 90% of its limit.
+        Called with _disk_lock held, so the total it sets is not raced by set()/delete().
+        """
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._disk_bytes = total
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'hits': hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (hits / lookups) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_bytes': self._disk_bytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
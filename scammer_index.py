@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Substring search index for scammer records.
+Every 1..n character gram of each indexed field maps to a posting list of
+record ids. Ids are assigned in insertion order, so appending keeps every
+list sorted and records can be added without a rebuild. A query shorter than
+the longest gram is answered straight from its posting list. Longer queries
+walk the smallest posting list of their grams, skip ids missing from the
+next-smallest lists (binary search), and check the substring on what is left.
+
+Phone numbers are indexed both as written and as normalized digits
+(+60 / 60 country prefix folded to a leading 0), matching how
+data/scammer-database.json stores them (e.g. 0163411403).
+
+ExactMatchTable answers whole-value phone/email/account lookups from hash
+tables for batch screening.
+
+Both return records in one shape (RECORD_FIELDS): reported scammers
+(type 'scammer') and scammer database entries (type 'phone' or
+'bank_account') carry the same fields, None where a source has no value.
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+
+# Identifiers are short, so longer grams keep their posting lists selective;
+# free text uses trigrams to keep the index small
+IDENTIFIER_GRAM = 4
+TEXT_GRAM = 3
+
+# Fields of every search and lookup record
+RECORD_FIELDS = ('id', 'type', 'scammer_email', 'scammer_phone', 'scammer_website', 'scammer_social_media',
+                 'bank_account', 'scam_type', 'description', 'verification_status', 'threat_level',
+                 'location', 'first_reported', 'last_updated', 'report_count', 'police_reports', 'rank',
+                 'is_active')
+
+_PHONE_QUERY = re.compile(r'^\+?[\d\s\-().]+$')
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(value):
+    """Digits only, with a +60 / 60 country prefix replaced by 0."""
+    digits = _NON_DIGITS.sub('', str(value))
+    if digits.startswith('60') and len(digits) >= 10:
+        digits = '0' + digits[2:]
+    return digits
+
+
+def scammer_record(scammer):
+    """Fill in the RECORD_FIELDS a reported scammer (FAKE_SCAMMERS entry) lacks, in place."""
+    scammer.setdefault('type', 'scammer')
+    scammer.setdefault('scammer_social_media', {})
+    scammer.setdefault('police_reports', 0)
+    for field in RECORD_FIELDS:
+        scammer.setdefault(field, None)
+    return scammer
+
+
+def database_record(kind, entry):
+    """
+    A data/scammer-database.json entry in the shared record shape.
+
+    Args:
+        kind: 'phone' or 'bank_account'
+        entry: {'rank', 'phone' or 'account', 'police_reports'}
+    """
+    police_reports = entry.get('police_reports', 0)
+    record = dict.fromkeys(RECORD_FIELDS)
+    if kind == 'phone':
+        record.update(id=f"phone-{entry.get('rank')}", scammer_phone=str(entry.get('phone', '')),
+                      description=f'Phone number reported {police_reports} time(s) to police',
+                      threat_level='high' if police_reports >= 15 else 'medium' if police_reports >= 10 else 'low')
+    else:
+        record.update(id=f"bank-{entry.get('rank')}", bank_account=str(entry.get('account', '')),
+                      description=f'Bank account reported {police_reports} time(s) to police',
+                      threat_level='high' if police_reports >= 20 else 'medium' if police_reports >= 15 else 'low')
+    record.update(type=kind, scammer_social_media={}, verification_status='verified',
+                  report_count=police_reports, police_reports=police_reports, rank=entry.get('rank'),
+                  is_active=True)
+    return record
+
+
+def _looks_like_phone(query):
+    return bool(_PHONE_QUERY.match(query)) and sum(ch.isdigit() for ch in query) >= 3
+
+
+class _GramPostings:
+    """Posting lists for every 1..max_n gram of the values added."""
+
+    def __init__(self, max_n):
+        self.max_n = max_n
+        self.postings = {}
+        self.values = {}
+        self.entries = 0
+
+    def add(self, doc_id, values):
+        values = tuple(value for value in values if value)
+        if not values:
+            return
+        self.values[doc_id] = values
+        grams = set()
+        for value in values:
+            length = len(value)
+            for n in range(1, self.max_n + 1):
+                for i in range(length - n + 1):
+                    grams.add(value[i:i + n])
+        postings = self.postings
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(doc_id)
+        self.entries += len(grams)
+
+    def search(self, query, after=-1):
+        """Yield ids greater than `after` of documents with a value containing query, in increasing order."""
+        if len(query) <= self.max_n:
+            # Every substring this short is itself a gram: the posting list is the answer
+            posting = self.postings.get(query, ())
+            for index in range(bisect_left(posting, after + 1), len(posting)):
+                yield posting[index]
+            return
+
+        n = self.max_n
+        lists = []
+        for gram in {query[i:i + n] for i in range(len(query) - n + 1)}:
+            posting = self.postings.get(gram)
+            if not posting:
+                return
+            lists.append(posting)
+        lists.sort(key=len)
+        smallest, others = lists[0], lists[1:3]
+        values = self.values
+        for position in range(bisect_left(smallest, after + 1), len(smallest)):
+            doc_id = smallest[position]
+            for other in others:
+                index = bisect_left(other, doc_id)
+                if index == len(other) or other[index] != doc_id:
+                    break
+            else:
+                if any(query in value for value in values[doc_id]):
+                    yield doc_id
+
+
+class ScammerIndex:
+    """
+    Incremental substring index over scammer records.
+
+    Identifier fields (email, phone, website, account) and free-text fields
+    (description) are kept in separate posting maps with different gram sizes.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._identifiers = _GramPostings(IDENTIFIER_GRAM)
+        self._text = _GramPostings(TEXT_GRAM)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record, identifiers=(), phones=(), text=()):
+        """
+        Index one record.
+
+        Args:
+            record: The object returned by search()
+            identifiers: Strings matched as written (emails, websites, accounts)
+            phones: Phone numbers, matched as written and normalized
+            text: Free-text strings (e.g. the description)
+
+        Returns:
+            int: The record's id in this index
+        """
+        identifier_values = [str(value or '').lower() for value in identifiers]
+        for value in phones:
+            value = str(value or '').lower()
+            identifier_values.append(value)
+            if value and '*' not in value:
+                # Also index the canonical form so "+60 16-341 1403" finds 0163411403
+                identifier_values.append(normalize_phone(value))
+        with self._lock:
+            doc_id = len(self.records)
+            self.records.append(record)
+            self._identifiers.add(doc_id, identifier_values)
+            self._text.add(doc_id, (str(value or '').lower() for value in text))
+        return doc_id
+
+    def add_scammer(self, scammer):
+        """Index a FAKE_SCAMMERS-style record (normalized in place by scammer_record())."""
+        scammer = scammer_record(scammer)
+        return self.add(scammer,
+                        identifiers=(scammer.get('scammer_email'), scammer.get('scammer_website')),
+                        phones=(scammer.get('scammer_phone'),),
+                        text=(scammer.get('description'),))
+
+    def iter_ids(self, query, after=-1):
+        """Yield matching record ids greater than `after` in insertion order, without duplicates."""
+        query = query.strip().lower()
+        if not query:
+            return
+        variants = {query}
+        if _looks_like_phone(query):
+            variants.add(normalize_phone(query))
+        streams = []
+        for variant in variants:
+            if variant:
+                streams.append(self._identifiers.search(variant, after))
+                streams.append(self._text.search(variant, after))
+        last = None
+        for doc_id in heapq.merge(*streams):
+            if doc_id != last:
+                last = doc_id
+                yield doc_id
+
+    def count(self, query):
+        """Number of records matching query, without collecting them."""
+        return sum(1 for _ in self.iter_ids(query))
+
+    def search(self, query, limit=None):
+        """
+        Records with a field containing query (case-insensitive).
+
+        Args:
+            query: Substring to look for
+            limit: Stop after this many matches (None for all)
+
+        Returns:
+            list: Matching records in insertion order
+        """
+        results = []
+        for doc_id in self.iter_ids(query):
+            results.append(self.records[doc_id])
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def stats(self):
+        return {
+            'records': len(self.records),
+            'identifier_grams': len(self._identifiers.postings),
+            'identifier_postings': self._identifiers.entries,
+            'text_grams': len(self._text.postings),
+            'text_postings': self._text.entries
+        }
+
+
+def load_database_records(path):
+    """
+    Read data/scammer-database.json into search records.
+
+    Returns:
+        list: database_record() records of type 'phone' or 'bank_account'
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    records = [database_record('phone', entry) for entry in data.get('phone_numbers', [])]
+    records.extend(database_record('bank_account', entry) for entry in data.get('bank_accounts', []))
+    return records
+
+
+def normalize_email(value):
+    return str(value).strip().lower()
+
+
+def normalize_account(value):
+    return _NON_DIGITS.sub('', str(value))
+
+
+NORMALIZERS = {
+    'phone': normalize_phone,
+    'email': normalize_email,
+    'account': normalize_account
+}
+
+
+class ExactMatchTable:
+    """
+    Hash tables from normalized phone, email and account values to records.
+
+    Lookups are O(1) per value, for screening large lists of identifiers.
+    """
+
+    def __init__(self):
+        self.tables = {kind: {} for kind in NORMALIZERS}
+        self._lock = threading.Lock()
+
+    def add(self, kind, value, record):
+        """Map one identifier to a record (masked values such as 011-***-4567 are skipped)."""
+        if not value or '*' in str(value):
+            return
+        key = NORMALIZERS[kind](value)
+        if not key:
+            return
+        with self._lock:
+            self.tables[kind].setdefault(key, []).append(record)
+
+    def add_scammer(self, scammer):
+        scammer = scammer_record(scammer)
+        self.add('phone', scammer.get('scammer_phone'), scammer)
+        self.add('email', scammer.get('scammer_email'), scammer)
+
+    def lookup(self, value, kind=None):
+        """
+        Find records for one identifier.
+
+        Args:
+            value: Phone number, email or bank account as written
+            kind: 'phone', 'email' or 'account'; guessed from the value when None
+                  (digit strings are checked as both phone and account)
+
+        Returns:
+            tuple: (kind matched or guessed, normalized value, list of records)
+        """
+        value = str(value).strip()
+        if kind is None:
+            if '@' in value:
+                kinds = ('email',)
+            else:
+                kinds = ('phone', 'account')
+        else:
+            kinds = (kind,)
+        normalized = None
+        for candidate in kinds:
+            normalized = NORMALIZERS[candidate](value)
+            records = self.tables[candidate].get(normalized)
+            if records:
+                return candidate, normalized, list(records)
+        return kinds[0], normalized, []
+
+    def stats(self):
+        return {kind: len(table) for kind, table in self.tables.items()}
+
+
+def build_lookup(scammers, database_records=()):
+    """Exact-match tables over FAKE_SCAMMERS-style records and database records."""
+    table = ExactMatchTable()
+    for scammer in scammers:
+        table.add_scammer(scammer)
+    for record in database_records:
+        if record['type'] == 'phone':
+            table.add('phone', record['scammer_phone'], record)
+        else:
+            table.add('account', record['bank_account'], record)
+    return table
+
+
+def build_index(scammers, database_records=()):
+    """Index FAKE_SCAMMERS-style records, then the scammer database records."""
+    index = ScammerIndex()
+    for scammer in scammers:
+        index.add_scammer(scammer)
+    for record in database_records:
+        if record['type'] == 'phone':
+            index.add(record, phones=(record['scammer_phone'],))
+        else:
+            index.add(record, identifiers=(record['bank_account'],))
+    return index
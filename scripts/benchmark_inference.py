@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+AI Detection Inference Benchmark
+Measures cold start, warm latency percentiles, throughput across batch sizes
+and thread counts, serving (micro-batching) and bulk scan performance, and
+peak RSS for ai_detection_inference.py. Results are written as JSON so runs
+can be diffed in CI.
+
+Runs on synthetic images; when best_model.pth is absent (or with
+--random-weights) a randomly initialized tf_efficientnetv2_s is used.
+
+Usage:
+    python scripts/benchmark_inference.py --output bench.json
+    python scripts/benchmark_inference.py --quick --sections warm throughput
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import ai_detection_inference as inference
+from ai_detection_batching import MicroBatcher
+
+SECTIONS = ('cold', 'warm', 'throughput', 'serving', 'bulk')
+DEFAULT_RESOLUTIONS = ('384x384', '1280x720', '1920x1080', '4032x3024')
+
+
+def percentiles(samples_ms):
+    """Summary statistics for a list of millisecond timings."""
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(pick(0.50), 3),
+        'p95_ms': round(pick(0.95), 3),
+        'p99_ms': round(pick(0.99), 3),
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3)
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def make_images(directory, resolutions):
+    """Write one synthetic photo-like JPEG per resolution (plus a PNG of the first)."""
+    # numpy/PIL only: torch is kept out of this process until after the cold-start runs,
+    # because forked children inherit the parent's RSS in ru_maxrss
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    images = {}
+    for resolution in resolutions:
+        width, height = (int(v) for v in resolution.split('x'))
+        # Smooth gradients plus noise compress like a photo rather than pure noise
+        x = np.linspace(0, 1, width, dtype=np.float32)
+        y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+        base = np.stack([np.sin(y * 9 + x * 4), np.cos(x * 7) * y, np.sin(x * y * 20)], axis=-1)
+        pixels = np.clip(base * 100 + 128 + rng.normal(0, 12, (height, width, 3)), 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f'synthetic_{resolution}.jpg')
+        Image.fromarray(pixels).save(path, quality=90)
+        images[resolution] = path
+        if len(images) == 1:
+            png_path = os.path.join(directory, f'synthetic_{resolution}.png')
+            Image.fromarray(pixels).save(png_path)
+            images[f'{resolution}-png'] = png_path
+    return images
+
+
+def prepare_weights(directory, force_random):
+    """Return (weights_path, is_random), creating random weights if needed."""
+    if not force_random and os.path.exists(inference.MODEL_PATH):
+        return os.path.abspath(inference.MODEL_PATH), False
+    path = os.path.join(directory, 'random_model.pth')
+    # Built in a child process for the same reason as make_images()
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--write-random-weights', path],
+                   check=True, cwd=ROOT_DIR)
+    return path, True
+
+
+def write_random_weights(path):
+    """Save a randomly initialized model with the production architecture."""
+    inference.ensure_dependencies(with_model=True)
+    model = inference.timm.create_model(inference.MODEL_NAME, pretrained=False, num_classes=inference.NUM_CLASSES)
+    inference.torch.save(model.state_dict(), path)
+
+
+def bench_cold(weights_path, image_path, runs, cache_dir):
+    """Spawn the CLI like AIDetectionTester does; cold, then with a warm verdict cache."""
+    script = os.path.join(ROOT_DIR, 'ai_detection_inference.py')
+    results = {}
+    for mode in ('no_cache', 'cache_hit'):
+        env = dict(os.environ, AI_MODEL_PATH=weights_path, AI_STARTUP_REPORT='1', AI_CACHE_DIR=cache_dir)
+        if mode == 'no_cache':
+            env['AI_CACHE'] = '0'
+        else:
+            # Prime the cache so every timed run is a hit
+            subprocess.run([sys.executable, script, image_path], env=env, capture_output=True, cwd=ROOT_DIR)
+
+        wall_ms, rss_mb, breakdowns = [], [], []
+        for _ in range(runs):
+            with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+                started = time.perf_counter()
+                process = subprocess.Popen([sys.executable, script, image_path], env=env, cwd=ROOT_DIR,
+                                           stdout=out, stderr=err)
+                # wait4 gives this child's own peak RSS (RUSAGE_CHILDREN is the max over all children)
+                _, status, usage = os.wait4(process.pid, 0)
+                wall_ms.append((time.perf_counter() - started) * 1000)
+                process.returncode = os.waitstatus_to_exitcode(status)
+                rss_mb.append(round(usage.ru_maxrss / 1024, 1))
+                out.seek(0)
+                err.seek(0)
+                stdout, stderr = out.read().decode(), err.read().decode()
+            if process.returncode != 0:
+                raise RuntimeError(f'CLI failed: {stdout[:200]} {stderr[:200]}')
+            for line in stderr.splitlines():
+                if line.startswith('{"startup"'):
+                    breakdowns.append(json.loads(line)['startup'])
+
+        results[mode] = {
+            'wall': percentiles(wall_ms),
+            'peak_rss_mb': max(rss_mb) if rss_mb else None,
+            'startup_breakdown': breakdowns[-1] if breakdowns else None
+        }
+    return results
+
+
+def bench_warm(model, images, iterations, warmup):
+    """In-process predict_image() latency per resolution, split by stage."""
+    torch = inference.torch
+    results = {}
+    for name, path in images.items():
+        for _ in range(warmup):
+            inference.predict_image(model, path)
+        preprocess_ms, forward_ms, total_ms = [], [], []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            tensor = inference.preprocess_image(path)
+            preprocessed = time.perf_counter()
+            with torch.no_grad():
+                inference.predict_batch(model, [tensor])
+            finished = time.perf_counter()
+            preprocess_ms.append((preprocessed - started) * 1000)
+            forward_ms.append((finished - preprocessed) * 1000)
+            total_ms.append((finished - started) * 1000)
+        results[name] = {
+            'preprocess': percentiles(preprocess_ms),
+            'predict': percentiles(forward_ms),
+            'end_to_end': percentiles(total_ms)
+        }
+    return results
+
+
+def bench_throughput(model, image_path, batch_sizes, thread_counts, seconds):
+    """Forward-pass images/sec for each (threads, batch size) pair."""
+    torch = inference.torch
+    tensor = inference.preprocess_image(image_path)
+    original_threads = torch.get_num_threads()
+    results = []
+    for threads in thread_counts:
+        torch.set_num_threads(threads)
+        for batch_size in batch_sizes:
+            tensors = [tensor] * batch_size
+            inference.predict_batch(model, tensors)  # warm-up
+            images = 0
+            batch_ms = []
+            started = time.perf_counter()
+            while time.perf_counter() - started < seconds or not batch_ms:
+                batch_started = time.perf_counter()
+                inference.predict_batch(model, tensors)
+                batch_ms.append((time.perf_counter() - batch_started) * 1000)
+                images += batch_size
+            elapsed = time.perf_counter() - started
+            results.append({
+                'threads': threads,
+                'batch_size': batch_size,
+                'images_per_second': round(images / elapsed, 2),
+                'batch_latency': percentiles(batch_ms)
+            })
+    torch.set_num_threads(original_threads)
+    return results
+
+
+def bench_serving(model, image_path, concurrency_levels, requests_per_client, max_batch_size, max_wait_ms):
+    """Concurrent clients through MicroBatcher, as in ai_detection_server.py."""
+    batcher = MicroBatcher(lambda tensors: inference.predict_batch(model, tensors), max_batch_size, max_wait_ms)
+    results = []
+    try:
+        for concurrency in concurrency_levels:
+            latencies = []
+            lock = threading.Lock()
+
+            def client():
+                for _ in range(requests_per_client):
+                    started = time.perf_counter()
+                    batcher.predict(inference.preprocess_image(image_path))
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+
+            before = batcher.stats()
+            started = time.perf_counter()
+            threads = [threading.Thread(target=client) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            after = batcher.stats()
+            batches = after['batches_run'] - before['batches_run']
+            results.append({
+                'concurrency': concurrency,
+                'max_batch_size': max_batch_size,
+                'max_wait_ms': max_wait_ms,
+                'requests_per_second': round(len(latencies) / elapsed, 2),
+                'mean_batch_size': round((after['items_run'] - before['items_run']) / batches, 2) if batches else 0,
+                'latency': percentiles(latencies)
+            })
+    finally:
+        batcher.stop()
+    return results
+
+
+def bench_bulk(model, images, copies, batch_size, workers, directory):
+    """scan_images() over a folder of synthetic images (verdict cache disabled)."""
+    folder = os.path.join(directory, 'bulk')
+    os.makedirs(folder, exist_ok=True)
+    for name, path in images.items():
+        for i in range(copies):
+            shutil.copy(path, os.path.join(folder, f'{i}_{os.path.basename(path)}'))
+    paths = list(inference.iter_image_paths([folder]))
+
+    first_result_ms = None
+    started = time.perf_counter()
+    scored = 0
+    for result in inference.scan_images(model, paths, batch_size, workers):
+        if first_result_ms is None:
+            first_result_ms = (time.perf_counter() - started) * 1000
+        scored += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'images': scored,
+        'batch_size': batch_size,
+        'workers': workers,
+        'images_per_second': round(scored / elapsed, 2),
+        'time_to_first_result_ms': round(first_result_ms or 0.0, 3),
+        'elapsed_seconds': round(elapsed, 3)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Benchmark AI detection inference')
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument('--resolutions', nargs='+', default=list(DEFAULT_RESOLUTIONS))
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Use a randomly initialized model even if best_model.pth exists')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed iterations per warm measurement')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cold-runs', type=int, default=3)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--threads', type=int, nargs='+',
+                        default=sorted({1, max(1, cpu_count // 2), cpu_count}))
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each throughput measurement')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--quick', action='store_true', help='Small iteration counts for CI smoke runs')
+    parser.add_argument('--write-random-weights', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.write_random_weights:
+        write_random_weights(args.write_random_weights)
+        return
+
+    if args.quick:
+        args.iterations, args.warmup, args.cold_runs, args.seconds = 3, 1, 1, 1.0
+        args.batch_sizes = [1, 4]
+        args.concurrency = [1, 4]
+
+    work_dir = tempfile.mkdtemp(prefix='ai_detection_bench_')
+    try:
+        images = make_images(work_dir, args.resolutions)
+        weights_path, random_weights = prepare_weights(work_dir, args.random_weights)
+        report = {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'git_commit': git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': cpu_count
+            },
+            'config': {
+                'model_name': inference.MODEL_NAME,
+                'img_size': inference.IMG_SIZE,
+                'random_weights': random_weights,
+                'backend': inference.BACKEND,
+                'preprocess': inference.PREPROCESS,
+                'channels_last': inference.CHANNELS_LAST,
+                'resolutions': args.resolutions
+            },
+            'results': {}
+        }
+
+        if 'cold' in args.sections:
+            report['results']['cold_start'] = bench_cold(
+                weights_path, images[args.resolutions[0]], args.cold_runs, os.path.join(work_dir, 'cache'))
+
+        inference.ensure_dependencies(with_model=True)
+        report['environment']['torch'] = inference.torch.__version__
+        report['environment']['device'] = str(inference.device)
+
+        model = inference.load_model(weights_path)
+        if model is None:
+            raise RuntimeError(f'Failed to load model: {weights_path}')
+        report['results']['model_load_peak_rss_mb'] = peak_rss_mb()
+
+        if 'warm' in args.sections:
+            report['results']['warm_latency'] = bench_warm(model, images, args.iterations, args.warmup)
+        if 'throughput' in args.sections:
+            report['results']['throughput'] = bench_throughput(
+                model, images[args.resolutions[0]], args.batch_sizes, args.threads, args.seconds)
+        if 'serving' in args.sections:
+            report['results']['serving'] = bench_serving(
+                model, images[args.resolutions[0]], args.concurrency, max(2, args.iterations // 2),
+                max(args.batch_sizes), 10.0)
+        if 'bulk' in args.sections:
+            report['results']['bulk'] = bench_bulk(
+                model, images, max(1, args.iterations // 4), 8, cpu_count, work_dir)
+
+        report['results']['peak_rss_mb'] = peak_rss_mb()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
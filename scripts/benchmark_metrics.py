@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Metrics Overhead Benchmark
+Measures the cost of the request instrumentation in app.py: per-call cost of
+Counter.inc / Gauge.inc / Histogram.observe, and per-request cost of the
+RequestMetricsMiddleware on a cheap route, measured through the Flask test
+client in alternating rounds with the middleware installed and removed.
+Results are printed as JSON.
+
+Usage:
+    python scripts/benchmark_metrics.py [--requests 2000 --rounds 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def per_call_ns(stmt, setup, number):
+    """Best-of-5 nanoseconds per call."""
+    return round(min(timeit.repeat(stmt, setup=setup, number=number, repeat=5)) / number * 1e9, 1)
+
+
+def primitive_costs(number):
+    setup = ('import metrics\n'
+             'c = metrics.Counter("bench_total", "", ("route", "method", "status"))\n'
+             'g = metrics.Gauge("bench_in_flight", "")\n'
+             'h = metrics.Histogram("bench_seconds", "", ("route", "method"))')
+    return {
+        'counter_inc_ns': per_call_ns('c.inc(route="/api/status", method="GET", status=200)', setup, number),
+        'gauge_inc_ns': per_call_ns('g.inc()', setup, number),
+        'histogram_observe_ns': per_call_ns('h.observe(0.0042, route="/api/status", method="GET")', setup, number),
+        'perf_counter_ns': per_call_ns('perf_counter()', 'from time import perf_counter', number)
+    }
+
+
+def middleware_ns(number):
+    """Nanoseconds the middleware adds around a WSGI app that does nothing."""
+    setup = ('import app\n'
+             'rule = app.app.url_map._rules[0]\n'
+             'def inner(environ, start_response):\n'
+             '    environ["app.url_rule"] = rule\n'
+             '    start_response("200 OK", [])\n'
+             '    return [b""]\n'
+             'wrapped = app.RequestMetricsMiddleware(inner)\n'
+             'environ = {"REQUEST_METHOD": "GET"}\n'
+             'start_response = lambda status, headers, exc_info=None: None')
+    return round(per_call_ns('wrapped(environ, start_response)', setup, number)
+                 - per_call_ns('inner(environ, start_response)', setup, number), 1)
+
+
+def set_metrics(app_module, middleware, enabled):
+    """Install or remove app.py's request metrics middleware and request class."""
+    flask_app = app_module.app
+    flask_app.wsgi_app = middleware if enabled else middleware.wsgi_app
+    flask_app.request_class = app_module.MetricsRequest if enabled else app_module.SpooledRequest
+
+
+def request_costs(requests_count, rounds, path):
+    """
+    Microseconds per request with the middleware on and off.
+
+    Rounds alternate between the two so drift and noise hit both equally;
+    the best round of each is reported alongside the median.
+    """
+    import app
+    middleware = app.app.wsgi_app
+    if not isinstance(middleware, app.RequestMetricsMiddleware):
+        middleware = app.RequestMetricsMiddleware(middleware)
+    client = app.app.test_client()
+    for _ in range(500):
+        client.get(path)
+    samples = {True: [], False: []}
+    for _ in range(rounds):
+        for enabled in (False, True):
+            set_metrics(app, middleware, enabled)
+            started = time.perf_counter()
+            for _ in range(requests_count):
+                client.get(path)
+            samples[enabled].append((time.perf_counter() - started) / requests_count * 1e6)
+    set_metrics(app, middleware, app.HTTP_METRICS)
+    summary = {}
+    for enabled, values in samples.items():
+        values.sort()
+        summary['metrics_on' if enabled else 'metrics_off'] = {'best_us': round(values[0], 2),
+                                                               'median_us': round(values[len(values) // 2], 2)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request metrics overhead')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per timed round')
+    parser.add_argument('--calls', type=int, default=200000, help='Calls per primitive timing round')
+    parser.add_argument('--path', default='/api/language-check', help='Route to request (a 404 through '
+                        'serve_static by default, the cheapest path through the app)')
+    parser.add_argument('--rounds', type=int, default=10, help='Alternating on/off rounds')
+    args = parser.parse_args()
+
+    costs = request_costs(args.requests, args.rounds, args.path)
+    off, on = costs['metrics_off']['best_us'], costs['metrics_on']['best_us']
+    report = {
+        'python': sys.version.split()[0],
+        'primitives': dict(primitive_costs(args.calls), middleware_ns=middleware_ns(args.calls // 4)),
+        'request': dict(costs, path=args.path, requests_per_round=args.requests,
+                        overhead_us=round(on - off, 2),
+                        overhead_pct=round((on - off) / off * 100, 1) if off else None)
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+OSINT Search Benchmark
+Builds osint_index.OsintIndex over synthetic collected posts and reports build
+time, peak RSS, incremental add cost and per-query-type latency percentiles
+(with and without filters). Results are printed as JSON.
+
+Usage:
+    python scripts/benchmark_osint_search.py --posts 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import osint_index
+from osint_index import OsintIndex
+
+# Common words appear in most posts; topic words are the searchable signal
+COMMON = ('the', 'a', 'to', 'of', 'and', 'is', 'for', 'your', 'new', 'please', 'via', 'now')
+TOPICS = ('phishing', 'bank', 'sms', 'maybank', 'account', 'suspended', 'crypto', 'investment', 'returns',
+          'parcel', 'customs', 'fee', 'loan', 'approval', 'love', 'gift', 'police', 'lhdn', 'refund',
+          'macau', 'scam', 'transfer', 'urgent', 'verify', 'otp', 'whatsapp', 'telegram', 'job', 'petronas',
+          'deepfake', 'video', 'celebrity', 'giveaway', 'shopee', 'lazada', 'ewallet', 'tng', 'duitnow')
+LEVELS = ('low', 'medium', 'high', 'critical')
+LOCATIONS = ('Kuala Lumpur', 'Selangor', 'Penang', 'Johor', 'Sabah', 'Sarawak', 'Perak', 'Melaka')
+SOURCES = ('Facebook Malaysia Cybersecurity Group', 'Twitter', 'Telegram', 'Lowyat Forum', 'Reddit r/malaysia')
+
+
+def synthetic_posts(count, seed=0, start_id=1):
+    """Yield FAKE_OSINT_DATA-shaped posts with Zipf-like topic frequencies."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    base = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    for i in range(count):
+        topics = rng.choices(TOPICS, weights=weights, k=rng.randint(3, 8))
+        words = topics + list(rng.choices(COMMON, k=rng.randint(6, 14)))
+        rng.shuffle(words)
+        yield {
+            'id': start_id + i,
+            'source': rng.choice(SOURCES),
+            'content': ' '.join(words).capitalize() + '.',
+            'keywords': sorted(set(rng.sample(topics, min(len(topics), rng.randint(1, 4))))),
+            'threat_level': rng.choice(LEVELS),
+            'location': rng.choice(LOCATIONS),
+            'url': f'https://example.com/posts/{start_id + i}',
+            'collected_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(base + i * 30)),
+            'verified': rng.random() < 0.3
+        }
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'p50_ms': round(pick(0.50), 4),
+        'p99_ms': round(pick(0.99), 4),
+        'max_ms': round(ordered[-1], 4)
+    }
+
+
+def make_queries(rng, per_type, posts):
+    """Query mixes: rare and common topics, multi-term, and filtered variants."""
+    first = posts[0]['collected_at'][:10]
+    last = posts[-1]['collected_at'][:10]
+    rare, common = TOPICS[len(TOPICS) // 2:], TOPICS[:5]
+    return {
+        'rare_term': [dict(query=rng.choice(rare)) for _ in range(per_type)],
+        'common_term': [dict(query=rng.choice(common)) for _ in range(per_type)],
+        'three_terms': [dict(query=' '.join(rng.sample(TOPICS, 3))) for _ in range(per_type)],
+        'term_level_location': [dict(query=rng.choice(TOPICS), threat_level=rng.choice(LEVELS),
+                                     location=rng.choice(LOCATIONS)) for _ in range(per_type)],
+        'term_date_range': [dict(query=' '.join(rng.sample(TOPICS, 2)), collected_from=first,
+                                 collected_to=rng.choice((first, last))) for _ in range(per_type)],
+        'filters_only': [dict(threat_level=rng.choice(LEVELS), location=rng.choice(LOCATIONS))
+                         for _ in range(per_type)],
+        'miss': [dict(query='zzq' + str(rng.randint(0, 999))) for _ in range(per_type)]
+    }
+
+
+def time_queries(index, queries, limit):
+    latencies = []
+    hits = 0
+    for kwargs in queries:
+        started = time.perf_counter()
+        results = index.search(limit=limit, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += bool(results)
+    return dict(summarize(latencies), hit_rate=round(hits / len(queries), 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the OSINT threat search index')
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=100, help='Queries per query type')
+    parser.add_argument('--limit', type=int, default=20, help='Results per query (0 for unlimited)')
+    parser.add_argument('--no-numpy', action='store_true', help='Also time the pure-Python scorer')
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    rss_before = peak_rss_mb()
+    index = OsintIndex()
+    started = time.perf_counter()
+    for post in synthetic_posts(args.posts):
+        index.add(post)
+    build_seconds = time.perf_counter() - started
+    sample = [index.records[0], index.records[-1]]
+
+    # Incremental ingestion once the index is large
+    add_ms = []
+    for post in synthetic_posts(1000, seed=1, start_id=args.posts + 1):
+        started = time.perf_counter()
+        index.add(post)
+        add_ms.append((time.perf_counter() - started) * 1000)
+
+    limit = args.limit or None
+    report = {
+        'posts': len(index),
+        'limit': limit,
+        'build_seconds': round(build_seconds, 2),
+        'posts_per_second': round(args.posts / build_seconds) if build_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        'index': index.stats(),
+        'incremental_add': summarize(add_ms),
+        'queries': {}
+    }
+
+    queries = make_queries(random.Random(2), args.queries, sample)
+    for query_type, batch in queries.items():
+        report['queries'][query_type] = time_queries(index, batch, limit)
+
+    if args.no_numpy and osint_index.np is not None:
+        osint_index.np = None
+        report['queries_pure_python'] = {query_type: time_queries(index, batch[:max(1, len(batch) // 10)], limit)
+                                         for query_type, batch in queries.items()}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
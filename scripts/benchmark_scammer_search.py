@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Scammer Search Benchmark
+Builds scammer_index.ScammerIndex over synthetic records and reports build
+time, peak RSS, and per-query-type latency percentiles, next to the linear
+scan the search endpoint used before. Results are printed as JSON.
+
+Usage:
+    python scripts/benchmark_scammer_search.py --records 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scammer_index import ScammerIndex, database_record, scammer_record
+
+WORDS = ('fake', 'petronas', 'job', 'payment', 'investment', 'crypto', 'returns', 'bank', 'account',
+         'suspended', 'parcel', 'customs', 'loan', 'approval', 'fee', 'love', 'gift', 'police',
+         'lhdn', 'refund', 'macau', 'scam', 'transfer', 'urgent', 'verify', 'otp', 'whatsapp')
+DOMAINS = ('gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com')
+
+
+def synthetic_records(count, seed=0):
+    """Yield (record, identifiers, phones, text) tuples shaped like the real data."""
+    rng = random.Random(seed)
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            phone = '01' + ''.join(rng.choices('0123456789', k=rng.choice((8, 9))))
+            record = database_record('phone', {'rank': i, 'phone': phone, 'police_reports': rng.randint(1, 50)})
+            yield record, (), (phone,), ()
+        elif kind < 0.9:
+            account = ''.join(rng.choices('0123456789', k=rng.randint(10, 14)))
+            record = database_record('bank_account', {'rank': i, 'account': account,
+                                                      'police_reports': rng.randint(1, 50)})
+            yield record, (account,), (), ()
+        else:
+            name = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(5, 10)))
+            record = scammer_record({
+                'id': i,
+                'scammer_email': f'{name}@{rng.choice(DOMAINS)}',
+                'scammer_phone': '01' + ''.join(rng.choices('0123456789', k=8)),
+                'scammer_website': f'{name}-{rng.choice(WORDS)}.com',
+                'description': ' '.join(rng.choices(WORDS, k=rng.randint(6, 14)))
+            })
+            yield (record, (record['scammer_email'], record['scammer_website']),
+                   (record['scammer_phone'],), (record['description'],))
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'p50_ms': round(pick(0.50), 4),
+        'p99_ms': round(pick(0.99), 4),
+        'max_ms': round(ordered[-1], 4)
+    }
+
+
+def make_queries(index, rng, per_type):
+    """Sample queries of each type from indexed records."""
+    phones = [r['scammer_phone'] for r in index.records if r.get('type') == 'phone']
+    accounts = [r['bank_account'] for r in index.records if r.get('type') == 'bank_account']
+    people = [r for r in index.records if r.get('type') == 'scammer']
+    queries = {
+        'exact_phone': [rng.choice(phones) for _ in range(per_type)],
+        'formatted_phone': ['+6' + p[:3] + '-' + p[3:6] + ' ' + p[6:] for p in
+                            (rng.choice(phones) for _ in range(per_type))],
+        'partial_phone_6': [p[3:9] for p in (rng.choice(phones) for _ in range(per_type))],
+        'exact_account': [rng.choice(accounts) for _ in range(per_type)],
+        'email_fragment': [r['scammer_email'].split('@')[0][:6] for r in
+                           (rng.choice(people) for _ in range(per_type))],
+        'description_phrase': [' '.join(rng.choices(WORDS, k=2)) for _ in range(per_type)],
+        'miss': ['zz' + ''.join(rng.choices('qxj', k=6)) for _ in range(per_type)]
+    }
+    return queries
+
+
+def linear_scan(records, query):
+    """The pre-index search: lowercase every field of every record and test the substring."""
+    query = query.lower()
+    results = []
+    for record in records:
+        for field in ('scammer_email', 'scammer_phone', 'scammer_website', 'description', 'bank_account'):
+            if query in str(record.get(field) or '').lower():
+                results.append(record)
+                break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scammer search index')
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200, help='Queries per query type')
+    parser.add_argument('--limit', type=int, default=50, help='Result limit per query (0 for unlimited)')
+    parser.add_argument('--linear-queries', type=int, default=5, help='Queries timed against the linear scan')
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    rss_before = peak_rss_mb()
+    index = ScammerIndex()
+    started = time.perf_counter()
+    for record, identifiers, phones, text in synthetic_records(args.records):
+        index.add(record, identifiers=identifiers, phones=phones, text=text)
+    build_seconds = time.perf_counter() - started
+
+    # Incremental add cost once the index is large
+    add_ms = []
+    for record, identifiers, phones, text in synthetic_records(1000, seed=1):
+        started = time.perf_counter()
+        index.add(record, identifiers=identifiers, phones=phones, text=text)
+        add_ms.append((time.perf_counter() - started) * 1000)
+
+    rng = random.Random(2)
+    limit = args.limit or None
+    report = {
+        'records': len(index),
+        'limit': limit,
+        'build_seconds': round(build_seconds, 2),
+        'records_per_second': round(args.records / build_seconds) if build_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        'index': index.stats(),
+        'incremental_add': summarize(add_ms),
+        'queries': {},
+        'linear_scan': {}
+    }
+
+    for query_type, queries in make_queries(index, rng, args.queries).items():
+        latencies = []
+        hits = 0
+        for query in queries:
+            started = time.perf_counter()
+            results = index.search(query, limit)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += bool(results)
+        report['queries'][query_type] = dict(summarize(latencies), hit_rate=round(hits / len(queries), 3))
+
+        if args.linear_queries:
+            latencies = []
+            for query in queries[:args.linear_queries]:
+                started = time.perf_counter()
+                linear_scan(index.records, query)
+                latencies.append((time.perf_counter() - started) * 1000)
+            report['linear_scan'][query_type] = summarize(latencies)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Local Sightengine Stand-in
+Answers every GET (analyze_url) and POST (analyze_upload) with a
+check.json-shaped result after a configurable delay, and injects 5xx errors
+and 429 throttling at configurable rates. Point SIGHTENGINE_API_URL at it to
+exercise app.py without spending API calls (scripts/loadtest.py does this).
+
+Usage:
+    python scripts/fake_sightengine.py --port 9100 --latency-ms 300 --error-rate 0.02
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSightengineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Set by serve()
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    error_status = 503
+    throttle_rate = 0.0
+    counts = None
+    counts_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self.counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _answer(self):
+        # Drain the upload so keep-alive connections stay usable
+        length = int(self.headers.get('Content-Length') or 0)
+        while length > 0:
+            chunk = self.rfile.read(min(length, 64 * 1024))
+            if not chunk:
+                break
+            length -= len(chunk)
+
+        if self.path.startswith('/__stats'):
+            with self.counts_lock:
+                self._reply(200, dict(self.counts))
+            return
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < self.throttle_rate:
+            self._count('throttled')
+            self._reply(429, {'status': 'failure', 'error': {'type': 'usage_limit', 'code': 32,
+                                                              'message': 'Too many requests'}})
+        elif roll < self.throttle_rate + self.error_rate:
+            self._count('errors')
+            self._reply(self.error_status, {'status': 'failure', 'error': {'type': 'internal_error',
+                                                                          'message': 'Injected error'}})
+        else:
+            self._count('success')
+            self._reply(200, {
+                'status': 'success',
+                'request': {'id': f'req_{uuid.uuid4().hex[:16]}', 'timestamp': time.time(), 'operations': 2},
+                'type': {'deepfake': round(random.random(), 3), 'ai_generated': round(random.random(), 3)},
+                'media': {'id': f'med_{uuid.uuid4().hex[:16]}', 'uri': 'media.jpg'}
+            })
+
+    do_GET = _answer
+    do_POST = _answer
+
+
+def serve(host='127.0.0.1', port=9100, latency_ms=300, jitter_ms=100, error_rate=0.0, error_status=503,
+          throttle_rate=0.0):
+    """
+    Run the stand-in until interrupted.
+
+    Args:
+        latency_ms: Mean response delay
+        jitter_ms: Uniform +/- spread around latency_ms
+        error_rate: Fraction of requests answered with error_status
+        error_status: Status used for injected errors
+        throttle_rate: Fraction of requests answered with 429
+    """
+    handler = type('Handler', (FakeSightengineHandler,), {
+        'latency': latency_ms / 1000, 'jitter': min(jitter_ms, latency_ms) / 1000,
+        'error_rate': error_rate, 'error_status': error_status, 'throttle_rate': throttle_rate,
+        'counts': {}
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(json.dumps({'listening': f'http://{host}:{server.server_port}/1.0/check.json'}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Sightengine stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=300, help='Mean response delay')
+    parser.add_argument('--jitter-ms', type=float, default=100, help='Uniform +/- spread around the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction answered with 429')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status,
+          args.throttle_rate)
+
+
+if __name__ == '__main__':
+    main()
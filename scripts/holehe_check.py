@@ -3,120 +3,219 @@
 Holehe Email Checker Wrapper
 Checks if an email is registered on various websites
 Requires: pip install holehe
+
+Runs holehe's per-site modules in-process on one shared httpx.AsyncClient
+instead of shelling out to the holehe CLI. At most --concurrency sites are
+checked at once, each within --timeout seconds, and the whole check stops
+after --total-timeout seconds. A site that times out or fails is reported
+with status 'error' (counted in error_count, with timeout_count as the
+timeouts among them); 'rate_limit' is only used when the site itself
+reported throttling.
+
+Output is the check_email() summary as JSON. With --stream, one NDJSON line
+is printed per site as soon as it resolves ({"type": "platform", ...}),
+followed by the summary on the last line.
+
+Usage:
+    python scripts/holehe_check.py user@example.com
+    python scripts/holehe_check.py user@example.com --stream --concurrency 30 --timeout 8
 """
 
-import sys
+import argparse
+import asyncio
 import json
-import subprocess
-import re
+import os
+import sys
+import time
+
+try:
+    import httpx
+    from holehe.core import get_functions, import_submodules
+    holehe_available = True
+except ImportError:
+    holehe_available = False
+
+# Sites checked at once, seconds allowed per site, and for the whole check
+HOLEHE_CONCURRENCY = int(os.environ.get('HOLEHE_CONCURRENCY', 25))
+HOLEHE_SITE_TIMEOUT = float(os.environ.get('HOLEHE_SITE_TIMEOUT', 10))
+HOLEHE_TOTAL_TIMEOUT = float(os.environ.get('HOLEHE_TOTAL_TIMEOUT', 120))
+
+STATUS_SYMBOLS = {'used': '+', 'not_used': '-', 'rate_limit': 'x', 'error': '!'}
+
+
+def load_modules():
+    """holehe's site check coroutines (one per website)."""
+    return get_functions(import_submodules('holehe.modules'))
+
+
+def platform_result(name, output=None, error=None, elapsed=None):
+    """
+    Platform entry in the summary's shape from a holehe module's output dict.
+
+    Failed or timed-out sites get status 'error' (found unknown) with the
+    reason in 'error'; sites that reported throttling get 'rate_limit'.
+    """
+    output = output or {}
+    if error is not None:
+        status = 'error'
+        found = None
+    elif output.get('rateLimit'):
+        status = 'rate_limit'
+        found = None
+    elif output.get('exists'):
+        status = 'used'
+        found = True
+    else:
+        status = 'not_used'
+        found = False
+
+    result = {
+        'platform': output.get('domain') or name,
+        'status': status,
+        'found': found,
+        'status_symbol': STATUS_SYMBOLS[status]
+    }
+    if error is not None:
+        result['error'] = error
+    if output.get('emailrecovery'):
+        result['email_recovery'] = output['emailrecovery']
+    if output.get('phoneNumber'):
+        result['phone_number'] = output['phoneNumber']
+    if output.get('others'):
+        result['others'] = output['others']
+    if elapsed is not None:
+        result['elapsed'] = round(elapsed, 3)
+    return result
+
+
+async def check_site(module, email, client, semaphore, timeout, deadline):
+    """Run one holehe module under the semaphore, within its timeout and the overall deadline."""
+    name = module.__name__
+    async with semaphore:
+        started = time.monotonic()
+        remaining = min(timeout, deadline - started)
+        if remaining <= 0:
+            return platform_result(name, error='timeout', elapsed=0)
+        out = []
+        try:
+            await asyncio.wait_for(module(email, client, out), remaining)
+        except asyncio.TimeoutError:
+            return platform_result(name, error='timeout', elapsed=time.monotonic() - started)
+        except Exception as e:
+            return platform_result(name, error=f'{type(e).__name__}: {e}', elapsed=time.monotonic() - started)
+        if not out:
+            return platform_result(name, error='no result', elapsed=time.monotonic() - started)
+        return platform_result(name, out[0], elapsed=time.monotonic() - started)
+
+
+async def run_checks(email, on_result=None, modules=None, concurrency=HOLEHE_CONCURRENCY,
+                     timeout=HOLEHE_SITE_TIMEOUT, total_timeout=HOLEHE_TOTAL_TIMEOUT):
+    """
+    Check every site concurrently.
+
+    Args:
+        email: Email address to check
+        on_result: Called with each platform entry as soon as it resolves
+        modules: Site check coroutines (defaults to every holehe module)
+        concurrency: Sites checked at once
+        timeout: Seconds allowed per site
+        total_timeout: Seconds allowed for the whole check; sites still waiting time out
+
+    Returns:
+        list: Platform entries in completion order
+    """
+    if modules is None:
+        modules = load_modules()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limits = httpx.Limits(max_connections=max(1, concurrency), max_keepalive_connections=max(1, concurrency))
+    deadline = time.monotonic() + total_timeout
+    results = []
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        tasks = [check_site(module, email, client, semaphore, timeout, deadline) for module in modules]
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
 
-def check_email(email):
+def summarize(email, platforms, time_taken):
+    """check_email() result for a list of platform entries."""
+    platforms = sorted(platforms, key=lambda p: p['platform'])
+    used_count = len([p for p in platforms if p.get('status') == 'used'])
+    not_used_count = len([p for p in platforms if p.get('status') == 'not_used'])
+    rate_limit_count = len([p for p in platforms if p.get('status') == 'rate_limit'])
+    error_count = len([p for p in platforms if p.get('status') == 'error'])
+
+    return {
+        'success': True,
+        'email': email,
+        'platforms': platforms,
+        'statistics': {
+            'total_checked': len(platforms),
+            'used_count': used_count,
+            'not_used_count': not_used_count,
+            'rate_limit_count': rate_limit_count,
+            'error_count': error_count,
+            'timeout_count': len([p for p in platforms if p.get('error') == 'timeout']),
+            'time_taken': round(time_taken, 2)
+        },
+        'found_count': used_count
+    }
+
+
+def check_email(email, on_result=None, concurrency=HOLEHE_CONCURRENCY, timeout=HOLEHE_SITE_TIMEOUT,
+                total_timeout=HOLEHE_TOTAL_TIMEOUT):
     """Check email using holehe"""
-    try:
-        # Run holehe command (without --only-used to get all results)
-        # Use --no-color to avoid ANSI color codes in output
-        result = subprocess.run(
-            ['holehe', email, '--no-color'],
-            capture_output=True,
-            text=True,
-            timeout=120  # Increased timeout for comprehensive check
-        )
-        
-        # Parse output
-        platforms = []
-        total_checked = 0
-        time_taken = None
-        
-        # Parse each line of output
-        for line in result.stdout.split('\n'):
-            line = line.strip()
-            
-            # Skip empty lines and header lines
-            if not line or line.startswith('*') or 'Email used' in line or 'Email not used' in line or 'Rate limit' in line:
-                continue
-            
-            # Check for summary line: "121 websites checked in 11.04 seconds"
-            time_match = re.search(r'(\d+)\s+websites\s+checked\s+in\s+([\d.]+)\s+seconds', line)
-            if time_match:
-                total_checked = int(time_match.group(1))
-                time_taken = float(time_match.group(2))
-                continue
-            
-            # Parse platform lines: [x] about.me, [+] eventbrite.com, [-] amazon.com
-            # Format: [status] platform_name
-            match = re.match(r'\[([+\-x])\]\s+(.+)', line)
-            if match:
-                status_symbol = match.group(1)
-                platform_name = match.group(2).strip()
-                
-                # Map status symbols to status
-                if status_symbol == '+':
-                    status = 'used'
-                    found = True
-                elif status_symbol == '-':
-                    status = 'not_used'
-                    found = False
-                elif status_symbol == 'x':
-                    status = 'rate_limit'
-                    found = None  # Unknown due to rate limit
-                else:
-                    continue
-                
-                platforms.append({
-                    'platform': platform_name,
-                    'status': status,
-                    'found': found,
-                    'status_symbol': status_symbol
-                })
-        
-        # Count statistics
-        used_count = len([p for p in platforms if p.get('status') == 'used'])
-        not_used_count = len([p for p in platforms if p.get('status') == 'not_used'])
-        rate_limit_count = len([p for p in platforms if p.get('status') == 'rate_limit'])
-        
-        return {
-            'success': True,
-            'email': email,
-            'platforms': platforms,
-            'statistics': {
-                'total_checked': total_checked or len(platforms),
-                'used_count': used_count,
-                'not_used_count': not_used_count,
-                'rate_limit_count': rate_limit_count,
-                'time_taken': time_taken
-            },
-            'found_count': used_count
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            'success': False,
-            'error': 'Timeout: Email check took too long (over 2 minutes)',
-            'email': email
-        }
-    except FileNotFoundError:
+    if not holehe_available:
         return {
             'success': False,
             'error': 'Holehe not installed. Install with: pip install holehe',
             'email': email
         }
+    started = time.monotonic()
+    try:
+        platforms = asyncio.run(run_checks(email, on_result, concurrency=concurrency, timeout=timeout,
+                                           total_timeout=total_timeout))
     except Exception as e:
         return {
             'success': False,
             'error': f'Error running holehe: {str(e)}',
-            'email': email,
-            'raw_output': result.stdout if 'result' in locals() else None
+            'email': email
         }
+    return summarize(email, platforms, time.monotonic() - started)
 
-if __name__ == '__main__':
+
+def print_platform(platform):
+    """Print one platform entry as an NDJSON line (--stream)."""
+    print(json.dumps(dict(platform, type='platform')), flush=True)
+
+
+def main():
     if len(sys.argv) < 2:
         print(json.dumps({
             'success': False,
             'error': 'Email address required'
         }))
         sys.exit(1)
-    
-    email = sys.argv[1]
-    result = check_email(email)
-    print(json.dumps(result, indent=2))
 
+    parser = argparse.ArgumentParser(description='Check which websites an email is registered on')
+    parser.add_argument('email')
+    parser.add_argument('--stream', action='store_true', help='Print each site as NDJSON as soon as it resolves')
+    parser.add_argument('--concurrency', type=int, default=HOLEHE_CONCURRENCY, help='Sites checked at once')
+    parser.add_argument('--timeout', type=float, default=HOLEHE_SITE_TIMEOUT, help='Seconds allowed per site')
+    parser.add_argument('--total-timeout', type=float, default=HOLEHE_TOTAL_TIMEOUT,
+                        help='Seconds allowed for the whole check')
+    args = parser.parse_args()
+
+    on_result = print_platform if args.stream else None
+    result = check_email(args.email, on_result, args.concurrency, args.timeout, args.total_timeout)
+    if args.stream:
+        print(json.dumps(result), flush=True)
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
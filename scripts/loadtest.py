@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+HTTP Load Test
+Starts app.py under gunicorn for every requested worker class and worker
+count, with SIGHTENGINE_API_URL pointed at scripts/fake_sightengine.py, and
+drives a weighted mix of /api/status, /api/scammer-search, /api/sightengine
+uploads and static assets from closed-loop client threads spread over
+several processes. Reports throughput, error counts and latency percentiles
+(overall and per scenario) for each configuration as JSON.
+
+Pass a previous report as --baseline to add throughput / p99 deltas per
+configuration; the exit status is 1 when any configuration regressed by more
+than --max-regression.
+
+Usage:
+    python scripts/loadtest.py --workers 1,2,4 --worker-classes sync,gthread --duration 20
+    python scripts/loadtest.py --mix status=1 --workers 1 --output before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from static_assets import iter_static_files
+
+DEFAULT_MIX = 'status=30,search=35,sightengine=10,static=25'
+SEARCH_QUERIES = ('0123', '0198765432', 'petronas', 'job', 'investment', 'scam', 'gmail.com', '1234567890',
+                  'parcel', 'lhdn', 'crypto', 'macau')
+# Worker classes that need a package gunicorn does not ship with
+WORKER_CLASS_MODULES = {'gevent': 'gevent', 'eventlet': 'eventlet'}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, timeout=30, process=None):
+    """Poll url until it answers 200; False if the process exits or time runs out."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def parse_mix(value):
+    """'status=30,search=35' -> {'status': 30.0, 'search': 35.0}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def static_paths(limit=20):
+    """Indexed js/css/image files under assets/ (URL paths)."""
+    paths = [url_path for url_path, _ in iter_static_files(ROOT_DIR)
+             if url_path.startswith('assets/') and url_path.endswith(('.js', '.css', '.png', '.svg', '.jpg'))]
+    return ['/' + p for p in paths[:limit]] or ['/api/status']
+
+
+# Scenarios: (session, base url, rng, context) -> response
+
+def scenario_status(session, base_url, rng, context):
+    return session.get(f'{base_url}/api/status', timeout=context['timeout'])
+
+
+def scenario_search(session, base_url, rng, context):
+    return session.get(f'{base_url}/api/scammer-search', params={'q': rng.choice(SEARCH_QUERIES), 'limit': 20},
+                       timeout=context['timeout'])
+
+
+def scenario_sightengine(session, base_url, rng, context):
+    # Random bytes so uploads miss the response cache and reach the stand-in
+    payload = b'\xff\xd8\xff\xe0' + rng.randbytes(context['upload_bytes'])
+    return session.post(f'{base_url}/api/sightengine', data={'action': 'analyze_upload'},
+                        files={'media': ('loadtest.jpg', payload, 'image/jpeg')}, timeout=context['timeout'])
+
+
+def scenario_static(session, base_url, rng, context):
+    return session.get(base_url + rng.choice(context['static_paths']), headers={'Accept-Encoding': 'br, gzip'},
+                       timeout=context['timeout'])
+
+
+SCENARIOS = {
+    'status': scenario_status,
+    'search': scenario_search,
+    'sightengine': scenario_sightengine,
+    'static': scenario_static
+}
+
+
+def client_process(base_url, mix, threads, start_at, warmup_until, stop_at, context, seed):
+    """
+    Closed-loop clients: each thread sends its next request as soon as the
+    previous one finishes. Samples taken before warmup_until are dropped.
+
+    Returns:
+        list: (scenario, status, latency_ms) tuples (status 0 = transport error)
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+    lock = threading.Lock()
+
+    def run(thread_seed):
+        rng = random.Random(thread_seed)
+        session = requests.Session()
+        local = []
+        while time.time() < start_at:
+            time.sleep(0.01)
+        while True:
+            started = time.time()
+            if started >= stop_at:
+                break
+            name = rng.choices(names, weights)[0]
+            try:
+                response = SCENARIOS[name](session, base_url, rng, context)
+                response.content
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            finished = time.time()
+            if started >= warmup_until:
+                local.append((name, status, (finished - started) * 1000))
+        session.close()
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=run, args=(seed * 1000 + i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return samples
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    if not ordered:
+        return {'count': 0}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 2),
+        'p50_ms': round(pick(0.50), 2),
+        'p90_ms': round(pick(0.90), 2),
+        'p99_ms': round(pick(0.99), 2),
+        'max_ms': round(ordered[-1], 2)
+    }
+
+
+def report_samples(samples, duration):
+    """Throughput, status counts and latency percentiles, overall and per scenario."""
+    result = {'requests': len(samples), 'throughput_rps': round(len(samples) / duration, 1)}
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    result['statuses'] = dict(sorted(statuses.items()))
+    result['errors'] = sum(count for status, count in statuses.items() if int(status) == 0 or int(status) >= 500)
+    result['latency'] = summarize([latency for _, _, latency in samples])
+    result['scenarios'] = {}
+    for name in sorted({name for name, _, _ in samples}):
+        subset = [(status, latency) for sample_name, status, latency in samples if sample_name == name]
+        entry = summarize([latency for _, latency in subset])
+        entry['throughput_rps'] = round(len(subset) / duration, 1)
+        entry['errors'] = sum(1 for status, _ in subset if status == 0 or status >= 500)
+        result['scenarios'][name] = entry
+    return result
+
+
+def upstream_counts(fake_url):
+    try:
+        return requests.get(fake_url.rsplit('/1.0/', 1)[0] + '/__stats', timeout=2).json()
+    except (requests.RequestException, ValueError):
+        return {}
+
+
+def run_config(worker_class, workers, args, fake_url, mix, context):
+    """Start gunicorn with one configuration, load it and stop it."""
+    port = free_port()
+    scratch = tempfile.mkdtemp(prefix='loadtest-')
+    env = dict(os.environ,
+               SIGHTENGINE_API_URL=fake_url,
+               # Keep the client-side budget out of the way; the stand-in injects throttling
+               SIGHTENGINE_RATE_PER_MINUTE=str(args.upstream_rate_per_minute),
+               SIGHTENGINE_CACHE_DIR=os.path.join(scratch, 'sightengine'),
+               STATS_SNAPSHOT_PATH=os.path.join(scratch, 'stats.json'),
+               WEB_CONCURRENCY=str(workers),
+               PYTHONUNBUFFERED='1')
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+               '--worker-class', worker_class, '--timeout', str(args.gunicorn_timeout), '--log-level', 'warning',
+               'app:app']
+    if worker_class == 'gthread':
+        command[-1:-1] = ['--threads', str(args.threads)]
+    elif worker_class in WORKER_CLASS_MODULES:
+        command[-1:-1] = ['--worker-connections', str(args.worker_connections)]
+
+    log = open(os.path.join(scratch, 'gunicorn.log'), 'w+')
+    server = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f'http://127.0.0.1:{port}'
+    config = {'worker_class': worker_class, 'workers': workers,
+              'threads': args.threads if worker_class == 'gthread' else 1}
+    try:
+        if not wait_for(f'{base_url}/api/status', timeout=args.startup_timeout, process=server):
+            log.seek(0)
+            config['error'] = 'gunicorn did not become healthy: ' + log.read()[-2000:]
+            return config
+
+        before = upstream_counts(fake_url)
+        start_at = time.time() + 0.5
+        warmup_until = start_at + args.warmup
+        stop_at = warmup_until + args.duration
+        per_process = [args.clients // args.client_processes + (1 if i < args.clients % args.client_processes else 0)
+                       for i in range(args.client_processes)]
+        with multiprocessing.Pool(args.client_processes) as pool:
+            results = pool.starmap(client_process, [
+                (base_url, mix, threads, start_at, warmup_until, stop_at, context, args.seed + i)
+                for i, threads in enumerate(per_process) if threads])
+        samples = [sample for result in results for sample in result]
+        after = upstream_counts(fake_url)
+
+        config.update(report_samples(samples, args.duration))
+        config['upstream'] = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+        return config
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        log.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def compare(configs, baseline, max_regression):
+    """Attach deltas against a baseline report; return True if anything regressed."""
+    previous = {(c['worker_class'], c['workers']): c for c in baseline.get('configs', []) if 'latency' in c}
+    regressed = False
+    for config in configs:
+        old = previous.get((config['worker_class'], config['workers']))
+        if old is None or 'latency' not in config:
+            continue
+        throughput_change = (config['throughput_rps'] - old['throughput_rps']) / old['throughput_rps'] \
+            if old['throughput_rps'] else 0.0
+        p99_change = (config['latency']['p99_ms'] - old['latency']['p99_ms']) / old['latency']['p99_ms'] \
+            if old['latency'].get('p99_ms') else 0.0
+        config['baseline'] = {
+            'throughput_rps': old['throughput_rps'],
+            'p99_ms': old['latency']['p99_ms'],
+            'throughput_change_pct': round(throughput_change * 100, 1),
+            'p99_change_pct': round(p99_change * 100, 1),
+            'regressed': throughput_change < -max_regression or p99_change > max_regression
+        }
+        regressed = regressed or config['baseline']['regressed']
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test app.py under gunicorn')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated gunicorn worker counts')
+    parser.add_argument('--worker-classes', default='sync,gthread', help='Comma-separated gunicorn worker classes')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('--worker-connections', type=int, default=100, help='Connections per gevent/eventlet worker')
+    parser.add_argument('--gunicorn-timeout', type=int, default=120)
+    parser.add_argument('--startup-timeout', type=float, default=60)
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent closed-loop clients')
+    parser.add_argument('--client-processes', type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help='Processes the clients are spread over')
+    parser.add_argument('--duration', type=float, default=20, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before each run')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Scenario weights (default {DEFAULT_MIX})')
+    parser.add_argument('--upload-kb', type=int, default=64, help='Size of each /api/sightengine upload')
+    parser.add_argument('--request-timeout', type=float, default=60)
+    parser.add_argument('--upstream-latency-ms', type=float, default=300)
+    parser.add_argument('--upstream-jitter-ms', type=float, default=100)
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0)
+    parser.add_argument('--upstream-throttle-rate', type=float, default=0.0)
+    parser.add_argument('--upstream-rate-per-minute', type=float, default=100000,
+                        help='SIGHTENGINE_RATE_PER_MINUTE given to the app')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='Previous report to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.1,
+                        help='Allowed throughput drop / p99 increase against --baseline (fraction)')
+    parser.add_argument('--output', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(',') if n]
+    worker_classes = [name for name in args.worker_classes.split(',') if name]
+    context = {'timeout': args.request_timeout, 'upload_bytes': args.upload_kb * 1024,
+               'static_paths': static_paths()}
+
+    fake_port = free_port()
+    fake = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, 'scripts', 'fake_sightengine.py'),
+                             '--port', str(fake_port),
+                             '--latency-ms', str(args.upstream_latency_ms),
+                             '--jitter-ms', str(args.upstream_jitter_ms),
+                             '--error-rate', str(args.upstream_error_rate),
+                             '--throttle-rate', str(args.upstream_throttle_rate)],
+                            stdout=subprocess.DEVNULL)
+    fake_url = f'http://127.0.0.1:{fake_port}/1.0/check.json'
+
+    report = {
+        'python': sys.version.split()[0],
+        'cpus': os.cpu_count(),
+        'mix': args.mix,
+        'clients': args.clients,
+        'client_processes': args.client_processes,
+        'duration_s': args.duration,
+        'upload_kb': args.upload_kb,
+        'upstream': {'latency_ms': args.upstream_latency_ms, 'jitter_ms': args.upstream_jitter_ms,
+                     'error_rate': args.upstream_error_rate, 'throttle_rate': args.upstream_throttle_rate},
+        'configs': []
+    }
+    try:
+        if not wait_for(fake_url.rsplit('/1.0/', 1)[0] + '/__stats', process=fake):
+            print('Error: Sightengine stand-in did not start', file=sys.stderr)
+            sys.exit(2)
+        for worker_class in worker_classes:
+            module = WORKER_CLASS_MODULES.get(worker_class)
+            if module is not None:
+                try:
+                    __import__(module)
+                except ImportError:
+                    report['configs'].append({'worker_class': worker_class, 'skipped': f'{module} not installed'})
+                    continue
+            for workers in worker_counts:
+                print(f'Running {worker_class} x{workers}...', file=sys.stderr, flush=True)
+                report['configs'].append(run_config(worker_class, workers, args, fake_url, args.mix, context))
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressed = compare(report['configs'], json.load(f), args.max_regression)
+        report['regressed'] = regressed
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Static Asset Precompression
+Writes <file>.gz (and <file>.br when the brotli package is installed) next to
+every compressible static file, for static_assets.StaticIndex to serve by
+Accept-Encoding. Variants that would not be smaller are removed. Run at build
+time (see render.yaml); the output is printed as JSON.
+
+Usage:
+    python scripts/precompress_static.py [--min-size 1024]
+"""
+
+import argparse
+import gzip
+import json
+import mimetypes
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from static_assets import iter_static_files
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+                      'image/x-icon', 'image/vnd.microsoft.icon', 'text/javascript')
+
+
+def is_compressible(path):
+    mimetype = mimetypes.guess_type(path)[0] or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def write_variant(path, suffix, data, original_size):
+    """Write the variant if it saves space, otherwise remove any stale one."""
+    variant_path = path + suffix
+    if len(data) >= original_size:
+        if os.path.exists(variant_path):
+            os.remove(variant_path)
+        return None
+    with open(variant_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompress static assets')
+    parser.add_argument('--root', default=ROOT_DIR)
+    parser.add_argument('--min-size', type=int, default=1024, help='Skip files smaller than this many bytes')
+    args = parser.parse_args()
+
+    report = {'brotli': brotli is not None, 'files': {}, 'original_bytes': 0, 'gzip_bytes': 0, 'br_bytes': 0}
+    for url_path, path in iter_static_files(args.root):
+        if not is_compressible(path):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < args.min_size:
+            continue
+
+        # mtime=0 keeps the output byte-identical across builds
+        sizes = {'original': len(data),
+                 'gzip': write_variant(path, '.gz', gzip.compress(data, compresslevel=9, mtime=0), len(data))}
+        if brotli is not None:
+            sizes['br'] = write_variant(path, '.br', brotli.compress(data, quality=11), len(data))
+        report['files'][url_path] = sizes
+        report['original_bytes'] += len(data)
+        report['gzip_bytes'] += sizes['gzip'] or len(data)
+        report['br_bytes'] += sizes.get('br') or len(data)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
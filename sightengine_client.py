@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Shared Sightengine API client.
+Reuses keep-alive connections across scans, retries transient failures with
+exponential backoff and full jitter, caps concurrent outbound calls and
+spends requests from a token bucket sized to the plan's rate limit.
+Successful responses are cached by media content hash or normalized URL.
+"""
+
+import hashlib
+import io
+import os
+import random
+import threading
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from result_cache import TieredCache, sha256_hex
+
+# Endpoint and credentials
+SIGHTENGINE_API_USER = os.environ.get('SIGHTENGINE_API_USER', '1931720966')
+SIGHTENGINE_API_SECRET = os.environ.get('SIGHTENGINE_API_SECRET', 'Ey7EbcJMjAtQZDiD38xLtyXvJrqpCVmw')
+SIGHTENGINE_API_URL = os.environ.get('SIGHTENGINE_API_URL', 'https://api.sightengine.com/1.0/check.json')
+
+# Connection pool and timeouts (connect, read) in seconds
+POOL_SIZE = int(os.environ.get('SIGHTENGINE_POOL_SIZE', 10))
+CONNECT_TIMEOUT = float(os.environ.get('SIGHTENGINE_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('SIGHTENGINE_TIMEOUT', 60))
+
+# Retries: attempts after the first, backoff base and cap in seconds
+MAX_RETRIES = int(os.environ.get('SIGHTENGINE_MAX_RETRIES', 3))
+BACKOFF_BASE = float(os.environ.get('SIGHTENGINE_BACKOFF_BASE', 0.5))
+BACKOFF_MAX = float(os.environ.get('SIGHTENGINE_BACKOFF_MAX', 8))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Concurrency and rate limits. The rate is for the whole deployment and is
+# split across gunicorn workers (WEB_CONCURRENCY), since each has its own bucket.
+MAX_IN_FLIGHT = int(os.environ.get('SIGHTENGINE_MAX_IN_FLIGHT', 8))
+RATE_PER_MINUTE = float(os.environ.get('SIGHTENGINE_RATE_PER_MINUTE', 60))
+RATE_BURST = int(os.environ.get('SIGHTENGINE_RATE_BURST', 10))
+WORKER_COUNT = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+# Longest an attempt waits for an in-flight slot and rate budget before failing
+# (per call override: request(acquire_timeout=...))
+ACQUIRE_TIMEOUT = float(os.environ.get('SIGHTENGINE_ACQUIRE_TIMEOUT', 5))
+
+# Response cache. Uploads are keyed by content, so they only expire when
+# SIGHTENGINE_CACHE_UPLOAD_TTL is set; media behind a URL can change, so
+# URL results expire after SIGHTENGINE_CACHE_URL_TTL seconds.
+CACHE_ENABLED = os.environ.get('SIGHTENGINE_CACHE', '1').lower() not in ('0', 'false', 'no')
+CACHE_DIR = os.environ.get('SIGHTENGINE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'sightengine'))
+CACHE_MAX_ENTRIES = int(os.environ.get('SIGHTENGINE_CACHE_MAX_ENTRIES', 2048))
+CACHE_MAX_BYTES = int(os.environ.get('SIGHTENGINE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+CACHE_URL_TTL = float(os.environ.get('SIGHTENGINE_CACHE_URL_TTL', 24 * 60 * 60))
+CACHE_UPLOAD_TTL = float(os.environ['SIGHTENGINE_CACHE_UPLOAD_TTL']) if os.environ.get('SIGHTENGINE_CACHE_UPLOAD_TTL') else None
+
+# Upstream metrics: every HTTP attempt (outcome is the status code, 'timeout',
+# 'connection_error' or 'exception') and every request() after its retries
+UPSTREAM_SECONDS = metrics.Histogram('sightengine_upstream_seconds', 'Sightengine HTTP attempt latency',
+                                     ('method', 'outcome'))
+UPSTREAM_CALLS = metrics.Counter('sightengine_requests_total', 'Sightengine calls by final result (after retries)',
+                                 ('result',))
+
+
+class SightengineError(Exception):
+    """Raised when Sightengine cannot be reached or returns an error."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second.
+
+    Args:
+        rate: Tokens added per second (0 or less disables the limit)
+        capacity: Largest burst allowed after an idle period
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to `timeout` seconds. Returns False on timeout."""
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class MultipartStream:
+    """
+    multipart/form-data body that reads the file part straight from its stream.
+
+    requests' files= builds the whole encoded body in memory; this yields the
+    form fields, the file in chunks and the closing boundary instead. It has a
+    length, so the upload is sent with Content-Length rather than chunked, and
+    rewind() restarts it for a retry.
+
+    Args:
+        fields: dict of plain form fields
+        name: Form field name of the file part
+        filename: Filename sent for the file part
+        stream: Seekable binary file-like object positioned at the file start
+    """
+
+    def __init__(self, fields, name, filename, stream):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        head = b''.join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode('utf-8')
+            for key, value in fields.items())
+        filename = filename.replace('"', '%22').replace('\r', '').replace('\n', '')
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8')
+        self._head = head
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self._stream = stream
+        self._start = stream.tell()
+        stream.seek(0, io.SEEK_END)
+        self._file_size = stream.tell() - self._start
+        stream.seek(self._start)
+        self._position = 0
+
+    def __len__(self):
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def rewind(self):
+        self._stream.seek(self._start)
+        self._position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self) - self._position
+        chunks = []
+        while size > 0 and self._position < len(self):
+            head_size = len(self._head)
+            if self._position < head_size:
+                chunk = self._head[self._position:self._position + size]
+            elif self._position < head_size + self._file_size:
+                remaining = head_size + self._file_size - self._position
+                chunk = self._stream.read(min(size, remaining))
+                if not chunk:
+                    raise IOError('Upload stream ended early')
+            else:
+                offset = self._position - head_size - self._file_size
+                chunk = self._tail[offset:offset + size]
+            chunks.append(chunk)
+            self._position += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+
+class SightengineClient:
+    """
+    Thread-safe client for the Sightengine check endpoint.
+
+    One instance is shared per process (see get_client()) so its connection
+    pool, in-flight limit and rate budget apply to every request.
+    """
+
+    def __init__(self, api_url=SIGHTENGINE_API_URL, api_user=SIGHTENGINE_API_USER,
+                 api_secret=SIGHTENGINE_API_SECRET, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, max_in_flight=MAX_IN_FLIGHT,
+                 rate_per_minute=RATE_PER_MINUTE / WORKER_COUNT, burst=RATE_BURST,
+                 acquire_timeout=ACQUIRE_TIMEOUT):
+        self.api_url = api_url
+        self.api_user = api_user
+        self.api_secret = api_secret
+        self.max_retries = max_retries
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.acquire_timeout = acquire_timeout
+
+        self.session = requests.Session()
+        # Retries are handled in request() so they share the rate budget
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'errors': 0,
+            'throttled': 0,
+            'in_flight': 0
+        }
+
+    def _count(self, name, delta=1):
+        with self._stats_lock:
+            self._stats[name] += delta
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full jitter: sleep a random time up to base * 2^attempt (capped)."""
+        if retry_after is not None:
+            return min(BACKOFF_MAX, retry_after)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    def _throttled(self, message):
+        self._count('throttled')
+        UPSTREAM_CALLS.inc(result='throttled')
+        return SightengineError(message)
+
+    def _send(self, method, params=None, data=None, headers=None, acquire_timeout=None):
+        """
+        One HTTP attempt, holding an in-flight slot and a rate token.
+
+        The slot is taken first so a rate token is only spent on an attempt
+        that is actually sent; both waits share one acquire_timeout.
+        """
+        acquire_timeout = self.acquire_timeout if acquire_timeout is None else acquire_timeout
+        deadline = time.monotonic() + acquire_timeout
+        if not self._in_flight.acquire(timeout=acquire_timeout):
+            raise self._throttled('Too many concurrent Sightengine requests, try again later')
+        try:
+            if not self.bucket.acquire(max(0.0, deadline - time.monotonic())):
+                raise self._throttled('Rate limit budget exhausted, try again later')
+            self._count('in_flight')
+            self._count('attempts')
+            outcome = 'exception'
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, self.api_url, params=params, data=data,
+                                                headers=headers, timeout=self.timeout)
+                outcome = str(response.status_code)
+                return response
+            except requests.exceptions.Timeout:
+                outcome = 'timeout'
+                raise
+            except requests.exceptions.ConnectionError:
+                outcome = 'connection_error'
+                raise
+            finally:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - started, method=method, outcome=outcome)
+                self._count('in_flight', -1)
+        finally:
+            self._in_flight.release()
+
+    def request(self, method, params=None, data=None, upload=None, acquire_timeout=None):
+        """
+        Call the check endpoint with retries.
+
+        Args:
+            method: 'GET' or 'POST'
+            params: Query parameters
+            data: Form fields
+            upload: Optional (filename, binary stream) streamed as the 'media'
+                    part of a multipart POST and rewound before each attempt
+            acquire_timeout: Seconds each attempt may wait for an in-flight slot
+                             and rate budget (defaults to the client's)
+
+        Returns:
+            dict: Parsed JSON response
+
+        Raises:
+            SightengineError: After the last failed attempt
+        """
+        self._count('requests')
+        auth = {'api_user': self.api_user, 'api_secret': self.api_secret}
+        if method == 'GET':
+            params = dict(params or {}, **auth)
+        else:
+            data = dict(data or {}, **auth)
+
+        body = headers = None
+        if upload is not None:
+            body = MultipartStream(data, 'media', upload[0], upload[1])
+            headers = {'Content-Type': body.content_type}
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+            if body is not None:
+                body.rewind()
+
+            retry_after = None
+            try:
+                response = self._send(method, params, data if body is None else body, headers, acquire_timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = str(e)
+            except requests.exceptions.RequestException as e:
+                self._count('errors')
+                UPSTREAM_CALLS.inc(result='error')
+                raise SightengineError(str(e))
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    try:
+                        response.raise_for_status()
+                        result = response.json()
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        self._count('errors')
+                        UPSTREAM_CALLS.inc(result='error')
+                        raise SightengineError(str(e))
+                    UPSTREAM_CALLS.inc(result='success')
+                    return result
+                last_error = f'{response.status_code} {response.reason} for url: {self.api_url}'
+                try:
+                    retry_after = float(response.headers.get('Retry-After'))
+                except (TypeError, ValueError):
+                    retry_after = None
+                response.close()
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        self._count('errors')
+        UPSTREAM_CALLS.inc(result='error')
+        raise SightengineError(last_error or 'Sightengine request failed')
+
+    def check_url(self, url, models, acquire_timeout=None):
+        """Analyze media at a public URL."""
+        return self.request('GET', params={'url': url, 'models': models}, acquire_timeout=acquire_timeout)
+
+    def check_file(self, media, models, filename='media', acquire_timeout=None):
+        """Analyze an uploaded file (seekable binary file-like object), streaming it."""
+        return self.request('POST', data={'models': models}, upload=(filename, media),
+                            acquire_timeout=acquire_timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'max_in_flight': self.max_in_flight,
+            'acquire_timeout_seconds': self.acquire_timeout,
+            'rate_per_minute': self.bucket.rate * 60.0,
+            'rate_tokens_available': round(self.bucket.available(), 2)
+        })
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+_response_cache = None
+
+
+def get_client():
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SightengineClient()
+    return _client
+
+
+def get_response_cache():
+    """Return the shared response cache, or None when SIGHTENGINE_CACHE is disabled."""
+    global _response_cache
+    if _response_cache is None and CACHE_ENABLED:
+        with _client_lock:
+            if _response_cache is None:
+                _response_cache = TieredCache(CACHE_MAX_ENTRIES, CACHE_DIR or None, CACHE_MAX_BYTES)
+    return _response_cache
+
+
+def normalize_url(url):
+    """Canonical form of a media URL: lowercase scheme/host, no default port or fragment, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def url_cache_key(url, models):
+    return sha256_hex('sightengine-url', normalize_url(url), models)
+
+
+def upload_cache_key(stream, models, chunk_size=1024 * 1024):
+    """Hash a seekable stream's remaining content (the position is restored)."""
+    start = stream.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(start)
+    return sha256_hex('sightengine-upload', digest.hexdigest(), models)
+
+
+def cached_response(key):
+    """Return a cached response (marked 'cached') or None."""
+    cache = get_response_cache()
+    result = cache.get(key) if cache else None
+    if result is not None:
+        result['cached'] = True
+    return result
+
+
+def store_response(key, result, ttl=None):
+    """Cache a successful Sightengine response."""
+    cache = get_response_cache()
+    if cache and isinstance(result, dict) and result.get('status') == 'success':
+        cache.set(key, result, ttl)
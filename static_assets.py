@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Static file serving from an index built at startup.
+Only allowlisted assets are indexed: files with a STATIC_EXTENSIONS suffix
+directly in the root (logos) or under STATIC_ASSET_DIRS. Each gets its size,
+mtime, a strong content-hash ETag and any precompressed .br / .gz variant
+(written at build time by scripts/precompress_static.py). Requests are then
+answered from the index without touching the filesystem metadata; small files
+are kept in memory and larger ones streamed.
+
+asset_url() appends ?v=<hash> to a path. A request carrying the current hash
+is fingerprinted and cached as immutable; everything else revalidates with
+its ETag. Runtime-written files (uploads/) are not indexed and are served
+from disk.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, request
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+STATIC_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Directories indexed recursively, and the file types indexed there and in the root
+STATIC_ASSET_DIRS = tuple(d.strip('/') for d in os.environ.get('STATIC_ASSET_DIRS', 'assets').split(',') if d.strip('/'))
+STATIC_EXTENSIONS = ('.css', '.js', '.map', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp',
+                     '.woff', '.woff2', '.ttf')
+# Served from disk on demand because files appear at runtime
+STATIC_DYNAMIC_DIRS = tuple(d for d in os.environ.get('STATIC_DYNAMIC_DIRS', 'uploads').split(',') if d)
+# Never served: server-side code and precompressed variants (served via Accept-Encoding)
+STATIC_EXCLUDED_SUFFIXES = ('.php', '.py', '.pyc', '.gz', '.br')
+STATIC_EXCLUDED_DIRS = ('__pycache__', 'node_modules', 'templates')
+# Revalidation interval for assets requested without their fingerprint
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 300))
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Files up to this size are held in memory, within the total budget
+STATIC_MEMORY_FILE_MAX = int(os.environ.get('STATIC_MEMORY_FILE_MAX', 512 * 1024))
+STATIC_MEMORY_BUDGET = int(os.environ.get('STATIC_MEMORY_BUDGET', 32 * 1024 * 1024))
+
+# Preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFile:
+    """One servable representation of a file (identity or precompressed)."""
+
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'data')
+
+    def __init__(self, path, size, mtime, etag, data=None):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.etag = etag
+        self.data = data
+
+
+class StaticEntry:
+    """Index entry: identity representation, encoded variants and mimetype."""
+
+    __slots__ = ('identity', 'variants', 'mimetype', 'version')
+
+    def __init__(self, identity, variants, mimetype, version):
+        self.identity = identity
+        self.variants = variants
+        self.mimetype = mimetype
+        self.version = version
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_servable(relative_path):
+    """True for paths the static layer may expose (no dotfiles, excluded dirs or suffixes)."""
+    parts = relative_path.replace('\\', '/').split('/')
+    if any(part.startswith('.') or part in STATIC_EXCLUDED_DIRS for part in parts):
+        return False
+    return not relative_path.lower().endswith(STATIC_EXCLUDED_SUFFIXES)
+
+
+def is_static_asset(relative_path):
+    """True for servable paths with an allowlisted extension."""
+    return is_servable(relative_path) and relative_path.lower().endswith(STATIC_EXTENSIONS)
+
+
+def iter_static_files(root=STATIC_ROOT, asset_dirs=STATIC_ASSET_DIRS):
+    """Yield (url path, absolute path) for asset files in root itself and under asset_dirs."""
+    for filename in sorted(os.listdir(root)):
+        path = os.path.join(root, filename)
+        if os.path.isfile(path) and is_static_asset(filename):
+            yield filename, path
+    for asset_dir in asset_dirs:
+        for directory, dirnames, filenames in os.walk(os.path.join(root, asset_dir)):
+            relative_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+            # Prune hidden, excluded and runtime directories in place
+            dirnames[:] = sorted(d for d in dirnames
+                                 if is_servable(f'{relative_dir}/{d}/')
+                                 and f'{relative_dir}/{d}' not in STATIC_DYNAMIC_DIRS)
+            for filename in sorted(filenames):
+                url_path = f'{relative_dir}/{filename}'
+                if is_static_asset(url_path):
+                    yield url_path, os.path.join(directory, filename)
+
+
+class StaticIndex:
+    """
+    In-memory index of the static files under a root directory.
+
+    Args:
+        root: Directory whose assets are served (see iter_static_files)
+        memory_file_max: Largest file (per representation) kept in memory
+        memory_budget: Total bytes of file contents kept in memory
+    """
+
+    def __init__(self, root=STATIC_ROOT, memory_file_max=STATIC_MEMORY_FILE_MAX, memory_budget=STATIC_MEMORY_BUDGET):
+        self.root = root
+        self.memory_file_max = memory_file_max
+        self.memory_budget = memory_budget
+        self.memory_bytes = 0
+        self.entries = {}
+        self.served = {'memory': 0, 'disk': 0, 'dynamic': 0, 'not_modified': 0}
+        self._lock = threading.Lock()
+        for url_path, path in iter_static_files(root):
+            self.entries[url_path] = self._build_entry(path)
+
+    def _load(self, path, size, etag):
+        mtime = os.path.getmtime(path)
+        data = None
+        if size <= self.memory_file_max and self.memory_bytes + size <= self.memory_budget:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.memory_bytes += size
+        return StaticFile(path, size, mtime, etag, data)
+
+    def _build_entry(self, path):
+        digest = _hash_file(path)
+        identity = self._load(path, os.path.getsize(path), f'{digest[:32]}')
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant_path = path + suffix
+            # A variant older than its source is stale; serve identity instead
+            if os.path.isfile(variant_path) and os.path.getmtime(variant_path) >= identity.mtime:
+                variants[encoding] = self._load(variant_path, os.path.getsize(variant_path), f'{digest[:32]}-{encoding}')
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return StaticEntry(identity, variants, mimetype, digest[:12])
+
+    def get(self, url_path):
+        return self.entries.get(url_path)
+
+    def asset_url(self, url_path):
+        """Path with ?v=<content hash> for indexed files, unchanged otherwise."""
+        entry = self.entries.get(url_path.lstrip('/'))
+        return f'{url_path}?v={entry.version}' if entry else url_path
+
+    def _count(self, key):
+        with self._lock:
+            self.served[key] += 1
+
+    def serve(self, url_path):
+        """
+        Response for a static path, or None if it is not servable.
+
+        Picks the best precompressed variant the client accepts, answers
+        If-None-Match / If-Modified-Since with 304 and supports Range requests.
+        """
+        entry = self.entries.get(url_path)
+        if entry is None:
+            return self._serve_dynamic(url_path)
+
+        representation = entry.identity
+        encoding = None
+        for candidate, _ in ENCODINGS:
+            variant = entry.variants.get(candidate)
+            if variant is not None and request.accept_encodings[candidate]:
+                representation, encoding = variant, candidate
+                break
+
+        if request.if_none_match.contains(representation.etag):
+            self._count('not_modified')
+            response = Response(status=304)
+        elif representation.data is not None:
+            self._count('memory')
+            response = Response(representation.data, mimetype=entry.mimetype)
+        else:
+            self._count('disk')
+            response = Response(wrap_file(request.environ, open(representation.path, 'rb')),
+                                mimetype=entry.mimetype, direct_passthrough=True)
+            response.content_length = representation.size
+
+        response.set_etag(representation.etag)
+        response.last_modified = representation.mtime
+        if entry.variants:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.content_encoding = encoding
+        if request.args.get('v') == entry.version:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+        if response.status_code == 304:
+            return response
+        return response.make_conditional(request, accept_ranges=True, complete_length=representation.size)
+
+    def _serve_dynamic(self, url_path):
+        """Runtime-written files (STATIC_DYNAMIC_DIRS) are looked up on disk."""
+        if not url_path.startswith(tuple(d + '/' for d in STATIC_DYNAMIC_DIRS)) or not is_servable(url_path):
+            return None
+        path = safe_join(self.root, url_path)
+        if path is None or not os.path.isfile(path):
+            return None
+        self._count('dynamic')
+        response = Response(wrap_file(request.environ, open(path, 'rb')),
+                            mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                            direct_passthrough=True)
+        stat = os.stat(path)
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+        response.set_etag(f'{int(stat.st_mtime)}-{stat.st_size}')
+        response.cache_control.no_cache = True
+        return response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+
+    def stats(self):
+        with self._lock:
+            served = dict(self.served)
+        return {
+            'files': len(self.entries),
+            'precompressed': sum(1 for entry in self.entries.values() if entry.variants),
+            'memory_bytes': self.memory_bytes,
+            'served': served
+        }
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained statistics for the public dashboard.
+Counters are updated as records arrive (scammers added, scans completed,
+threats collected) instead of being recounted per request. Aggregates cover
+scam_type, threat_level, location and daily time buckets, and snapshot()
+returns a JSON-ready view that is rebuilt only when a counter changed.
+
+Counters of events that leave no record behind (reports, scans, detections)
+are written to STATS_SNAPSHOT_PATH every STATS_SNAPSHOT_INTERVAL seconds (and
+at exit) and loaded back on start. Scammer and threat counters are not saved:
+the records they count are in-memory lists that are rebuilt on start, so the
+caller recounts them from those lists. Each process keeps its own counters;
+with several gunicorn workers the snapshot holds the last writer's view.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+STATS_SNAPSHOT_PATH = os.environ.get('STATS_SNAPSHOT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'stats.json'))
+STATS_SNAPSHOT_INTERVAL = float(os.environ.get('STATS_SNAPSHOT_INTERVAL', 60))
+# Days counted as "recent" in recent_reports
+RECENT_DAYS = 7
+# Sightengine deepfake / ai_generated score at which a scan counts as a detection
+DEEPFAKE_THRESHOLD = float(os.environ.get('DEEPFAKE_THRESHOLD', 0.5))
+
+GROUPS = ('scammers_by_type', 'scammers_by_threat_level', 'scammers_by_location',
+          'threats_by_level', 'threats_by_location',
+          'scammers_by_day', 'threats_by_day', 'scans_by_day', 'deepfakes_by_day')
+# Counters saved to and restored from the snapshot
+SNAPSHOT_TOTALS = ('total_reports', 'deepfakes_detected', 'scans', 'cached_scans')
+SNAPSHOT_GROUPS = ('scans_by_day', 'deepfakes_by_day')
+
+
+def _day(timestamp=None):
+    """YYYY-MM-DD bucket for a 'YYYY-MM-DD HH:MM:SS' string (today when missing)."""
+    if timestamp:
+        return str(timestamp)[:10]
+    return date.today().isoformat()
+
+
+def deepfake_score(result):
+    """Highest deepfake / ai_generated score in a Sightengine image or video result."""
+    if not isinstance(result, dict):
+        return 0.0
+    types = [result.get('type')]
+    types.extend(frame.get('type') for frame in (result.get('data') or {}).get('frames') or ()
+                 if isinstance(frame, dict))
+    score = 0.0
+    for scores in types:
+        if isinstance(scores, dict):
+            for name in ('deepfake', 'ai_generated'):
+                try:
+                    score = max(score, float(scores.get(name) or 0))
+                except (TypeError, ValueError):
+                    pass
+    return score
+
+
+class StatsStore:
+    """
+    Counters and grouped counts with a cached JSON view.
+
+    Args:
+        snapshot_path: File the SNAPSHOT_TOTALS / SNAPSHOT_GROUPS counters are saved to
+                       and restored from (None disables)
+        snapshot_interval: Seconds between background saves (0 saves only at exit)
+    """
+
+    def __init__(self, snapshot_path=STATS_SNAPSHOT_PATH, snapshot_interval=STATS_SNAPSHOT_INTERVAL):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.totals = Counter()
+        self.groups = {name: Counter() for name in GROUPS}
+        self.version = 0
+        self.saved_version = 0
+        self.updated_at = None
+        # True when counters were restored from a snapshot (skip seeding them)
+        self.restored = False
+        self._view = None
+        self._view_etag = None
+        self._view_version = -1
+        self._lock = threading.Lock()
+        if snapshot_path:
+            self._load()
+            atexit.register(self.save)
+            if snapshot_interval > 0:
+                threading.Thread(target=self._snapshot_loop, name='stats-snapshot', daemon=True).start()
+
+    def _changed(self):
+        """Caller holds the lock."""
+        self.version += 1
+        self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def add(self, name, amount=1):
+        """Increment a total (e.g. 'total_reports')."""
+        with self._lock:
+            self.totals[name] += amount
+            self._changed()
+
+    def record_scammer(self, scammer):
+        with self._lock:
+            self.totals['total_scammers'] += 1
+            if scammer.get('verification_status') == 'verified':
+                self.totals['verified_scammers'] += 1
+            if scammer.get('is_active', True):
+                self.totals['active_scammers'] += 1
+            self.groups['scammers_by_type'][scammer.get('scam_type') or 'unknown'] += 1
+            self.groups['scammers_by_threat_level'][scammer.get('threat_level') or 'unknown'] += 1
+            self.groups['scammers_by_location'][scammer.get('location') or 'Unknown'] += 1
+            self.groups['scammers_by_day'][_day(scammer.get('first_reported'))] += 1
+            self._changed()
+
+    def record_report(self):
+        """Count one accepted scam report (a new scammer or another report of a known one)."""
+        with self._lock:
+            self.totals['total_reports'] += 1
+            self._changed()
+
+    def record_threat(self, threat):
+        with self._lock:
+            self.totals['total_threats'] += 1
+            self.groups['threats_by_level'][threat.get('threat_level') or 'unknown'] += 1
+            self.groups['threats_by_location'][threat.get('location') or 'Unknown'] += 1
+            self.groups['threats_by_day'][_day(threat.get('collected_at'))] += 1
+            self._changed()
+
+    def record_scan(self, result, cached=False):
+        """
+        Count a completed media scan, and a detection if it scored at or above DEEPFAKE_THRESHOLD.
+
+        A scan answered from the response cache (cached=True) only counts as
+        'cached_scans', so repeated media is not counted as new scans or detections.
+        """
+        if cached:
+            with self._lock:
+                self.totals['cached_scans'] += 1
+                self._changed()
+            return
+        detected = deepfake_score(result) >= DEEPFAKE_THRESHOLD
+        today = _day()
+        with self._lock:
+            self.totals['scans'] += 1
+            self.groups['scans_by_day'][today] += 1
+            if detected:
+                self.totals['deepfakes_detected'] += 1
+                self.groups['deepfakes_by_day'][today] += 1
+            self._changed()
+
+    def snapshot(self):
+        """
+        JSON-ready aggregates, rebuilt only after a change.
+
+        Returns:
+            dict: Totals, by_type / by_threat_level / by_location lists (the
+                  api/scammer-search.php?action=stats shape), threat breakdowns
+                  and daily buckets
+        """
+        return self.snapshot_with_etag()[0]
+
+    def snapshot_with_etag(self):
+        """
+        snapshot() and an ETag for it.
+
+        The tag is a hex digest of the view's JSON, so it cannot match a
+        different view after a restart resets the version or in another worker.
+
+        Returns:
+            tuple: (view dict, hex digest)
+        """
+        with self._lock:
+            if self._view_version == self.version:
+                return self._view, self._view_etag
+            groups = self.groups
+            cutoff = (date.today() - timedelta(days=RECENT_DAYS - 1)).isoformat()
+            view = {
+                'version': self.version,
+                'updated_at': self.updated_at,
+                'total_scammers': self.totals['total_scammers'],
+                'verified_scammers': self.totals['verified_scammers'],
+                'active_scammers': self.totals['active_scammers'],
+                'total_reports': self.totals['total_reports'],
+                'deepfakes_detected': self.totals['deepfakes_detected'],
+                'scans': self.totals['scans'],
+                'cached_scans': self.totals['cached_scans'],
+                'total_threats': self.totals['total_threats'],
+                'recent_reports': sum(count for day, count in groups['scammers_by_day'].items() if day >= cutoff),
+                'by_type': [{'scam_type': key, 'count': count} for key, count in groups['scammers_by_type'].most_common()],
+                'by_threat_level': [{'threat_level': key, 'count': count}
+                                    for key, count in groups['scammers_by_threat_level'].most_common()],
+                'by_location': [{'location': key, 'count': count} for key, count in groups['scammers_by_location'].most_common()],
+                'threats_by_level': dict(groups['threats_by_level']),
+                'threats_by_location': dict(groups['threats_by_location']),
+                'daily': {
+                    'scammers': dict(sorted(groups['scammers_by_day'].items())),
+                    'threats': dict(sorted(groups['threats_by_day'].items())),
+                    'scans': dict(sorted(groups['scans_by_day'].items())),
+                    'deepfakes': dict(sorted(groups['deepfakes_by_day'].items()))
+                }
+            }
+            etag = hashlib.sha256(json.dumps(view, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+            self._view, self._view_etag, self._view_version = view, etag, self.version
+            return view, etag
+
+    def save(self):
+        """Write the counters to snapshot_path if they changed since the last save."""
+        with self._lock:
+            if not self.snapshot_path or self.version == self.saved_version:
+                return False
+            version = self.version
+            data = json.dumps({
+                'saved_at': time.time(),
+                'updated_at': self.updated_at,
+                'totals': {name: self.totals[name] for name in SNAPSHOT_TOTALS if self.totals[name]},
+                'groups': {name: dict(self.groups[name]) for name in SNAPSHOT_GROUPS}
+            })
+        try:
+            directory = os.path.dirname(self.snapshot_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            # Write then rename so a crash never leaves a partial snapshot
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Warning: could not save stats snapshot: {e}")
+            return False
+        with self._lock:
+            self.saved_version = max(self.saved_version, version)
+        return True
+
+    def _load(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            totals = {name: int(data['totals'].get(name, 0)) for name in SNAPSHOT_TOTALS}
+            groups = {name: Counter(data['groups'].get(name, {})) for name in SNAPSHOT_GROUPS}
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: ignoring unreadable stats snapshot: {e}")
+            return
+        for name, count in totals.items():
+            self.totals[name] = count
+        for name, counts in groups.items():
+            self.groups[name] = counts
+        self.updated_at = data.get('updated_at')
+        self.restored = True
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            self.save()
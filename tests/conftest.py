@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the flat root modules directly (as app.py does)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Keep app.py's dashboard counters in memory instead of writing .cache/stats.json
+os.environ.setdefault('STATS_SNAPSHOT_PATH', '')
@@ -0,0 +1,98 @@
+import json
+import re
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def total_reports(client):
+    return client.get('/api/stats').get_json()['stats']['total_reports']
+
+
+def test_every_accepted_report_counts_towards_total_reports(client):
+    before = total_reports(client)
+    report = {'scam_type': 'shopping', 'description': 'Fake flash sale page', 'scammer_phone': '011-5550 1234'}
+    assert client.post('/api/add-scammer', json=report).get_json()['action'] == 'created'
+    assert client.post('/api/add-scammer', json=report).get_json()['action'] == 'updated'
+    assert total_reports(client) == before + 2
+
+
+def test_rejected_reports_are_not_counted(client):
+    before = total_reports(client)
+    assert client.post('/api/add-scammer', json={'scam_type': 'other'}).status_code == 400
+    assert total_reports(client) == before
+
+
+def test_stats_etag_is_a_valid_entity_tag_and_revalidates(client):
+    response = client.get('/api/stats')
+    etag = response.headers['ETag']
+    assert re.fullmatch(r'"[0-9a-f]+"', etag)
+    assert client.get('/api/stats', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/api/add-scammer', json={'scam_type': 'other', 'description': 'Unlisted caller'})
+    assert client.get('/api/stats', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_scammer_search_rejects_a_non_integer_json_limit(client):
+    response = client.post('/api/scammer-search', json={'q': 'petronas', 'limit': [1]})
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Invalid limit: must be an integer'}
+
+
+def test_scammer_search_rejects_a_non_string_json_query(client):
+    for q in ([1], {'phone': '011'}, True):
+        response = client.post('/api/scammer-search', json={'q': q})
+        assert response.status_code == 400
+        assert response.get_json() == {'success': False, 'error': 'Invalid q: must be a string'}
+    # A JSON number is searched as its digits
+    assert client.post('/api/scammer-search', json={'q': 5}).get_json()['success'] is True
+
+
+def lookup_lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_lookup_rejects_malformed_json_values_before_streaming(client):
+    for body in ({'values': 5}, {'values': {'value': '011'}}, {'values': [['0163411403']]}, 'not a list'):
+        response = client.post('/api/scammer-lookup', json=body)
+        assert response.status_code == 400, body
+        assert response.mimetype == 'application/json'
+        assert response.get_json()['success'] is False
+    response = client.post('/api/scammer-lookup', data='{', content_type='application/json')
+    assert response.get_json() == {'success': False, 'error': 'Invalid JSON input'}
+
+
+def test_lookup_ignores_an_invalid_item_kind(client):
+    response = client.post('/api/scammer-lookup?all=1',
+                           json={'values': [{'value': 'nobody@example.com', 'kind': ['email']}, 12345]})
+    assert response.status_code == 200
+    lines = lookup_lines(response)
+    assert [line['kind'] for line in lines[:-1]] == ['email', 'phone']
+    assert lines[-1]['summary']['lookups'] == 2
+
+
+def test_ndjson_lookup_skips_unusable_lines(client):
+    body = '\n'.join(['"0123"', '[1, 2]', '{"value": "a@b.com", "kind": {"x": 1}}', 'null'])
+    response = client.post('/api/scammer-lookup?all=1', data=body, content_type='application/x-ndjson')
+    lines = lookup_lines(response)
+    assert [line['input'] for line in lines[:-1]] == ['0123', 'a@b.com']
+    assert lines[-1]['success'] is True
+
+
+def test_search_threats_rejects_non_string_parameters(client):
+    for body in ({'q': [5]}, {'q': {'text': 'bank'}}, {'keywords': 5}, {'threat_level': ['high']}):
+        response = client.post('/api/osint-collector', json=dict(body, action='search_threats'))
+        assert response.status_code == 400, body
+        assert response.get_json()['success'] is False
+    response = client.post('/api/osint-collector', json={'action': 'search_threats', 'q': 5})
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+    response = client.post('/api/osint-collector', json={'action': 'search_threats', 'q': 'bank', 'keywords': ['sms']})
+    assert response.get_json()['threats']
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('timm')
+
+import ai_detection_backends
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_backends_only_offer_real_conversions():
+    assert 'int8-dynamic' not in ai_detection_backends.BACKENDS
+    with pytest.raises(ValueError, match='Unknown backend'):
+        ai_detection_backends.load_backend('int8-dynamic')
+
+
+def test_unknown_backend_fails_before_loading_dependencies(monkeypatch):
+    def ensure_dependencies():
+        raise AssertionError('dependencies loaded for an unknown backend')
+
+    monkeypatch.setattr(ai_detection_backends.inference, 'ensure_dependencies', ensure_dependencies)
+    with pytest.raises(ValueError, match='Unknown backend'):
+        ai_detection_backends.load_backend('tensorrt')
+
+
+def test_cli_script_is_shared_with_backends():
+    # Run the CLI module as __main__ (as PHP does), then import the backends
+    code = (
+        "import runpy, sys\n"
+        "sys.argv = ['ai_detection_inference.py']\n"
+        "try:\n"
+        "    runpy.run_path('ai_detection_inference.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "import ai_detection_backends, metrics\n"
+        "names = [m.name for m in metrics._registry]\n"
+        "print(ai_detection_backends.inference.__name__, names.count('ai_detection_stage_seconds'))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True,
+                            env=dict(os.environ, AI_MODEL_PATH=os.path.join(ROOT_DIR, 'missing.pth')))
+    assert output.stdout.strip().splitlines()[-1] == '__main__ 1'
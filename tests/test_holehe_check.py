@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('httpx')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+import holehe_check
+
+
+def site(name, delay=0.0, raises=None, **output):
+    async def check(email, client, out):
+        await asyncio.sleep(delay)
+        if raises is not None:
+            raise raises
+        if output:
+            out.append(dict(output, name=name, domain=f'{name}.com'))
+    check.__name__ = name
+    return check
+
+
+def run(modules, **kwargs):
+    seen = []
+    platforms = asyncio.run(holehe_check.run_checks('user@example.com', seen.append, modules, **kwargs))
+    return {p['platform']: p for p in platforms}, seen
+
+
+def test_each_outcome_gets_its_own_status():
+    platforms, seen = run([
+        site('used', exists=True, rateLimit=False),
+        site('unused', exists=False, rateLimit=False),
+        site('throttled', exists=False, rateLimit=True),
+        site('slow', delay=1.0, exists=True),
+        site('broken', raises=ValueError('bad response')),
+        site('silent')
+    ], timeout=0.2)
+    assert platforms['used.com']['status'] == 'used'
+    assert platforms['unused.com']['status'] == 'not_used'
+    assert platforms['throttled.com']['status'] == 'rate_limit'
+    assert platforms['slow'] == dict(platforms['slow'], status='error', error='timeout', found=None)
+    assert platforms['broken']['status'] == 'error'
+    assert platforms['broken']['error'] == 'ValueError: bad response'
+    assert platforms['silent']['error'] == 'no result'
+    assert len(seen) == 6
+
+    stats = holehe_check.summarize('user@example.com', list(platforms.values()), 1.0)['statistics']
+    assert (stats['used_count'], stats['not_used_count'], stats['rate_limit_count']) == (1, 1, 1)
+    assert (stats['error_count'], stats['timeout_count']) == (3, 1)
+
+
+def test_total_timeout_bounds_the_whole_check():
+    platforms, _ = run([site(f'slow{i}', delay=5.0, exists=True) for i in range(4)],
+                       concurrency=2, timeout=5.0, total_timeout=0.2)
+    assert {p['error'] for p in platforms.values()} == {'timeout'}
+
+
+def test_stream_prints_one_ndjson_line_per_platform(capsys):
+    holehe_check.print_platform({'platform': 'used.com', 'status': 'used'})
+    assert capsys.readouterr().out == '{"platform": "used.com", "status": "used", "type": "platform"}\n'
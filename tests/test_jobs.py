@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from jobs import JobManager, QueueFullError
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def manager():
+    return JobManager(workers=1, queue_depth=1, deadline=5, store_dir=None)
+
+
+def test_job_succeeds_and_runs_cleanup_after_fn(manager):
+    calls = []
+    job = manager.submit('test', lambda x: calls.append('fn') or x * 2, 21, cleanup=lambda: calls.append('cleanup'))
+    assert wait_until(lambda: manager.get(job.id)['status'] == 'succeeded')
+    assert manager.get(job.id)['result'] == 42
+    assert wait_until(lambda: calls == ['fn', 'cleanup'])
+
+
+def test_failed_job_reports_error_and_cleans_up(manager):
+    released = []
+
+    def boom():
+        raise ValueError('bad media')
+
+    job = manager.submit('test', boom, cleanup=lambda: released.append(True))
+    assert wait_until(lambda: manager.get(job.id)['status'] == 'failed')
+    assert manager.get(job.id)['error'] == 'bad media'
+    assert wait_until(lambda: released == [True])
+
+
+def test_rejected_job_is_cleaned_up(manager):
+    gate = threading.Event()
+    released = []
+    manager.submit('test', gate.wait, 2)
+    assert wait_until(lambda: manager.stats()['running'] == 1)
+    manager.submit('test', lambda: None)
+    with pytest.raises(QueueFullError):
+        manager.submit('test', lambda: None, cleanup=lambda: released.append('rejected'))
+    assert released == ['rejected']
+    assert manager.stats()['rejected'] == 1
+    gate.set()
+
+
+def test_job_expiring_in_queue_never_runs_and_is_cleaned_up():
+    manager = JobManager(workers=1, queue_depth=2, deadline=0.2, store_dir=None)
+    gate = threading.Event()
+    ran, released = [], []
+    blocker = manager.submit('test', gate.wait, 1, deadline=5)
+    assert wait_until(lambda: manager.stats()['running'] == 1)
+    queued = manager.submit('test', lambda: ran.append(True), cleanup=lambda: released.append(True))
+
+    time.sleep(0.3)
+    state = manager.get(queued.id)
+    assert state['status'] == 'expired'
+    assert released == [True]
+
+    gate.set()
+    assert wait_until(lambda: manager.get(blocker.id)['status'] == 'succeeded')
+    time.sleep(0.05)
+    assert ran == []
+    assert released == [True]
+
+
+def test_running_job_past_deadline_expires_without_early_cleanup():
+    manager = JobManager(workers=1, queue_depth=1, deadline=0.1, store_dir=None)
+    gate = threading.Event()
+    released = []
+    job = manager.submit('test', gate.wait, 2, cleanup=lambda: released.append(True))
+    assert wait_until(lambda: manager.stats()['running'] == 1)
+    time.sleep(0.15)
+
+    assert manager.get(job.id)['status'] == 'expired'
+    # Still running: its arguments must stay usable until fn returns
+    assert released == []
+    gate.set()
+    assert wait_until(lambda: released == [True])
+    assert manager.get(job.id)['status'] == 'expired'
+
+
+def test_wait_returns_when_job_finishes(manager):
+    gate = threading.Event()
+    job = manager.submit('test', gate.wait, 2)
+    threading.Timer(0.1, gate.set).start()
+    started = time.monotonic()
+    state = manager.wait(job.id, 2)
+    while state['status'] not in ('succeeded', 'failed', 'expired'):
+        state = manager.wait(job.id, 2)
+    assert state['status'] == 'succeeded'
+    assert time.monotonic() - started < 1.5
+
+
+def test_shared_store_serves_jobs_from_other_processes(tmp_path):
+    owner = JobManager(workers=1, queue_depth=1, deadline=5, store_dir=str(tmp_path))
+    other = JobManager(workers=1, queue_depth=1, deadline=5, store_dir=str(tmp_path))
+    job = owner.submit('test', lambda: 'done')
+    assert wait_until(lambda: (other.get(job.id) or {}).get('status') == 'succeeded')
+    assert other.get(job.id)['result'] == 'done'
+    assert other.get('missing') is None
@@ -0,0 +1,53 @@
+import collections
+
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('timm')
+
+import ai_detection_inference as inference
+
+# Extra checkpoint contents the weights-only unpickler refuses
+TrainingInfo = collections.namedtuple('TrainingInfo', 'epoch accuracy')
+
+
+@pytest.fixture(autouse=True)
+def dependencies(monkeypatch):
+    inference.ensure_dependencies()
+    monkeypatch.setattr(inference, 'TRUSTED_MODEL_DIRS', [])
+
+
+def save_checkpoint(path, extra=False):
+    state = {'weight': torch.arange(4, dtype=torch.float32)}
+    if extra:
+        state['info'] = TrainingInfo(3, 0.97)
+    torch.save(state, path)
+    return str(path)
+
+
+def test_weights_only_checkpoint_is_memory_mapped(tmp_path):
+    state = inference._load_state_dict(save_checkpoint(tmp_path / 'model.pth'))
+    assert torch.equal(state['weight'], torch.arange(4, dtype=torch.float32))
+    assert inference.STARTUP_TIMINGS['weights_format'] == 'torch-mmap'
+
+
+def test_pickled_checkpoint_outside_trusted_dirs_is_refused(tmp_path):
+    path = save_checkpoint(tmp_path / 'model.pth', extra=True)
+    with pytest.raises(RuntimeError, match='AI_TRUSTED_MODEL_DIRS'):
+        inference._load_state_dict(path)
+
+
+def test_pickled_checkpoint_in_trusted_dir_loads_with_a_warning(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(inference, 'TRUSTED_MODEL_DIRS', [str(tmp_path)])
+    state = inference._load_state_dict(save_checkpoint(tmp_path / 'model.pth', extra=True))
+    assert state['info'] == TrainingInfo(3, 0.97)
+    assert inference.STARTUP_TIMINGS['weights_format'] == 'torch-pickle'
+    assert 'full unpickling' in capsys.readouterr().err
+
+
+def test_load_model_reports_why_loading_failed(tmp_path, capsys):
+    path = save_checkpoint(tmp_path / 'model.pth', extra=True)
+    assert inference.load_model(path, backend='eager') is None
+    err = capsys.readouterr().err
+    assert f'Failed to load model from {path}' in err
+    assert 'AI_TRUSTED_MODEL_DIRS' in err
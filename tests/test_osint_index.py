@@ -0,0 +1,101 @@
+import pytest
+
+import osint_index
+from osint_index import OsintIndex, build_osint_index, parse_timestamp, tokenize
+
+THREATS = [
+    {'keywords': ['phishing', 'bank'], 'content': 'Fake SMS claiming Maybank account suspension.',
+     'threat_level': 'high', 'location': 'Kuala Lumpur', 'collected_at': '2025-01-20 09:00:00'},
+    {'keywords': ['job'], 'content': 'Recruitment post mentions phishing links in passing, pays via bank transfer.',
+     'threat_level': 'medium', 'location': 'Selangor', 'collected_at': '2025-01-22 18:30:00'},
+    {'keywords': ['crypto', 'investment'], 'content': 'Telegram group promising 500% crypto returns.',
+     'threat_level': 'High', 'location': 'kuala lumpur', 'collected_at': '2025-01-24'},
+    {'keywords': ['parcel'], 'content': 'Courier parcel held at customs, pay a release fee.',
+     'threat_level': 'low', 'location': 'Johor', 'collected_at': 'not a date'}
+]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def index(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(osint_index, 'np', None)
+    return build_osint_index(THREATS)
+
+
+def ids(results):
+    return [doc_id for _, doc_id in results]
+
+
+def test_tokenize_and_parse_timestamp():
+    assert tokenize('Maybank, OTP-123!') == ['maybank', 'otp', '123']
+    assert parse_timestamp('2025-01-24', end_of_day=True) - parse_timestamp('2025-01-24') == 24 * 60 * 60 - 1
+    assert parse_timestamp('2025-01-24T10:00:00') == parse_timestamp('2025-01-24 10:00:00')
+    with pytest.raises(ValueError):
+        parse_timestamp('24/01/2025')
+
+
+def test_keywords_outrank_passing_mentions(index):
+    results = index.search('phishing')
+    assert ids(results) == [0, 1]
+    assert results[0][0] > results[1][0] > 0
+
+
+def test_query_accepts_keyword_lists(index):
+    assert index.search(['crypto', 'parcel']) == index.search('crypto parcel')
+    assert set(ids(index.search(['crypto', 'parcel']))) == {2, 3}
+
+
+def test_unknown_terms_match_nothing(index):
+    assert index.search('zzzz') == []
+
+
+def test_empty_query_lists_filtered_threats_oldest_first(index):
+    assert ids(index.search('')) == [0, 1, 2, 3]
+    assert ids(index.search('', limit=2)) == [0, 1]
+    assert ids(index.search('', threat_level='HIGH')) == [0, 2]
+
+
+def test_level_and_location_filters_are_case_insensitive(index):
+    assert ids(index.search('phishing bank crypto', threat_level='HIGH')) == [0, 2]
+    assert ids(index.search('phishing bank crypto', location='KUALA LUMPUR')) == [0, 2]
+    assert ids(index.search('phishing bank crypto', threat_level='medium', location='Selangor')) == [1]
+    assert index.search('phishing', threat_level='critical') == []
+    assert index.search('phishing', location='Penang') == []
+
+
+def test_collected_range_filters(index):
+    assert ids(index.search('', collected_from='2025-01-21')) == [1, 2]
+    assert ids(index.search('', collected_to='2025-01-22')) == [0, 1]
+    assert ids(index.search('bank', collected_from='2025-01-21 00:00:00', collected_to='2025-01-23')) == [1]
+    with pytest.raises(ValueError):
+        index.search('', collected_from='yesterday')
+
+
+def test_limit_keeps_the_best_and_breaks_ties_by_id(index):
+    for _ in range(3):
+        index.add({'keywords': ['scam'], 'content': 'same text', 'collected_at': '2025-02-01 00:00:00'})
+    assert ids(index.search('scam', limit=2)) == [4, 5]
+    assert ids(index.search('scam')) == [4, 5, 6]
+
+
+def test_added_threats_are_searchable_without_rebuild(index):
+    doc_id = index.add({'keywords': ['lhdn'], 'content': 'Fake LHDN tax refund link', 'threat_level': 'high',
+                        'location': 'Penang', 'collected_at': '2025-02-01 08:00:00'})
+    assert doc_id == len(THREATS)
+    assert ids(index.search('refund', location='penang')) == [doc_id]
+    assert index.records[doc_id]['keywords'] == ['lhdn']
+    assert index.stats()['records'] == len(THREATS) + 1
+
+
+def test_numpy_and_python_scores_agree(monkeypatch):
+    pytest.importorskip('numpy')
+    query = 'phishing bank crypto parcel fee'
+    vectorized = build_osint_index(THREATS).search(query)
+    monkeypatch.setattr(osint_index, 'np', None)
+    plain = OsintIndex()
+    for threat in THREATS:
+        plain.add(threat)
+    assert ids(plain.search(query)) == ids(vectorized)
+    assert [score for score, _ in plain.search(query)] == pytest.approx([score for score, _ in vectorized])
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+import pagination
+from pagination import decode_cursor, encode_cursor, page_args, paged_response
+
+RECORDS = []
+
+
+@pytest.fixture
+def client():
+    RECORDS[:] = [{'id': i, 'name': f'record {i}', 'even': i % 2 == 0} for i in range(250)]
+    app = flask.Flask(__name__)
+
+    @app.route('/list', methods=['GET', 'POST'])
+    def listing():
+        scope = {'endpoint': 'list', 'even': flask.request.args.get('even')}
+        try:
+            args = page_args()
+            after = decode_cursor(args['cursor'], scope) if args['cursor'] else -1
+        except ValueError as e:
+            return flask.jsonify({'success': False, 'error': str(e)}), 400
+        matches = [r for r in RECORDS if scope['even'] is None or r['even']]
+        items = ((r['id'], r) for r in matches if r['id'] > after)
+        return paged_response(items, args, scope, total=len(matches))
+
+    return app.test_client()
+
+
+def walk(client, url):
+    ids, cursor, pages = [], None, 0
+    while True:
+        body = client.get(url + (f'&cursor={cursor}' if cursor else '')).get_json()
+        ids.extend(r['id'] for r in body['results'])
+        pages += 1
+        if not body['has_more']:
+            assert body['next_cursor'] is None
+            return ids, pages
+        cursor = body['next_cursor']
+
+
+def test_cursor_round_trip_and_scope_binding():
+    cursor = encode_cursor(41, {'q': 'scam'})
+    assert decode_cursor(cursor, {'q': 'scam'}) == 41
+    with pytest.raises(ValueError, match='does not match'):
+        decode_cursor(cursor, {'q': 'other'})
+    with pytest.raises(ValueError, match='Invalid'):
+        decode_cursor('not-a-cursor!', {'q': 'scam'})
+
+
+def test_default_page_is_100_with_total(client):
+    body = client.get('/list').get_json()
+    assert pagination.DEFAULT_PAGE_SIZE == 100
+    assert body['count'] == 100
+    assert body['total'] == 250
+    assert [r['id'] for r in body['results']] == list(range(100))
+    assert body['has_more']
+
+
+def test_walking_cursors_visits_every_match_once(client):
+    ids, pages = walk(client, '/list?limit=30')
+    assert ids == list(range(250))
+    assert pages == 9
+    ids, _ = walk(client, '/list?limit=40&even=1')
+    assert ids == list(range(0, 250, 2))
+
+
+def test_cursor_is_stable_when_records_are_added(client):
+    first = client.get('/list?limit=10').get_json()
+    # New records get higher ids; removing one already seen shifts nothing
+    RECORDS.append({'id': 1000, 'name': 'late', 'even': True})
+    del RECORDS[3]
+    second = client.get(f"/list?limit=10&cursor={first['next_cursor']}").get_json()
+    assert [r['id'] for r in second['results']] == list(range(10, 20))
+    assert second['total'] == 250
+
+
+def test_cursor_from_another_query_is_rejected(client):
+    cursor = client.get('/list?limit=10').get_json()['next_cursor']
+    response = client.get(f'/list?limit=10&even=1&cursor={cursor}')
+    assert response.status_code == 400
+    assert client.get('/list?limit=abc').status_code == 400
+
+
+def test_non_integer_json_limit_and_offset_are_rejected(client):
+    for body in ({'limit': [1]}, {'limit': {'n': 1}}, {'limit': True}, {'offset': [1]}, {'offset': 'x'},
+                 {'fields': [1]}, {'fields': 5}):
+        response = client.post('/list', json=body)
+        assert response.status_code == 400, body
+        assert response.get_json()['success'] is False
+    assert client.post('/list', json={'limit': 3, 'offset': 2}).get_json()['count'] == 3
+    assert client.get('/list?limit=abc').get_json()['error'] == 'Invalid limit: must be an integer'
+
+
+def test_limit_is_capped_and_offset_skips(client, monkeypatch):
+    monkeypatch.setattr(pagination, 'MAX_PAGE_SIZE', 50)
+    assert client.get('/list?limit=5000').get_json()['count'] == 50
+    body = client.get('/list?limit=5&offset=7').get_json()
+    assert [r['id'] for r in body['results']] == [7, 8, 9, 10, 11]
+
+
+def test_fields_projection(client):
+    body = client.post('/list?limit=2', json={'fields': 'id,missing'}).get_json()
+    assert body['results'] == [{'id': 0}, {'id': 1}]
+
+
+def test_ndjson_streams_every_match_without_a_default_limit(client):
+    lines = [json.loads(line) for line in client.get('/list?format=ndjson').data.splitlines()]
+    assert len(lines) == 251
+    assert lines[-1] == {'next_cursor': None, 'count': 250, 'has_more': False}
+
+
+def test_ndjson_with_limit_ends_with_a_cursor(client):
+    lines = [json.loads(line) for line in client.get('/list?format=ndjson&limit=3').data.splitlines()]
+    assert [line['id'] for line in lines[:3]] == [0, 1, 2]
+    summary = lines[-1]
+    assert summary['has_more'] and summary['count'] == 3
+    rest = client.get(f"/list?limit=2&cursor={summary['next_cursor']}").get_json()
+    assert [r['id'] for r in rest['results']] == [3, 4]
@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('torch')
+pytest.importorskip('albumentations')
+pytest.importorskip('cv2')
+Image = pytest.importorskip('PIL.Image')
+
+import ai_detection_inference as inference
+
+
+def photo_like(width, height, seed=0):
+    """Smooth gradients, shapes and mild sensor noise, like a camera photo."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.stack([
+        128 + 100 * np.sin(x / 97.0) * np.cos(y / 131.0),
+        128 + 90 * np.cos((x + y) / 173.0),
+        64 + 150 * (x / width) * (y / height)
+    ], axis=-1)
+    for _ in range(12):
+        cx, cy, r = rng.integers(0, width), rng.integers(0, height), rng.integers(40, 300)
+        mask = (x - cx) ** 2 + (y - cy) ** 2 < r ** 2
+        image[mask] = rng.integers(0, 256, size=3)
+    image += rng.normal(0, 4, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(scope='module')
+def jpeg_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('images') / 'photo.jpg'
+    Image.fromarray(photo_like(2048, 1536)).save(path, quality=90)
+    return str(path)
+
+
+@pytest.fixture(scope='module')
+def png_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('images') / 'screenshot.png'
+    Image.fromarray(photo_like(640, 480, seed=1)).save(path)
+    return str(path)
+
+
+def test_exact_pipeline_is_the_default():
+    assert inference.PREPROCESS == 'albumentations'
+
+
+def test_default_preprocessing_matches_val_transform(jpeg_path):
+    reference = inference.get_val_transform()(image=np.array(Image.open(jpeg_path).convert('RGB')))['image']
+    tensor = inference.preprocess_image(jpeg_path)
+    assert tuple(tensor.shape) == (3, inference.IMG_SIZE, inference.IMG_SIZE)
+    assert float((tensor - reference).abs().max()) == 0.0
+
+
+def test_lean_pipeline_within_tolerance_on_reduced_jpeg_decode(jpeg_path):
+    report = inference.compare_preprocessing([jpeg_path])
+    image = report['images'][0]
+    assert image['success'], image
+    assert image['mean_abs_diff'] <= inference.PREPROCESS_TOLERANCE
+    assert report['success']
+
+
+def test_lean_pipeline_without_draft_decode_matches_closely(png_path):
+    image = inference.compare_preprocessing([png_path])['images'][0]
+    assert image['success'], image
+    # Same decode and interpolation; only float rounding differs
+    assert image['max_abs_diff'] < 1e-4
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+from result_cache import TieredCache, sha256_hex
+
+
+def _disk_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files if name.endswith('.json'))
+
+
+def test_sha256_hex_length_prefixes_parts():
+    assert sha256_hex('ab', 'c') != sha256_hex('a', 'bc')
+    assert sha256_hex('ab', b'c') == sha256_hex(b'ab', 'c')
+
+
+def test_memory_tier_is_lru_and_returns_copies():
+    cache = TieredCache(max_entries=2)
+    cache.set('a', {'n': 1})
+    cache.set('b', {'n': 2})
+    cache.get('a')['n'] = 99
+    cache.set('c', {'n': 3})
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('b') is None
+    assert cache.stats()['memory_entries'] == 2
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    TieredCache(disk_dir=str(tmp_path)).set('key1', [1, 2, 3])
+    cache = TieredCache(disk_dir=str(tmp_path))
+    assert cache.get('key1') == [1, 2, 3]
+    assert cache.get('key1') == [1, 2, 3]
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['memory_hits']) == (1, 1)
+
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    cache = TieredCache(disk_dir=str(tmp_path), ttl=0.05)
+    cache.set('short', 'value')
+    cache.set('long', 'value', ttl=60)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    assert cache.get('long') == 'value'
+    assert cache.stats()['expirations'] == 1
+    assert not os.path.exists(cache._disk_path('short'))
+
+
+def test_overwrite_counts_only_the_new_file(tmp_path):
+    cache = TieredCache(max_entries=0, disk_dir=str(tmp_path))
+    cache.set('key1', 'x')
+    for size in (1000, 10, 500, 500):
+        cache.set('key1', 'x' * size)
+    cache.set('key2', 'y' * 200)
+    assert cache.stats()['disk_bytes'] == _disk_size(tmp_path)
+    cache.delete('key2')
+    assert cache.stats()['disk_bytes'] == _disk_size(tmp_path)
+
+
+def test_overwrites_do_not_trigger_eviction(tmp_path):
+    cache = TieredCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=4096)
+    cache.set('keep', 'k' * 1000)
+    for i in range(50):
+        cache.set('hot', 'h' * 1000 + str(i))
+    assert cache.stats()['evictions'] == 0
+    assert cache.get('keep') == 'k' * 1000
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TieredCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=5000)
+    for i in range(4):
+        cache.set(f'key{i}', 'v' * 1000)
+        past = time.time() - 100 + i
+        os.utime(cache._disk_path(f'key{i}'), (past, past))
+    cache.get('key0')
+    cache.set('key4', 'v' * 1000)
+    cache.set('key5', 'v' * 1000)
+    assert cache.stats()['evictions'] >= 1
+    assert cache.get('key0') is not None
+    assert cache.get('key1') is None
+    assert cache.stats()['disk_bytes'] == _disk_size(tmp_path) <= 5000
+
+
+def test_concurrent_writers_keep_an_exact_total(tmp_path):
+    cache = TieredCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=20000)
+
+    def writer(n):
+        for i in range(100):
+            cache.set(f'key{(n * 7 + i) % 30}', 'v' * (100 + (i * 37) % 900))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()['disk_bytes'] == _disk_size(tmp_path)
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = TieredCache(disk_dir=str(tmp_path))
+    cache.set('key1', 1)
+    cache.clear()
+    assert cache.get('key1') is None
+    assert cache.stats()['disk_bytes'] == _disk_size(tmp_path) == 0
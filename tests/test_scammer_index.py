@@ -0,0 +1,100 @@
+import json
+
+from scammer_index import (RECORD_FIELDS, ExactMatchTable, ScammerIndex, build_index, build_lookup,
+                           database_record, load_database_records, normalize_phone, scammer_record)
+
+
+def _scammers():
+    return [
+        {'id': 1, 'scammer_email': 'recruit@fakejobs.com', 'scammer_phone': '011-2345 6789',
+         'scammer_website': 'fake-petronas-job.com', 'scam_type': 'job',
+         'description': 'Fake PETRONAS recruitment asking for a processing fee'},
+        {'id': 2, 'scammer_email': 'invest@gmail.com', 'scammer_phone': '012-***-8901',
+         'scammer_website': 'quick-crypto-profits.net', 'scam_type': 'cryptocurrency',
+         'description': 'Crypto investment promising 500% returns'}
+    ]
+
+
+def _database(tmp_path):
+    path = tmp_path / 'scammer-database.json'
+    path.write_text(json.dumps({
+        'phone_numbers': [{'rank': 1, 'phone': '0163411403', 'police_reports': 18},
+                          {'rank': 2, 'phone': '0198765432', 'police_reports': 3}],
+        'bank_accounts': [{'rank': 1, 'account': '1234567890123', 'police_reports': 16}]
+    }))
+    return load_database_records(str(path))
+
+
+def test_normalize_phone_folds_country_prefix():
+    assert normalize_phone('+60 16-341 1403') == '0163411403'
+    assert normalize_phone('016-341 1403') == '0163411403'
+
+
+def test_database_and_reported_records_share_one_shape(tmp_path):
+    records = _database(tmp_path) + [scammer_record(s) for s in _scammers()]
+    assert all(tuple(sorted(r)) == tuple(sorted(RECORD_FIELDS)) for r in records)
+    phone, _, account = records[:3]
+    assert (phone['type'], phone['id'], phone['threat_level'], phone['report_count']) == ('phone', 'phone-1', 'high', 18)
+    assert records[1]['threat_level'] == 'low'
+    assert (account['type'], account['bank_account'], account['threat_level']) == ('bank_account', '1234567890123', 'medium')
+    assert records[3]['type'] == 'scammer' and records[3]['bank_account'] is None
+
+
+def test_database_record_fills_every_field():
+    record = database_record('phone', {'rank': 7, 'phone': '0123456789', 'police_reports': 10})
+    assert set(record) == set(RECORD_FIELDS)
+    assert record['threat_level'] == 'medium'
+    assert record['description'] == 'Phone number reported 10 time(s) to police'
+
+
+def test_search_matches_substrings_case_insensitively(tmp_path):
+    index = build_index(_scammers(), _database(tmp_path))
+    assert [r['id'] for r in index.search('PETRONAS')] == [1]
+    assert [r['id'] for r in index.search('crypto')] == [2]
+    assert [r['id'] for r in index.search('4567890')] == ['bank-1']
+    assert index.search('nothing like this') == []
+    assert index.search('   ') == []
+
+
+def test_search_normalizes_phone_queries(tmp_path):
+    index = build_index(_scammers(), _database(tmp_path))
+    assert [r['id'] for r in index.search('+60 16-341 1403')] == ['phone-1']
+    assert [r['id'] for r in index.search('01123456789')] == [1]
+
+
+def test_search_limit_and_count_agree(tmp_path):
+    index = build_index(_scammers(), _database(tmp_path))
+    matches = index.search('0')
+    assert index.count('0') == len(matches) > 2
+    assert index.search('0', limit=2) == matches[:2]
+
+
+def test_iter_ids_resumes_after_an_id():
+    index = ScammerIndex()
+    for i in range(10):
+        index.add({'id': i}, identifiers=(f'acct{i:03d}',))
+    assert list(index.iter_ids('acct', after=6)) == [7, 8, 9]
+
+
+def test_add_scammer_is_searchable_without_rebuild():
+    index = build_index(_scammers())
+    scammer = {'id': 3, 'scammer_email': 'parcel@customs-my.com', 'description': 'Parcel held at customs'}
+    index.add_scammer(scammer)
+    assert index.search('customs') == [scammer]
+    assert scammer['type'] == 'scammer' and set(scammer) == set(RECORD_FIELDS)
+
+
+def test_exact_lookup_by_phone_email_and_account(tmp_path):
+    table = build_lookup(_scammers(), _database(tmp_path))
+    kind, normalized, records = table.lookup('+60 11-2345 6789')
+    assert (kind, normalized, [r['id'] for r in records]) == ('phone', '01123456789', [1])
+    assert [r['id'] for r in table.lookup('RECRUIT@fakejobs.com')[2]] == [1]
+    assert table.lookup('1234-5678-90123', 'account')[2][0]['id'] == 'bank-1'
+    assert table.lookup('0000000000')[2] == []
+
+
+def test_exact_lookup_skips_masked_values():
+    table = ExactMatchTable()
+    table.add_scammer(_scammers()[1])
+    assert table.stats()['phone'] == 0
+    assert table.stats()['email'] == 1
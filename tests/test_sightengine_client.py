@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+import sightengine_client
+from sightengine_client import SightengineClient, SightengineError, TokenBucket
+
+SUCCESS = {'status': 'success', 'type': {'ai_generated': 0.1}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers from the server's script of (status, headers, delay) steps; the last step repeats."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        with server.lock:
+            step = server.script[min(len(server.requests), len(server.script) - 1)]
+            server.requests.append({'method': self.command, 'path': self.path, 'body': body})
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        status, headers, delay = step
+        try:
+            if delay:
+                time.sleep(delay)
+            payload = json.dumps(SUCCESS if status == 200 else {'status': 'failure'}).encode('utf-8')
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    do_GET = _answer
+    do_POST = _answer
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.script = [(200, {}, 0)]
+    server.requests = []
+    server.active = server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_port}/1.0/check.json'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(sightengine_client, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(sightengine_client, 'BACKOFF_MAX', 0.05)
+
+
+def make_client(stub, **kwargs):
+    kwargs.setdefault('rate_per_minute', 0)
+    return SightengineClient(api_url=stub.url, api_user='user', api_secret='secret', **kwargs)
+
+
+def test_retries_server_errors_then_succeeds(stub):
+    stub.script = [(503, {}, 0), (502, {}, 0), (200, {}, 0)]
+    client = make_client(stub, max_retries=3)
+    assert client.check_url('https://example.com/a.jpg', 'genai') == SUCCESS
+    stats = client.stats()
+    assert (stats['attempts'], stats['retries'], stats['errors']) == (3, 2, 0)
+    assert all('api_secret=secret' in r['path'] for r in stub.requests)
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.script = [(503, {}, 0)]
+    client = make_client(stub, max_retries=2)
+    with pytest.raises(SightengineError, match='503'):
+        client.check_url('https://example.com/a.jpg', 'genai')
+    assert len(stub.requests) == 3
+    assert client.stats()['errors'] == 1
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [(400, {}, 0)]
+    client = make_client(stub, max_retries=3)
+    with pytest.raises(SightengineError):
+        client.check_url('https://example.com/a.jpg', 'genai')
+    assert len(stub.requests) == 1
+
+
+def test_429_honours_retry_after(stub, monkeypatch):
+    stub.script = [(429, {'Retry-After': '0.2'}, 0), (200, {}, 0)]
+    monkeypatch.setattr(sightengine_client, 'BACKOFF_MAX', 1.0)
+    client = make_client(stub, max_retries=1)
+    started = time.monotonic()
+    assert client.check_url('https://example.com/a.jpg', 'genai') == SUCCESS
+    assert time.monotonic() - started >= 0.2
+    assert len(stub.requests) == 2
+
+
+def test_backoff_is_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(sightengine_client, 'BACKOFF_BASE', 0.5)
+    monkeypatch.setattr(sightengine_client, 'BACKOFF_MAX', 8)
+    client = SightengineClient(api_url='http://127.0.0.1:9/', rate_per_minute=0)
+    for attempt in range(8):
+        for _ in range(20):
+            assert 0 <= client._backoff(attempt) <= min(8, 0.5 * 2 ** attempt)
+    assert client._backoff(0, retry_after=60) == 8
+
+
+def test_upload_is_rewound_for_each_attempt(stub, tmp_path):
+    stub.script = [(503, {}, 0), (200, {}, 0)]
+    client = make_client(stub, max_retries=1)
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(b'\xff\xd8' + b'x' * 100000)
+    with open(path, 'rb') as media:
+        assert client.check_file(media, 'genai', 'photo.jpg') == SUCCESS
+    first, second = stub.requests
+    assert first['body'] == second['body']
+    assert b'x' * 100000 in second['body']
+    assert b'name="api_secret"' in second['body']
+
+
+def test_token_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert not bucket.acquire(0)
+    started = time.monotonic()
+    assert bucket.acquire(1)
+    assert 0.02 <= time.monotonic() - started < 0.5
+
+
+def test_rate_budget_exhausted_fails_without_holding_a_slot(stub):
+    client = make_client(stub, rate_per_minute=1, burst=1, max_in_flight=1, acquire_timeout=0.05)
+    client.check_url('https://example.com/a.jpg', 'genai')
+    with pytest.raises(SightengineError, match='Rate limit'):
+        client.check_url('https://example.com/b.jpg', 'genai')
+    assert len(stub.requests) == 1
+    assert client.stats()['throttled'] == 1
+    # The in-flight slot was released
+    assert client._in_flight.acquire(timeout=0)
+
+
+def test_concurrency_is_capped(stub):
+    stub.script = [(200, {}, 0.1)]
+    client = make_client(stub, max_in_flight=2, acquire_timeout=5)
+    errors = []
+
+    def scan(i):
+        try:
+            client.check_url(f'https://example.com/{i}.jpg', 'genai')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=scan, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(stub.requests) == 6
+    assert stub.peak == 2
+    assert client.stats()['in_flight'] == 0
+
+
+def test_waiting_for_a_slot_does_not_spend_rate_tokens(stub):
+    stub.script = [(200, {}, 0.3)]
+    client = make_client(stub, max_in_flight=1, rate_per_minute=60, burst=5)
+    busy = threading.Thread(target=client.check_url, args=('https://example.com/slow.jpg', 'genai'))
+    busy.start()
+    while not stub.requests:
+        time.sleep(0.01)
+    tokens = client.bucket.available()
+    with pytest.raises(SightengineError, match='concurrent'):
+        client.check_url('https://example.com/b.jpg', 'genai', acquire_timeout=0.05)
+    busy.join()
+    # Only refill, nothing spent by the rejected call
+    assert client.bucket.available() >= tokens
+    assert len(stub.requests) == 1
@@ -0,0 +1,51 @@
+import gzip
+import os
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from static_assets import StaticIndex
+
+
+def write(root, relative_path, data=b'x'):
+    path = os.path.join(root, *relative_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = str(tmp_path)
+    for relative_path in ('logo.png', 'app.py', 'notes.txt', 'index.php', 'assets/css/site.css',
+                          'assets/js/main.js', 'assets/js/.hidden.js', 'assets/js/build.sh',
+                          'assets/.cache/old.js', 'data/scammer-database.json', 'config/database.php',
+                          'templates/base.css', 'uploads/evidence.png', 'chrome-extension/popup.js'):
+        write(root, relative_path)
+    return root
+
+
+def test_indexes_only_allowlisted_assets(root):
+    index = StaticIndex(root)
+    assert sorted(index.entries) == ['assets/css/site.css', 'assets/js/main.js', 'logo.png']
+
+
+def test_serves_fresh_precompressed_variant(root):
+    body = b'body { color: red; }\n' * 200
+    path = write(root, 'assets/css/site.css', body)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(body))
+    index = StaticIndex(root)
+    assert 'assets/css/site.css.gz' not in index.entries
+
+    app = flask.Flask(__name__)
+    version = index.get('assets/css/site.css').version
+    with app.test_request_context(f'/assets/css/site.css?v={version}', headers={'Accept-Encoding': 'gzip'}):
+        response = index.serve('assets/css/site.css')
+        assert response.content_encoding == 'gzip'
+        assert gzip.decompress(response.get_data()) == body
+        assert response.cache_control.immutable
+    with app.test_request_context('/data/scammer-database.json'):
+        assert index.serve('data/scammer-database.json') is None
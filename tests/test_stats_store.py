@@ -0,0 +1,88 @@
+from stats_store import DEEPFAKE_THRESHOLD, StatsStore
+
+
+def scan_result(score):
+    return {'status': 'success', 'type': {'deepfake': score, 'ai_generated': 0.0}}
+
+
+def test_cache_hits_are_not_counted_as_new_scans():
+    stats = StatsStore(snapshot_path=None)
+    stats.record_scan(scan_result(DEEPFAKE_THRESHOLD + 0.1))
+    stats.record_scan(scan_result(DEEPFAKE_THRESHOLD + 0.1), cached=True)
+    stats.record_scan(scan_result(0.0))
+    view = stats.snapshot()
+    assert view['scans'] == 2
+    assert view['cached_scans'] == 1
+    assert view['deepfakes_detected'] == 1
+    assert sum(view['daily']['scans'].values()) == 2
+
+
+def _populated(path):
+    stats = StatsStore(snapshot_path=path, snapshot_interval=0)
+    stats.record_scammer({'scam_type': 'job', 'threat_level': 'high', 'location': 'Selangor',
+                          'verification_status': 'verified', 'first_reported': '2025-01-15 10:00:00'})
+    stats.record_threat({'threat_level': 'medium', 'location': 'Johor', 'collected_at': '2025-01-24 12:00:00'})
+    stats.record_scan(scan_result(0.9))
+    stats.add('total_reports', 3)
+    return stats
+
+
+def test_snapshot_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    stats = _populated(path)
+    assert stats.save() is True
+    assert stats.save() is False
+
+    restored = StatsStore(snapshot_path=path, snapshot_interval=0)
+    assert restored.restored is True
+    before, after = stats.snapshot(), restored.snapshot()
+    for name in ('total_reports', 'scans', 'deepfakes_detected', 'cached_scans'):
+        assert after[name] == before[name]
+    assert after['total_reports'] == 3
+    assert after['daily']['scans'] == before['daily']['scans']
+    assert after['daily']['deepfakes'] == before['daily']['deepfakes']
+
+
+def test_scammer_and_threat_counts_are_not_restored(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    _populated(path).save()
+    restored = StatsStore(snapshot_path=path, snapshot_interval=0)
+    view = restored.snapshot()
+    assert (view['total_scammers'], view['total_threats'], view['by_type']) == (0, 0, [])
+    assert view['daily']['scammers'] == view['daily']['threats'] == {}
+    # Recounting the records on start gives the same totals as before the restart
+    restored.record_scammer({'scam_type': 'job', 'first_reported': '2025-01-15 10:00:00'})
+    assert restored.snapshot()['total_scammers'] == 1
+
+
+def test_restored_counters_keep_counting(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    _populated(path).save()
+    restored = StatsStore(snapshot_path=path, snapshot_interval=0)
+    restored.record_scan(scan_result(0.0))
+    assert restored.snapshot()['scans'] == 2
+    assert restored.save() is True
+    assert StatsStore(snapshot_path=path, snapshot_interval=0).snapshot()['scans'] == 2
+
+
+def test_missing_snapshot_starts_empty(tmp_path):
+    stats = StatsStore(snapshot_path=str(tmp_path / 'missing.json'), snapshot_interval=0)
+    assert stats.restored is False
+    assert stats.snapshot()['total_scammers'] == 0
+
+
+def test_unreadable_snapshot_is_ignored_with_a_warning(tmp_path, capsys):
+    path = tmp_path / 'stats.json'
+    path.write_text('{"totals": ')
+    stats = StatsStore(snapshot_path=str(path), snapshot_interval=0)
+    assert stats.restored is False
+    assert stats.snapshot()['scans'] == 0
+    assert 'Warning: ignoring unreadable stats snapshot' in capsys.readouterr().out
+
+
+def test_snapshot_view_is_rebuilt_only_after_a_change():
+    stats = StatsStore(snapshot_path=None)
+    first = stats.snapshot()
+    assert stats.snapshot() is first
+    stats.add('total_reports')
+    assert stats.snapshot() is not first
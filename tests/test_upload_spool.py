@@ -0,0 +1,79 @@
+import io
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+import upload_spool
+from upload_spool import CountingSpooledFile, SpooledRequest, spool_stats
+
+LIMIT = 64 * 1024
+
+
+def test_small_upload_stays_in_memory_and_is_released():
+    before = spool_stats()
+    spool = CountingSpooledFile(max_size=LIMIT)
+    spool.write(b'a' * 1000)
+    assert not spool._rolled
+    assert spool_stats()['memory_bytes_in_use'] - before['memory_bytes_in_use'] == 1000
+    spool.close()
+    after = spool_stats()
+    assert after['memory_bytes_in_use'] == before['memory_bytes_in_use']
+    assert after['memory_uploads'] == before['memory_uploads'] + 1
+    assert after['bytes_received'] == before['bytes_received'] + 1000
+
+
+def test_large_upload_rolls_over_and_gives_memory_back():
+    before = spool_stats()
+    spool = CountingSpooledFile(max_size=LIMIT)
+    for _ in range(16):
+        spool.write(b'b' * (LIMIT // 4))
+    assert spool._rolled
+    # Only the bytes buffered before the rollover were ever held in memory
+    assert spool_stats()['memory_bytes_in_use'] == before['memory_bytes_in_use']
+    spool.seek(0)
+    assert len(spool.read()) == 4 * LIMIT
+    spool.close()
+    after = spool_stats()
+    assert after['disk_uploads'] == before['disk_uploads'] + 1
+    assert after['disk_bytes_written'] == before['disk_bytes_written'] + 4 * LIMIT
+
+
+def test_memory_in_use_is_bounded_by_live_uploads():
+    before = spool_stats()['memory_bytes_in_use']
+    spools = [CountingSpooledFile(max_size=LIMIT) for _ in range(8)]
+    for spool in spools:
+        for _ in range(8):
+            spool.write(b'c' * (LIMIT // 2))
+    for spool in spools:
+        spool.write(b'd' * 100)
+    in_use = spool_stats()['memory_bytes_in_use'] - before
+    assert in_use <= len(spools) * LIMIT
+    for spool in spools:
+        spool.close()
+    assert spool_stats()['memory_bytes_in_use'] == before
+
+
+def test_flask_uploads_use_the_spool():
+    app = flask.Flask(__name__)
+    app.request_class = SpooledRequest
+    seen = {}
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        stream = flask.request.files['media'].stream
+        seen['type'] = type(stream)
+        seen['rolled'] = stream._rolled
+        return 'ok'
+
+    before = spool_stats()
+    client = app.test_client()
+    client.post('/upload', data={'media': (io.BytesIO(b'e' * (upload_spool.SPOOL_MAX_MEMORY + 1)), 'big.jpg')},
+                content_type='multipart/form-data')
+    assert seen == {'type': CountingSpooledFile, 'rolled': True}
+    client.post('/upload', data={'media': (io.BytesIO(b'f' * 100), 'small.jpg')},
+                content_type='multipart/form-data')
+    assert seen['rolled'] is False
+    after = spool_stats()
+    assert after['uploads'] == before['uploads'] + 2
+    assert after['memory_bytes_in_use'] == before['memory_bytes_in_use']
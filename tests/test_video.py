@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+cv2 = pytest.importorskip('cv2')
+
+import ai_detection_video as video
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('video') / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (96, 64))
+    if not writer.isOpened():
+        pytest.skip('OpenCV cannot write MJPG video here')
+    for i in range(60):
+        writer.write(np.full((64, 96, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def fixed_model(ai_logit):
+    def model(batch):
+        logits = torch.zeros(batch.shape[0], 2)
+        logits[:, 1] = ai_logit
+        return logits
+    return model
+
+
+def failing_model(batch):
+    raise RuntimeError('out of memory')
+
+
+def test_scores_sampled_frames_and_exits_early(clip):
+    result = video.predict_video(fixed_model(4.0), clip, sample_fps=5, batch_size=4, early_exit=0.9, min_frames=4)
+    assert result['success']
+    assert result['label_name'] == 'AI-generated'
+    assert result['frame_statistics']['early_exit']
+    assert result['frame_statistics']['frames_scored'] == 4
+
+
+def test_inference_error_is_reported_and_decoder_stopped(clip):
+    before = threading.active_count()
+    result = video.predict_video(failing_model, clip, sample_fps=10, batch_size=2)
+    assert result == {'success': False, 'error': 'Inference failed: out of memory'}
+    assert threading.active_count() == before
+
+
+def test_unreadable_video(tmp_path):
+    path = tmp_path / 'broken.mp4'
+    path.write_bytes(b'not a video')
+    result = video.predict_video(fixed_model(0.0), str(path))
+    assert not result['success']
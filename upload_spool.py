@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Upload spooling for the Flask app.
+Multipart file parts are buffered in memory up to a threshold and roll over
+to an anonymous temporary file beyond it, so each upload gets its own unique
+spill file (no shared tempdir/<filename> paths) and is written to disk at
+most once. Counters show how many uploads stayed in memory.
+"""
+
+import os
+import threading
+from tempfile import SpooledTemporaryFile
+
+from flask import Request
+
+# Uploads up to this size stay in memory; larger ones spill to UPLOAD_SPOOL_DIR
+SPOOL_MAX_MEMORY = int(os.environ.get('UPLOAD_SPOOL_MAX_MEMORY', 4 * 1024 * 1024))
+SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR') or None
+
+_stats_lock = threading.Lock()
+_stats = {
+    'uploads': 0,
+    'memory_uploads': 0,
+    'disk_uploads': 0,
+    'bytes_received': 0,
+    'disk_bytes_written': 0,
+    'largest_upload_bytes': 0,
+    'memory_bytes_in_use': 0,
+    'peak_memory_bytes': 0
+}
+
+
+class CountingSpooledFile(SpooledTemporaryFile):
+    """SpooledTemporaryFile that reports whether it stayed in memory."""
+
+    def __init__(self, max_size=SPOOL_MAX_MEMORY, dir=SPOOL_DIR):
+        super().__init__(max_size=max_size, mode='w+b', dir=dir)
+        self._memory_bytes = 0
+        self._recorded = False
+
+    def write(self, data):
+        written = super().write(data)
+        if not self._rolled:
+            # Track bytes held in memory across all live uploads
+            grown = self.tell() - self._memory_bytes
+            if grown > 0:
+                self._memory_bytes += grown
+                with _stats_lock:
+                    _stats['memory_bytes_in_use'] += grown
+                    _stats['peak_memory_bytes'] = max(_stats['peak_memory_bytes'], _stats['memory_bytes_in_use'])
+        return written
+
+    def rollover(self):
+        if not self._rolled:
+            with _stats_lock:
+                _stats['memory_bytes_in_use'] -= self._memory_bytes
+            self._memory_bytes = 0
+        super().rollover()
+
+    def finish(self):
+        """Record the upload once parsing has finished."""
+        if self._recorded:
+            return
+        self._recorded = True
+        position = self.tell()
+        self.seek(0, os.SEEK_END)
+        size = self.tell()
+        self.seek(position)
+        with _stats_lock:
+            _stats['uploads'] += 1
+            _stats['bytes_received'] += size
+            _stats['largest_upload_bytes'] = max(_stats['largest_upload_bytes'], size)
+            if self._rolled:
+                _stats['disk_uploads'] += 1
+                _stats['disk_bytes_written'] += size
+            else:
+                _stats['memory_uploads'] += 1
+
+    def close(self):
+        self.finish()
+        if not self._rolled and self._memory_bytes:
+            with _stats_lock:
+                _stats['memory_bytes_in_use'] -= self._memory_bytes
+            self._memory_bytes = 0
+        super().close()
+
+
+class SpooledRequest(Request):
+    """Flask request whose file uploads use CountingSpooledFile."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return CountingSpooledFile()
+
+
+def spool_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update({
+        'spool_max_memory': SPOOL_MAX_MEMORY,
+        'spool_dir': SPOOL_DIR
+    })
+    return stats